@@ -17,6 +17,8 @@ Classes:
 from db.db import Database
 from db.models import Casinos, ResourceStrings, Settings
 from shared import log
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 
@@ -254,3 +256,80 @@ class CoreDB(Database):
             return []
         finally:
             db.close()
+
+    def get_duplicates(self, table, columns):
+        """
+        Retrieves the keys stored more than once in a table, with a
+        `GROUP BY ... HAVING COUNT(*) > 1` query: only the duplicated keys are
+        transferred, not the rows of the table.
+
+        Args:
+            table (str): The name of the table.
+            columns (list): The columns of the key, e.g. a composite unique constraint.
+
+        Returns:
+            list: A row (the key columns and `occurrences`) per duplicated key.
+
+        Raises:
+            SQLAlchemyError: If the query fails, as the table cannot be validated.
+        """
+        db: Session = self.get_session()
+        obj = self.get_table_class(table)
+        try:
+            key_columns = [getattr(obj, column) for column in columns]
+            occurrences = func.count()  # pylint: disable=not-callable
+            return db.query(
+                *key_columns, occurrences.label("occurrences")
+            ).group_by(*key_columns).having(occurrences > 1).all()
+        except SQLAlchemyError as e:
+            db.rollback()
+            log.error(
+                "An error occurred while checking duplicates in %s: %s", table, e)
+            raise
+        finally:
+            db.close()
+
+    # pylint: disable=too-many-arguments
+    def get_pivot_values(self, table, key, index, columns, value):
+        """
+        Retrieves the cells of the pivots of a table (index x columns -> value, for each
+        key) aggregated by the database with a `GROUP BY` query: only the cells are
+        transferred, without ORM objects nor the other columns of the table.
+
+        The values of a cell are summed; a cell without any value is NULL. The cells are
+        ordered by the first row of each cell, i.e. in the order of the table, which
+        requires the `id` column of the generated tables.
+
+        Args:
+            table (str): The name of the table.
+            key (str): The column of the pivot keys, e.g. 'criterion_key'.
+            index (str): The column of the rows of the pivots, e.g. 'dimension_2'.
+            columns (str): The column of the columns of the pivots, e.g. 'dimension_1'.
+            value (str): The column of the values, e.g. 'numeric_value'.
+
+        Returns:
+            list: A row (criterion_key, index, columns, value) per cell.
+
+        Raises:
+            ValueError: If the table has no `id` column giving the order of its rows.
+        """
+        obj = self.get_table_class(table)
+        if not hasattr(obj, "id"):
+            raise ValueError(
+                f"The table {table} has no id column to order the pivot values")
+        db: Session = self.get_session()
+        try:
+            key_columns = [getattr(obj, column) for column in (key, index, columns)]
+            return db.query(
+                key_columns[0].label("criterion_key"),
+                key_columns[1].label("index"),
+                key_columns[2].label("columns"),
+                func.sum(getattr(obj, value)).label("value"),
+            ).group_by(*key_columns).order_by(func.min(obj.id)).all()
+        except SQLAlchemyError as e:
+            db.rollback()
+            log.error(
+                "An error occurred while aggregating the pivots of %s: %s", table, e)
+            raise
+        finally:
+            db.close()
@@ -11,14 +11,17 @@ Classes:
     - CRUDRepository: A generic class for CRUD operations on SQLAlchemy models.
 """
 
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar
 
 from db.base import Base
-from sqlalchemy import inspect
+from sqlalchemy import UniqueConstraint, and_, inspect, or_
 from sqlalchemy.orm import Session
 
 T = TypeVar('T', bound=Base)
 
+# The number of values compared by a query for existing keys
+IN_CLAUSE_SIZE = 500
+
 
 class CRUDRepository(Generic[T]):
     """
@@ -123,6 +126,98 @@ class CRUDRepository(Generic[T]):
         # If no constraints are violated
         return True
 
+    def get_unique_constraints(self) -> List[Tuple[str, ...]]:
+        """
+        Returns the columns of each unique constraint of the model: the unique columns,
+        the composite `UniqueConstraint` and the unique indexes of its table.
+
+        Returns:
+            List[Tuple[str, ...]]: The column names of each unique constraint.
+        """
+        table = inspect(self.model).local_table
+        constraints = [(column.name,) for column in table.columns if column.unique]
+        constraints += [
+            tuple(column.name for column in constraint.columns)
+            for constraint in table.constraints
+            if isinstance(constraint, UniqueConstraint)]
+        constraints += [
+            tuple(column.name for column in index.columns)
+            for index in table.indexes if index.unique]
+        return list(dict.fromkeys(constraints))
+
+    def get_existing_keys(
+            self, db: Session, columns: Tuple[str, ...], entries: List[Any]) -> set:
+        """
+        Retrieves the keys of a unique constraint already stored for a batch of entries,
+        with one query per chunk of distinct keys filtering on all the key columns: an
+        `IN` for a single column, an `OR` of `AND` for a composite key, which every
+        supported dialect renders. The keys with a NULL value are not queried, since
+        they never conflict.
+
+        Args:
+            db (Session): The SQLAlchemy session.
+            columns (Tuple[str, ...]): The columns of the unique constraint.
+            entries (List[Any]): The new entries.
+
+        Returns:
+            set: The stored keys, as tuples of the column values.
+        """
+        key_columns = [getattr(self.model, column) for column in columns]
+        values = list({
+            key for key in (
+                tuple(getattr(entry, column, None) for column in columns)
+                for entry in entries)
+            if None not in key})
+        chunk_size = max(1, IN_CLAUSE_SIZE // len(columns))
+        keys = set()
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            if len(key_columns) == 1:
+                condition = key_columns[0].in_([key[0] for key in chunk])
+            else:
+                condition = or_(*(
+                    and_(*(column == value for column, value in zip(key_columns, key)))
+                    for key in chunk))
+            keys.update(
+                tuple(row) for row in db.query(*key_columns).filter(condition))
+        return keys
+
+    def find_conflicts(
+            self, db: Session, entries: List[Any]) -> Tuple[List[Any], List[Tuple]]:
+        """
+        Checks a batch of new entries against the unique constraints of the model, both
+        within the batch and against the stored rows. Keys with a NULL value never
+        conflict, as in SQL.
+
+        Args:
+            db (Session): The SQLAlchemy session.
+            entries (List[Any]): The new entries, in insertion order.
+
+        Returns:
+            Tuple[List[Any], List[Tuple]]: The entries that can be inserted, and an
+            (entry, columns, key) tuple for each entry violating a constraint.
+        """
+        constraints = self.get_unique_constraints()
+        seen = {
+            columns: self.get_existing_keys(db, columns, entries)
+            for columns in constraints}
+        accepted = []
+        conflicts = []
+        for entry in entries:
+            keys = {
+                columns: tuple(getattr(entry, column, None) for column in columns)
+                for columns in constraints}
+            violated = next(
+                (columns for columns, key in keys.items()
+                 if None not in key and key in seen[columns]), None)
+            if violated:
+                conflicts.append((entry, violated, keys[violated]))
+                continue
+            for columns, key in keys.items():
+                seen[columns].add(key)
+            accepted.append(entry)
+        return accepted, conflicts
+
     @classmethod
     def create(cls, db: Session, obj_in: T) -> T:
         """
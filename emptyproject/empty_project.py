@@ -100,7 +100,11 @@ def handle_create(args, this_db):
         log.info("Database initialized.")
 
         dbl = DatabaseLoader(this_db)
-        dbl.load_all_sheets(XlCleanReader, project.initial_data_file)
+        dbl.load_all_sheets(
+            XlCleanReader,
+            project.initial_data_file,
+            reader_options={"parallel": True},
+            bulk=True)
 
         log.info("Database initialized successfully.")
     except Exception as e:
@@ -138,6 +142,9 @@ def handle_load(this_db):
     # path=project.input_dir,
     # pattern=pattern,
     # recursive=True,
+    # # Only compute the criteria used by the pivots
+    # reader_options={"formulas": [
+    # info.formula for info in this_db.get_all("PivotInfos")]},
     # )
 
     # log.info("Data loaded successfully.")
@@ -16,10 +16,12 @@ Functions:
     get_uri_str(self): Returns the appropriate database URI key based on the database type.
     load_all_sheets(self, cls, xl_file, post_processing=None): Loads all data from all sheets
     of an Excel file into the database.
-    load_data_from_file(self, cls, xl_file_pattern, table, post_processing=None): Loads data
-    from multiple Excel files matching a pattern into the database.
-    load_data(self, cls, xl_file, table, post_processing=None): Loads data from a single
-    Excel file into the database.
+    load_data_from_file(self, cls, xl_file_pattern, table, post_processing=None,
+    reader_options=None): Loads data from multiple Excel files matching a pattern into
+    the database.
+    load_data(self, cls, xl_file, table, post_processing=None, reader_options=None): Loads
+    data from a single Excel file into the database.
+    report_conflicts(table, conflicts): Logs the entries violating a unique constraint.
 """
 
 import re
@@ -48,7 +50,13 @@ class DatabaseLoader:
         """
         self.database = database
 
-    def load_all_sheets(self, cls, xl_file, post_processing=None):
+    def load_all_sheets(
+            self,
+            cls,
+            xl_file,
+            post_processing=None,
+            reader_options=None,
+            **load_options):
         """
         Loads all data from all sheets of an Excel file into the database.
         It assumes that the sheet name is the same as the table name and
@@ -58,10 +66,13 @@ class DatabaseLoader:
             cls: The class responsible for loading the data.
             xl_file (str): The path to the Excel file.
             post_processing (function, optional): A function to call after data is loaded.
+            reader_options (dict, optional): Keyword arguments passed to the constructor
+                                             of `cls`.
+            **load_options: Keyword arguments passed to the `load_data` method of `cls`.
         """
         log.info("Loading %s ...", xl_file)
-        xl = cls(xl_file)
-        xl.load_data()
+        xl = cls(xl_file, **(reader_options or {}))
+        xl.load_data(**load_options)
         if post_processing:
             post_processing()
 
@@ -76,6 +87,7 @@ class DatabaseLoader:
         pattern,
         recursive=False,
         post_processing=None,
+        reader_options=None,
     ):
         """
         Loads data from multiple Excel files matching a pattern into the database.
@@ -85,12 +97,16 @@ class DatabaseLoader:
             xl_file_pattern (str): The pattern to match Excel files.
             table (str): The database table to insert data into.
             post_processing (function, optional): A function to call after data is loaded.
+            reader_options (dict, optional): Keyword arguments passed to the constructor
+                                             of `cls` (e.g. the `formulas` of
+                                             `XlCriteriaReader`).
         """
         files = find_files_by_pattern(path, pattern, recursive=recursive)
 
         for file in files:
             match = re.match(pattern, file)
-            self.load_data(cls, tables, file, match, post_processing)
+            self.load_data(
+                cls, tables, file, match, post_processing, reader_options)
 
     # pylint: disable=too-many-locals
     def load_data(
@@ -99,7 +115,8 @@ class DatabaseLoader:
             tables,
             xl_file,
             match=None,
-            post_processing=None):
+            post_processing=None,
+            reader_options=None):
         """
         Loads data from a single Excel file into the database.
 
@@ -108,6 +125,8 @@ class DatabaseLoader:
             xl_file (str): The path to the Excel file.
             table (str): The database table to insert data into.
             post_processing (function, optional): A function to call after data is loaded.
+            reader_options (dict, optional): Keyword arguments passed to the constructor
+                                             of `cls`.
         """
         log.info("Loading %s ...", xl_file)
 
@@ -116,33 +135,30 @@ class DatabaseLoader:
 
         try:
             # db_type = db.bind.dialect.name
-            xl = cls(xl_file, match)
+            xl = cls(xl_file, match, **(reader_options or {}))
             # Iterate over each table in the list of tables
             for table in tables:
                 # Load data from the Excel file for the current table
                 data_to_insert = xl.load_data(table)
 
-                # Process each entry in the data to insert
-                for data in data_to_insert:
-                    # Get the class corresponding to the current table
-                    table_class = this_db.get_table_class(table)
+                # Get the class corresponding to the current table
+                table_class = this_db.get_table_class(table)
 
-                    # Filter out keys that are not attributes of the table
-                    # class
-                    valid_data = {
-                        k: v for k, v in data.items() if hasattr(
-                            table_class, k)}
+                # Create the new database entries, filtering out keys that
+                # are not attributes of the table class
+                new_entries = [
+                    table_class(**{
+                        k: v for k, v in data.items() if hasattr(table_class, k)})
+                    for data in data_to_insert]
 
-                    # Create a new database entry
-                    new_entry = table_class(**valid_data)
+                # Check the unique constraints for the whole batch at once
+                crud_repo = CRUDRepository(table_class)
+                new_entries, conflicts = crud_repo.find_conflicts(db, new_entries)
+                self.report_conflicts(table, conflicts)
 
-                    # check for constraints
-                    crud_repo = CRUDRepository(table_class)
-                    if not crud_repo.check_constraints(db, new_entry):
-                        continue
-
-                    # Insert the new entry into the database
-                    CRUDRepository.create(db, new_entry)
+                # Insert the new entries into the database
+                db.add_all(new_entries)
+                db.flush()
 
             # Commit the transaction after processing all tables
             db.commit()
@@ -156,3 +172,23 @@ class DatabaseLoader:
             post_processing()
 
         log.info("%s Loaded.\n", xl_file)
+
+    @staticmethod
+    def report_conflicts(table, conflicts, max_reported=20):
+        """
+        Logs the entries of a batch skipped because they violate a unique constraint.
+
+        Args:
+            table (str): The database table.
+            conflicts (list): The (entry, columns, key) tuples returned by
+                              `CRUDRepository.find_conflicts`.
+            max_reported (int, optional): The number of conflicting keys logged.
+        """
+        if not conflicts:
+            return
+        log.warning(
+            "%d entries not inserted into %s: unique constraint violated "
+            "(displaying the first %d):",
+            len(conflicts), table, max_reported)
+        for _, columns, key in conflicts[:max_reported]:
+            log.warning("  %s", dict(zip(columns, key)))
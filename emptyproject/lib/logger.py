@@ -12,6 +12,7 @@ Functions:
 
 import logging
 import logging.config
+import multiprocessing
 import os
 
 import yaml
@@ -54,6 +55,12 @@ def setup_logging(logging_config_path=''):
                             os.path.dirname(
                                 os.path.dirname(logging_config_path))),
                         handler_config['filename']))
+                # The log directory is not part of the repository
+                os.makedirs(os.path.dirname(handler_config['filename']), exist_ok=True)
+                # A worker process re-imports the modules when it is spawned: it
+                # must append to the log files of its parent instead of truncating them
+                if multiprocessing.parent_process() is not None:
+                    handler_config['mode'] = 'a'
 
         logging.config.dictConfig(config)
     else:
@@ -5,6 +5,10 @@ Functions:
         Generates a short name by extracting all capital letters and digits from the input string.
     format_class_name(table_name):
     get_uri_str(db_type):
+    convert_to_hours(value) / convert_series_to_hours(series):
+        Convert time durations to hours, for one value or a whole column.
+    clean_number(value) / clean_numbers(series):
+        Convert numbers with thousand separators, for one value or a whole column.
 """
 
 # pylint: disable=duplicate-code
@@ -15,6 +19,13 @@ import re
 
 import pandas as pd
 
+# Duration formats understood by convert_to_hours, in the order they are tried
+_HOURS_MINUTES = r"(\d{1,2}):(\d{2})\s?h?"
+_DECIMAL_HOURS = r"(\d+)[\.,](\d+)\s*[Hh]"
+_MINUTES = r"\~*\s*(\d+)\s*[Mm]"
+_HOURS_AND_MINUTES = r"(\d+)\s*[Hh][^\d]*(\d+)s*[Mm]"
+_HOURS = r"(\d+)\s*[Hh]"
+
 
 def find_files_by_pattern(path, pattern, recursive=False):
     """
@@ -163,32 +174,32 @@ def convert_to_hours(value):
 
     # Define specific cases and regular expressions for each format
     # Case 1: format "17:45 h" or similar (hour:minute)
-    match = re.match(r"(\d{1,2}):(\d{2})\s?h?", value)
+    match = re.match(_HOURS_MINUTES, value)
     if match:
         hours = int(match.group(1))
         minutes = int(match.group(2))
         return hours + minutes / 60.0
 
     # Case 2: format "10.5 h" or "10,5 h" (decimal hours)
-    match = re.match(r"(\d+)[\.,](\d+)\s*[Hh]", value)
+    match = re.match(_DECIMAL_HOURS, value)
     if match:
-        return float(match.group(1).replace(",", "."))
+        return float(f"{match.group(1)}.{match.group(2)}")
 
     # Case 3: format "240 minuti" (only minutes)
-    match = re.match(r"\~*\s*(\d+)\s*[Mm]", value)
+    match = re.match(_MINUTES, value)
     if match:
         minutes = int(match.group(1))
         return minutes / 60.0
 
     # Case 4: format "2h 19min" (hours and minutes)
-    match = re.match(r"(\d+)\s*[Hh][^\d]*(\d+)s*[Mm]", value)
+    match = re.match(_HOURS_AND_MINUTES, value)
     if match:
         hours = int(match.group(1))
         minutes = int(match.group(2)) if match.group(2) else 0
         return hours + minutes / 60.0
 
     # Case 5: format "24heures" (hours spelled out)
-    match = re.match(r"(\d+)\s*[Hh]", value)
+    match = re.match(_HOURS, value)
     if match:
         return float(match.group(1))
 
@@ -210,3 +221,70 @@ def clean_number(value: str):
     # Remove apostrophes and convert to float
     value = value.replace("'", "")
     return float(value)
+
+
+def convert_series_to_hours(series):
+    """
+    Converts a column of time durations into floats representing hours.
+
+    This is the vectorized counterpart of `convert_to_hours`: the same formats are
+    recognized, in the same order, but each format is matched once over the whole
+    column. A numeric column is considered to be already in hours.
+
+    Args:
+        series (pd.Series): The column to convert.
+
+    Returns:
+        pd.Series: The durations in hours, NaN where the format is not recognized.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+
+    values = series.astype("string").str.strip().str.lower()
+
+    def extract(pattern):
+        return values.str.extract(f"^{pattern}").astype(float)
+
+    match = extract(_HOURS_MINUTES)
+    hours = match[0] + match[1] / 60.0
+
+    match = values.str.extract(f"^{_DECIMAL_HOURS}")
+    hours = hours.fillna((match[0] + "." + match[1]).astype(float))
+
+    match = extract(_MINUTES)
+    hours = hours.fillna(match[0] / 60.0)
+
+    match = extract(_HOURS_AND_MINUTES)
+    hours = hours.fillna(match[0] + match[1] / 60.0)
+
+    match = extract(_HOURS)
+    hours = hours.fillna(match[0])
+
+    return hours
+
+
+def clean_numbers(series, thousands="'", decimal="."):
+    """
+    Converts a column of numbers formatted as strings into floats.
+
+    This is the vectorized counterpart of `clean_number`: the thousand separators are
+    removed from the whole column at once. Values that cannot be converted become NaN.
+
+    Args:
+        series (pd.Series): The column to convert.
+        thousands (str): The characters used as thousands separators. Defaults to "'".
+        decimal (str): The decimal separator. Defaults to ".".
+
+    Returns:
+        pd.Series: The converted numbers.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+
+    values = series.astype("string").str.strip()
+    if thousands:
+        values = values.str.replace(
+            f"[{re.escape(thousands)}]", "", regex=True)
+    if decimal != ".":
+        values = values.str.replace(decimal, ".", regex=False)
+    return pd.to_numeric(values, errors="coerce").astype(float)
@@ -13,13 +13,25 @@ Dependencies:
 - ChartLabels, XlSheetWriter, XlWriter from xl.xl_writer
 """
 
-# import pandas as pd
+import pandas as pd
 from lib.db_exporter import DatabaseExporter
 # from xl.xl_pivot_writer import
 from lib.utils import get_df_from_slqalchemy_objectlist
+from shared import log
 
 # from xl.xl_writer import ChartLabels
 
+# The key of the criterion values, unique in the CriterionValues table
+CRITERION_VALUE_KEY = ["criterion_key", "dimension_1", "dimension_2"]
+# The columns of the criterion values used by the pivot writer
+PIVOT_VALUE_COLUMNS = ["criterion_key", "index", "columns", "value"]
+# The CriterionValues columns of the pivots: dimension_1 = columns, dimension_2 = rows
+PIVOT_DIMENSIONS = {
+    "dimension_2": "index",
+    "dimension_1": "columns",
+    "numeric_value": "value",
+}
+
 
 class ThisExporter(DatabaseExporter):
     """
@@ -159,31 +171,102 @@ class ThisExporter(DatabaseExporter):
             # sh.create_chart()
         # return sh
 
-    def export_generated_pivots(self):
+    def export_generated_pivots(self, max_workers=None, aggregate_in_db=False):
         """
         process formulas from pivot_information_df and create
         pivot tables
 
+        Args:
+            max_workers (int, optional): The number of threads computing the pivots.
+                                         Defaults to None (no thread).
+            aggregate_in_db (bool, optional): Whether the database aggregates the
+                                              criterion values, see `get_pivot_data`.
+        """
+        pivot_information_df, data_df = self.get_pivot_data(aggregate_in_db)
+        self.writer.add_index_sheet(pivot_information_df)
+        self.writer.create_pivot_tables(
+            data_df, pivot_information_df, max_workers=max_workers)
+
+    def export_language_reports(self, xl_files, max_workers=None, aggregate_in_db=False):
         """
+        Export the generated pivots in several languages. The pivots are computed once;
+        the report in the language of the exporter is written to its own file while the
+        other reports are rendered in parallel worker processes.
+
+        Args:
+            xl_files (dict): The path of the Excel file of each other language, keyed by
+                             language (e.g. {'de': 'report_de.xlsx', 'fr': ...}).
+            max_workers (int, optional): The number of worker processes.
+            aggregate_in_db (bool, optional): Whether the database aggregates the
+                                              criterion values, see `get_pivot_data`.
+
+        Returns:
+            list: The paths of the Excel files created by the workers.
+        """
+        pivot_information_df, data_df = self.get_pivot_data(aggregate_in_db)
+        return self.writer.create_language_reports(
+            data_df,
+            pivot_information_df,
+            xl_files,
+            language=self.language,
+            max_workers=max_workers)
+
+    def get_pivot_data(self, aggregate_in_db=False):
+        """
+        Retrieve the pivot information and the criterion values, after checking in the
+        database that the criterion values have no duplicates.
+
+        With `aggregate_in_db`, the database computes the cells of the pivots with a
+        `GROUP BY` query and only these cells are transferred. Otherwise every
+        CriterionValues row is loaded as an ORM object. Both return the columns
+        criterion_key, index (dimension_2), columns (dimension_1) and value
+        (numeric_value) used by the pivot writer.
+
+        Args:
+            aggregate_in_db (bool, optional): Whether the database aggregates the
+                                              criterion values. Defaults to False.
+
+        Returns:
+            tuple: The pivot information DataFrame and the criterion values DataFrame.
+
+        Raises:
+            ValueError: If duplicated criterion values exist.
+        """
+        # check for duplicates before transferring the values
+        duplicates = self.database.get_duplicates(
+            "CriterionValues", CRITERION_VALUE_KEY)
+        if duplicates:
+            log.error(
+                "%d duplicated rows in CriterionValues "
+                "(displaying the first 20 keys):",
+                sum(duplicate.occurrences for duplicate in duplicates))
+            for duplicate in duplicates[:20]:
+                log.error(
+                    "  %s: %d rows",
+                    dict(zip(CRITERION_VALUE_KEY, duplicate)), duplicate.occurrences)
+            raise ValueError("Duplicates exist in the data")
+
         pivot_information_df = get_df_from_slqalchemy_objectlist(
             self.database.get_all("PivotInfos")
         )
-        self.writer.add_index_sheet(pivot_information_df)
+        if aggregate_in_db:
+            data_df = pd.DataFrame.from_records(
+                self.database.get_pivot_values(
+                    "CriterionValues", "criterion_key", "dimension_2", "dimension_1",
+                    "numeric_value"),
+                columns=PIVOT_VALUE_COLUMNS)
+            return pivot_information_df, data_df
+
         data_df = get_df_from_slqalchemy_objectlist(
             self.database.get_all("CriterionValues")
         )
-
-        # check for duplicates
-        duplicated_rows = data_df[data_df.duplicated(
-            subset=["criterion_key", "dimension_1", "dimension_2"], keep=False)]
-        if not duplicated_rows.empty:
-            print("Duplicates found (displaying the first 20):")
-            print(duplicated_rows.head(20))
-            print(f"Total number of duplicates: {len(duplicated_rows)}")
-            raise ValueError("Duplicates exist in the data")
+        if data_df is None:
+            data_df = pd.DataFrame(columns=["criterion_key", *PIVOT_DIMENSIONS])
 
         data_df.columns = data_df.columns.str.strip()
-        self.writer.create_pivot_tables(data_df, pivot_information_df)
+        data_df = data_df[["criterion_key", *PIVOT_DIMENSIONS]].rename(
+            columns=PIVOT_DIMENSIONS)
+        return pivot_information_df, data_df
 
     # def export_all(self):
         # """
@@ -20,7 +20,7 @@ Usage:
 import sys
 
 import pandas as pd
-from shared import log, project
+from shared import dlog, log, project
 from xl.xl_reader import XlReader
 
 
@@ -35,16 +35,21 @@ class XlCleanReader(XlReader):
         file_path (str): The path to the Excel file containing the initial data.
     """
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, parallel=False, max_sheet_workers=None):
         """
         Initializes the XlCleanReader object with the path to the Excel file.
 
         Args:
             file_path (str): The path to the Excel file to be loaded.
+            parallel (bool, optional): Whether to parse the sheets concurrently.
+                                       Defaults to False.
+            max_sheet_workers (int, optional): The number of worker processes used when
+                                               `parallel` is True.
         """
-        super().__init__(file_path)
+        super().__init__(
+            file_path, parallel=parallel, max_sheet_workers=max_sheet_workers)
 
-    def load_data(self):
+    def load_data(self, bulk=False):
         """
         Loads data from the Excel file and inserts it into the database.
 
@@ -53,9 +58,16 @@ class XlCleanReader(XlReader):
         iterates over the rows of the sheet, creating and adding a new entry to the
         database for each row.
 
+        With `bulk=True`, each sheet is instead converted column-wise and sent to the
+        database with a single executemany insert (see `bulk_insert_sheet`).
+
         In case of an error during the insertion process, it logs the error and rolls
         back the session. The session is always closed in the `finally` block.
 
+        Args:
+            bulk (bool, optional): Whether to use the bulk insert fast path.
+                                   Defaults to False.
+
         Raises:
             Exception: If any error occurs during the data insertion process.
         """
@@ -65,6 +77,10 @@ class XlCleanReader(XlReader):
             try:
                 for sheet, df in self.df_dict.items():
                     table_class = db_instance.get_table_class(sheet)
+                    if bulk:
+                        self.bulk_insert_sheet(session, table_class, df)
+                        session.commit()
+                        continue
                     columns = [
                         col for col in df.columns if col and not col.startswith("Unnamed")]
                     for row in df.itertuples(index=False, name=None):
@@ -86,3 +102,35 @@ class XlCleanReader(XlReader):
                 "The database instance is not initialized: %s",
                 db_instance)
             sys.exit()
+
+    def bulk_insert_sheet(self, session, table_class, df):
+        """
+        Inserts all the rows of a sheet with a single Core insert.
+
+        The 'Unnamed' columns are dropped, NaN and empty strings are converted to None
+        column-wise, and the columns that do not exist in the table are ignored.
+
+        Args:
+            session (Session): The SQLAlchemy session.
+            table_class: The ORM class of the target table.
+            df (pd.DataFrame): The sheet data.
+
+        Returns:
+            int: The number of inserted rows.
+        """
+        table = table_class.__table__
+        columns = [
+            col for col in df.columns
+            if col and not str(col).startswith("Unnamed")]
+        ignored = [col for col in columns if col not in table.columns]
+        if ignored:
+            dlog.info("Columns %s ignored for table %s", ignored, table.name)
+        columns = [col for col in columns if col in table.columns]
+        if df.empty or not columns:
+            return 0
+
+        df = df[columns].astype(object)
+        df = df.where(df.notna() & (df != ""), None)
+        rows = df.to_dict(orient="records")
+        session.execute(table.insert(), rows)
+        return len(rows)
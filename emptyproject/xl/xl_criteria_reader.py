@@ -20,6 +20,8 @@ Example:
     # `data_to_insert` can then be used to insert records into a database.
 """
 
+import pandas as pd
+from xl.xl_criterion_registry import CRITERIA
 from xl.xl_reader import XlReader
 
 
@@ -33,8 +35,19 @@ class XlCriteriaReader(XlReader):
     Args:
         file_path (str): The path to the Excel file.
         match (object): Regex match object containing metadata for the file.
+        formulas (iterable, optional): The `PivotInfos` formulas using the criteria. Only
+            the criteria they reference are computed. Defaults to None (all criteria).
+        max_workers (int, optional): The size of the thread pool used for expensive
+            criteria. Defaults to None (no thread pool).
     """
 
+    registry = CRITERIA
+
+    def __init__(self, file_path, match=None, formulas=None, max_workers=None):
+        super().__init__(file_path, match)
+        self.formulas = formulas
+        self.max_workers = max_workers
+
     def cleanup_df(self, df):
         """
         Clean up the DataFrame by removing unnecessary columns.
@@ -56,9 +69,10 @@ class XlCriteriaReader(XlReader):
         """
         Load and process data from the 'Sentences' sheet in the Excel file.
 
-        This method reads data from the 'Sentences' sheet, processes the data,
-        and prepares it for insertion into a table with columns: dimension_1, dimension_2,
-        criterion_key, numeric_value, and text_value.
+        This method reads data from the 'Sentences' sheet, evaluates the registered
+        criteria over the whole sheet in one pass, and prepares the data for insertion
+        into a table with columns: dimension_1, dimension_2, criterion_key, numeric_value,
+        and text_value. Criteria not referenced by `formulas` are skipped.
 
         Returns:
             list: A list of dictionaries representing the processed data.
@@ -69,37 +83,34 @@ class XlCriteriaReader(XlReader):
 
         data = []
         try:
-            for index, row in df.iterrows():
-                sentence = row["sentence"]
-                sentence = sentence[:-32]
-                category_key = row["category_key"]
-
-                # Calculate numeric values based on the sentence
-                # Number of letters in the sentence
-                num_letters = len(sentence)
-                num_a = sum(
-                    1 for char in sentence if char.lower() == "a"
-                )  # Number of 'a' or 'A'
-                # Number of words in the sentence
-                num_words = len(sentence.split())
-
-                # Prepare entries for each criterion
-                criteria = [
-                    {"criterion_key": "C_1", "numeric_value": num_letters},
-                    {"criterion_key": "C_2", "numeric_value": num_a},
-                    {"criterion_key": "C_3", "numeric_value": num_words},
-                ]
-
-                # Populate new entries for each criterion
-                for criterion in criteria:
-                    new_entry = {
-                        "dimension_1": f"S_{(index + 1):02}",
-                        "dimension_2": category_key,
-                        "criterion_key": criterion["criterion_key"],
-                        "numeric_value": criterion["numeric_value"],
-                        "text_value": sentence,
-                    }
-                    data.append(new_entry)
+            df = pd.DataFrame({
+                "sentence": df["sentence"].str[:-32],
+                "category_key": df["category_key"],
+            })
+            criteria = self.registry.select(self.formulas)
+            values = self.registry.evaluate(
+                df, criteria, max_workers=self.max_workers)
+
+            dimension_1 = [f"S_{(index + 1):02}" for index in df.index]
+            frames = []
+            for order, criterion in enumerate(criteria):
+                frames.append(pd.DataFrame({
+                    "dimension_1": dimension_1,
+                    "dimension_2": df["category_key"].to_numpy(),
+                    "criterion_key": criterion.key,
+                    "numeric_value": values[criterion.key].to_numpy(),
+                    "text_value": (df["sentence"].to_numpy()
+                                   if criterion.text_value else None),
+                    "_row": range(len(df)),
+                    "_order": order,
+                }))
+
+            if frames:
+                # Keep the row by row, criterion by criterion order of the entries
+                entries = pd.concat(frames, ignore_index=True).sort_values(
+                    ["_row", "_order"], kind="stable")
+                data = entries.drop(columns=["_row", "_order"]).to_dict(
+                    orient="records")
 
         except KeyError as e:
             print(f"KeyError: {e} not found in the row")
@@ -0,0 +1,140 @@
+"""
+This module provides the pivots of the values of all the criteria of an export, on
+which the formulas of the pivots (see `xl.xl_formula`) are evaluated.
+
+The pivots are built in one pass over the data into a 3-D array (criterion, index,
+column) aligned on the sorted index values and the columns of all the criteria: a
+formula is evaluated on slices of the array, without any per-criterion DataFrame.
+
+Classes:
+    - CriterionPivots: The pivots of all the criteria, built in one pass.
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+
+class CriterionPivots(Mapping):
+    """
+    The pivots (index x columns) of the values of all the criteria, built in one pass
+    over the data into a 3-D array aligned on the sorted index values and the columns of
+    all the criteria.
+
+    It is a mapping from each criterion to its pivot DataFrame, equal to
+    `data_df[data_df["criterion_key"] == criterion].pivot(...)` reindexed on all the
+    columns: the rows are the index values of the criterion, a missing cell of an
+    existing column is NaN and a column absent from the criterion is 0. The DataFrames
+    are created on first access; `aligned_values` gives the array of a criterion on the
+    rows of another one without creating any DataFrame.
+
+    Args:
+        data_df (DataFrame): The data, with the columns criterion_key, index, columns
+                             and value.
+        criteria (iterable, optional): The criteria to pivot. Defaults to all. The
+                                       columns are those of all the criteria anyway.
+
+    Attributes:
+        index (pd.Index): The sorted index values of all the criteria.
+        columns (pd.Index): The columns of all the criteria, in order of appearance.
+
+    Raises:
+        ValueError: If a criterion has several values for an index and a column.
+    """
+
+    def __init__(self, data_df, criteria=None):
+        column_codes, columns = pd.factorize(
+            data_df["columns"], use_na_sentinel=False)
+        if criteria is not None:
+            selected = data_df["criterion_key"].isin(list(criteria)).to_numpy()
+            data_df = data_df[selected]
+            column_codes = column_codes[selected]
+        criterion_codes, criteria = pd.factorize(
+            data_df["criterion_key"], use_na_sentinel=False)
+        index_codes, index = pd.factorize(
+            data_df["index"], sort=True, use_na_sentinel=False)
+        shape = (len(criteria), len(index), len(columns))
+
+        cells = np.ravel_multi_index(
+            (criterion_codes, index_codes, column_codes), shape)
+        if len(np.unique(cells)) != len(cells):
+            raise ValueError("Index contains duplicate entries, cannot reshape")
+
+        values = np.full(shape, np.nan)
+        values.flat[cells] = data_df["value"].to_numpy(dtype=float)
+        self._rows = np.zeros(shape[:2], dtype=bool)
+        self._rows[criterion_codes, index_codes] = True
+        has_column = np.zeros((shape[0], shape[2]), dtype=bool)
+        has_column[criterion_codes, column_codes] = True
+        # a missing cell is NaN in the columns of the criterion, 0 elsewhere
+        self._values = np.where(
+            self._rows[:, :, None] & has_column[:, None, :], values, 0.0)
+
+        # the position of a criterion in the arrays is its position in the index
+        self._criteria = pd.Index(criteria)
+        self.index = pd.Index(index, name="index")
+        self.columns = pd.Index(columns, name="columns")
+        self._dtype = data_df["value"].dtype
+        self._frames = {}
+
+    @property
+    def criteria(self):
+        """
+        np.ndarray: The pivoted criteria, in order of appearance.
+        """
+        return self._criteria.to_numpy()
+
+    def __getitem__(self, criterion):
+        if criterion not in self._frames:
+            code = self._criteria.get_loc(criterion)
+            rows = self._rows[code]
+            self._frames[criterion] = pd.DataFrame(
+                self._typed(self._values[code][rows]),
+                index=self.index[rows],
+                columns=self.columns)
+        return self._frames[criterion]
+
+    def __contains__(self, criterion):
+        return criterion in self._criteria
+
+    def __iter__(self):
+        return iter(self._criteria)
+
+    def __len__(self):
+        return len(self._criteria)
+
+    def index_of(self, criterion):
+        """
+        Returns the index values of a criterion, which are the rows of its pivot.
+
+        Args:
+            criterion (str): The criterion key.
+
+        Returns:
+            pd.Index: The sorted index values.
+        """
+        return self.index[self._rows[self._criteria.get_loc(criterion)]]
+
+    def aligned_values(self, criterion, on):
+        """
+        Returns the values of a criterion on the rows of the pivot of another criterion;
+        the rows missing from the criterion are 0.
+
+        Args:
+            criterion (str): The criterion key.
+            on (str): The criterion key giving the rows.
+
+        Returns:
+            np.ndarray: The 2-D array of values (rows of `on` x all the columns).
+        """
+        rows = self._rows[self._criteria.get_loc(on)]
+        return self._typed(self._values[self._criteria.get_loc(criterion)][rows])
+
+    def _typed(self, values):
+        """
+        Casts the values back to the integer type of the data, if they have no NaN.
+        """
+        if pd.api.types.is_integer_dtype(self._dtype) and not np.isnan(values).any():
+            return values.astype(self._dtype)
+        return values
@@ -0,0 +1,223 @@
+"""
+This module provides a registry of criteria computed by the criteria readers.
+
+Each criterion maps a key (as referenced by the `PivotInfos` formulas) to a vectorized
+function evaluated over a whole cleaned column or DataFrame at once, together with the
+metadata needed to build the `CriterionValues` entries.
+
+Classes:
+    Criterion: A dataclass describing one registered criterion.
+    CriterionRegistry: A registry holding criteria and evaluating them in one pass.
+
+Functions:
+    find_referenced_criteria(formulas): Returns the criterion keys used in a list of formulas.
+
+Usage:
+    @CRITERIA.register("C_4", column="sentence")
+    def count_commas(sentences):
+        return sentences.str.count(",")
+
+    values = CRITERIA.evaluate(df, CRITERIA.select(formulas))
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import pandas as pd
+
+
+@dataclass
+class Criterion:
+    """
+    A dataclass describing a registered criterion.
+
+    Attributes:
+        key (str): The criterion key as used in the formulas (e.g. 'C_1').
+        func (Callable): The vectorized function computing the criterion. It receives the
+            column named by `column`, or the whole DataFrame if `column` is None, and
+            returns a Series aligned on the DataFrame index.
+        column (str): The column passed to `func`. Defaults to None (whole DataFrame).
+        dtype (str): The dtype of the computed values. Defaults to 'float64'.
+        text_value (bool): Whether the entries of this criterion carry a text_value.
+        expensive (bool): Whether the criterion may be evaluated in a thread pool.
+    """
+
+    key: str
+    func: Callable
+    column: Optional[str] = None
+    dtype: str = "float64"
+    text_value: bool = True
+    expensive: bool = False
+
+
+def find_referenced_criteria(formulas):
+    """
+    Returns the criterion keys referenced in a list of formulas.
+
+    Args:
+        formulas (iterable): The formulas to scan. Missing values are ignored.
+
+    Returns:
+        set: The names used as operands in the formulas.
+    """
+    referenced = set()
+    for formula in formulas:
+        if pd.isna(formula):
+            continue
+        referenced.update(
+            token for token in re.findall(r"[\w.]+", str(formula))
+            if re.match(r"^[a-zA-Z]", token))
+    return referenced
+
+
+class CriterionRegistry:
+    """
+    A registry of criteria, keyed by criterion key and kept in registration order.
+    """
+
+    def __init__(self):
+        self._criteria = {}
+
+    def add(self, criterion):
+        """
+        Adds a criterion to the registry, replacing any criterion with the same key.
+
+        Args:
+            criterion (Criterion): The criterion to add.
+        """
+        self._criteria[criterion.key] = criterion
+
+    # pylint: disable=too-many-arguments
+    def register(
+            self,
+            key,
+            column=None,
+            dtype="float64",
+            text_value=True,
+            expensive=False):
+        """
+        Decorator registering a vectorized function as a criterion.
+
+        Args:
+            key (str): The criterion key.
+            column (str, optional): The column passed to the function.
+            dtype (str, optional): The dtype of the computed values.
+            text_value (bool, optional): Whether the entries carry a text_value.
+            expensive (bool, optional): Whether the criterion may run in a thread pool.
+
+        Returns:
+            Callable: The decorator, which returns the function unchanged.
+        """
+        def decorator(func):
+            self.add(Criterion(key, func, column, dtype, text_value, expensive))
+            return func
+        return decorator
+
+    def get(self, key):
+        """
+        Retrieves a criterion by key.
+
+        Args:
+            key (str): The criterion key.
+
+        Returns:
+            Criterion: The criterion, or None if the key is not registered.
+        """
+        return self._criteria.get(key)
+
+    def keys(self):
+        """
+        Returns the registered criterion keys in registration order.
+
+        Returns:
+            list: The criterion keys.
+        """
+        return list(self._criteria)
+
+    def __contains__(self, key):
+        return key in self._criteria
+
+    def __iter__(self):
+        return iter(self._criteria.values())
+
+    def __len__(self):
+        return len(self._criteria)
+
+    def select(self, formulas=None):
+        """
+        Selects the criteria needed by a list of formulas.
+
+        Args:
+            formulas (iterable, optional): The formulas that will use the criteria. If None,
+                all registered criteria are selected.
+
+        Returns:
+            list: The selected criteria in registration order.
+        """
+        if formulas is None:
+            return list(self)
+        referenced = find_referenced_criteria(formulas)
+        return [criterion for criterion in self if criterion.key in referenced]
+
+    def evaluate(self, df, criteria=None, max_workers=None):
+        """
+        Evaluates criteria over a cleaned DataFrame in one pass.
+
+        Cheap criteria are evaluated inline. Criteria flagged as expensive are submitted
+        to a thread pool when `max_workers` is given.
+
+        Args:
+            df (pd.DataFrame): The cleaned DataFrame.
+            criteria (list, optional): The criteria to evaluate. Defaults to all.
+            max_workers (int, optional): The size of the thread pool for expensive criteria.
+
+        Returns:
+            dict: The computed Series, keyed by criterion key, in the order of `criteria`.
+        """
+        if criteria is None:
+            criteria = list(self)
+
+        def compute(criterion):
+            data = df if criterion.column is None else df[criterion.column]
+            return pd.Series(criterion.func(data), index=df.index).astype(
+                criterion.dtype)
+
+        results = {}
+        expensive = [c for c in criteria if c.expensive] if max_workers else []
+        if expensive:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {c.key: executor.submit(compute, c) for c in expensive}
+                for criterion in criteria:
+                    if criterion.key not in futures:
+                        results[criterion.key] = compute(criterion)
+                for key, future in futures.items():
+                    results[key] = future.result()
+        else:
+            for criterion in criteria:
+                results[criterion.key] = compute(criterion)
+
+        return {criterion.key: results[criterion.key] for criterion in criteria}
+
+
+# Default registry used by XlCriteriaReader
+CRITERIA = CriterionRegistry()
+
+
+@CRITERIA.register("C_1", column="sentence", dtype="int64")
+def count_letters(sentences):
+    """Number of letters in the sentence."""
+    return sentences.str.len()
+
+
+@CRITERIA.register("C_2", column="sentence", dtype="int64")
+def count_a(sentences):
+    """Number of 'a' or 'A' in the sentence."""
+    return sentences.str.lower().str.count("a")
+
+
+@CRITERIA.register("C_3", column="sentence", dtype="int64")
+def count_words(sentences):
+    """Number of words in the sentence."""
+    return sentences.str.split().str.len()
@@ -0,0 +1,666 @@
+"""
+This module provides the engines used by `XlWriter` to write and format Excel files.
+
+An engine implements the worksheet operations of `XlSheetWriter` and `XlChartWriter`
+(column widths, styles, print settings, header/footer, rows appended after the data,
+charts, tables, custom document properties) for one backend of `pd.ExcelWriter`:
+    - 'openpyxl': the default, which allows to read back, rename and reorder the sheets.
+    - 'xlsxwriter': a write-only backend, several times faster on large sheets.
+
+Both engines produce equivalent workbooks. Rows and columns are numbered from 1, as in
+openpyxl, whatever the engine.
+
+Classes:
+    - OpenpyxlEngine: The worksheet operations implemented with openpyxl.
+    - XlsxWriterEngine: The worksheet operations implemented with XlsxWriter.
+
+Functions:
+    - register_named_styles(workbook): Registers the named styles in an openpyxl workbook.
+    - set_cell_style(cell, style_name): Applies a named style to an openpyxl cell.
+    - get_table_name(sheet_name, used_names): Returns a valid, unique Excel table name.
+    - get_engine(book): Returns the engine matching the workbook of a `pd.ExcelWriter`.
+"""
+
+import datetime
+import math
+import re
+from copy import copy
+
+import openpyxl
+import pandas as pd
+from openpyxl.chart import LineChart, Reference, Series
+from openpyxl.chart.axis import ChartLines
+from openpyxl.chart.layout import Layout, ManualLayout
+from openpyxl.packaging.custom import StringProperty
+from openpyxl.styles import Alignment, Border, NamedStyle, PatternFill, Side
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.table import Table, TableStyleInfo
+from openpyxl.worksheet.worksheet import Worksheet
+
+# Names of the workbook styles used by XlSheetWriter.format_worksheet
+HEADER_STYLE = "XlWriter Header"
+FIRST_COLUMN_STYLE = "XlWriter First Column"
+BODY_STYLE = "XlWriter Body"
+
+# Default style of the tables created by XlSheetWriter.format_as_table
+TABLE_STYLE = "TableStyleMedium2"
+
+# Names of the engines
+ENGINE_OPENPYXL = "openpyxl"
+ENGINE_XLSXWRITER = "xlsxwriter"
+ENGINES = (ENGINE_OPENPYXL, ENGINE_XLSXWRITER)
+
+# Size of the charts, in points (1/72 inch)
+CHART_WIDTH = 1300
+CHART_HEIGHT = 800
+
+# Number formats of the dates written by pandas with XlsxWriter (pandas defaults)
+DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"
+DATE_FORMAT = "YYYY-MM-DD"
+
+
+def register_named_styles(workbook):
+    """
+    Registers the named styles used to format the worksheets in a workbook.
+
+    The styles are registered once per workbook; cells then only reference them by name
+    instead of each carrying its own border, font, fill and alignment objects.
+
+    Args:
+        workbook (openpyxl.Workbook): The workbook to register the styles in.
+    """
+    if HEADER_STYLE in workbook.style_names:
+        return
+
+    thin = Side(style="thin")
+    medium = Side(style="medium")
+    header_font = copy(DEFAULT_FONT)
+    header_font.b = True
+    header_fill = PatternFill(
+        start_color="FFE7E6E6", end_color="FFE7E6E6", fill_type="solid"
+    )
+    medium_border = Border(left=medium, right=medium, top=medium, bottom=medium)
+
+    workbook.add_named_style(NamedStyle(
+        name=HEADER_STYLE,
+        font=header_font,
+        fill=header_fill,
+        border=medium_border,
+        alignment=Alignment(horizontal="center"),
+    ))
+    workbook.add_named_style(NamedStyle(
+        name=FIRST_COLUMN_STYLE,
+        font=copy(header_font),
+        fill=copy(header_fill),
+        border=copy(medium_border),
+        alignment=Alignment(horizontal="left"),
+    ))
+    workbook.add_named_style(NamedStyle(
+        name=BODY_STYLE,
+        font=copy(DEFAULT_FONT),
+        border=Border(left=thin, right=thin, top=thin, bottom=thin),
+    ))
+
+
+def set_cell_style(cell, style_name):
+    """
+    Applies a named style to a cell, keeping its number format.
+
+    Args:
+        cell (openpyxl.cell.Cell): The cell to style.
+        style_name (str): The name of a style registered in the workbook.
+    """
+    number_format = cell.number_format
+    cell.style = style_name
+    if number_format != "General":
+        cell.number_format = number_format
+
+
+def get_table_name(sheet_name, used_names):
+    """
+    Returns a valid Excel table name derived from a sheet name: the characters other
+    than letters, digits and underscores are replaced by underscores, and the name is
+    prefixed so that it never starts with a digit or reads as a cell reference.
+
+    Args:
+        sheet_name (str): The name of the sheet of the table.
+        used_names (set): The table names already used in the workbook. The returned
+                          name is added to it.
+
+    Returns:
+        str: A table name, unique in the workbook.
+    """
+    base = "Table_" + re.sub(r"\W", "_", sheet_name)
+    name = base
+    suffix = 2
+    while name.lower() in used_names:
+        name = f"{base}_{suffix}"
+        suffix += 1
+    used_names.add(name.lower())
+    return name
+
+
+class OpenpyxlEngine:
+    """
+    The worksheet operations of the writers implemented with openpyxl.
+
+    Args:
+        book (openpyxl.Workbook): The workbook of the writer.
+    """
+
+    name = ENGINE_OPENPYXL
+
+    def __init__(self, book):
+        self.book = book
+
+    def get_worksheet(self, sheet_name, df=None):
+        """
+        Returns the worksheet of a sheet written by `pd.DataFrame.to_excel`. openpyxl
+        reads the cells back: the DataFrame of the sheet is not recorded.
+        """
+        _ = df
+        return self.book[sheet_name]
+
+    def max_row(self, ws):
+        """
+        Returns the index of the last row of a worksheet.
+        """
+        return ws.max_row
+
+    def max_column(self, ws):
+        """
+        Returns the index of the last column of a worksheet.
+        """
+        return ws.max_column
+
+    def scan_column_widths(self, ws):
+        """
+        Returns the width of each column of a worksheet, computed from its cells.
+        """
+        return [
+            max((len(str(cell.value)) for cell in column_cells), default=0)
+            for column_cells in ws.columns]
+
+    def set_column_width(self, ws, column, width):
+        """
+        Sets the width of a column.
+        """
+        ws.column_dimensions[get_column_letter(column)].width = width
+
+    def register_styles(self):
+        """
+        Registers the named styles in the workbook.
+        """
+        register_named_styles(self.book)
+
+    # pylint: disable=too-many-arguments
+    def apply_style(self, ws, style_name, min_row, min_col, max_row, max_col):
+        """
+        Applies a named style to a range of cells, keeping their number format.
+        """
+        for row in ws.iter_rows(
+                min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
+            for cell in row:
+                set_cell_style(cell, style_name)
+
+    def write_row(self, ws, row, values, results=None):
+        """
+        Writes values, or formulas starting with '=', to a row from the first column.
+        openpyxl cannot store the computed results of the formulas: they are ignored,
+        and Excel computes the formulas when the workbook is opened.
+        """
+        _ = results
+        for column, value in enumerate(values, 1):
+            ws.cell(row=row, column=column, value=value)
+
+    # pylint: disable=too-many-arguments
+    def add_table(self, ws, sheet_name, headers, max_row, style_name):
+        """
+        Declares the range from A1 as a table with a table style, which renders the
+        header, the first column and the banded rows. The header cells are rewritten as
+        plain strings, as required by Excel.
+        """
+        for column, header in enumerate(headers, 1):
+            cell = ws.cell(row=1, column=column, value=header)
+            cell.style = "Normal"
+        # the workbook may have been loaded with tables (see XlWriter update mode)
+        used_names = {
+            name.lower() for worksheet in self.book.worksheets
+            for name in worksheet.tables}
+        table = Table(
+            displayName=get_table_name(sheet_name, used_names),
+            ref=f"A1:{get_column_letter(len(headers))}{max_row}")
+        table.tableStyleInfo = TableStyleInfo(
+            name=style_name,
+            showFirstColumn=True,
+            showLastColumn=False,
+            showRowStripes=True,
+            showColumnStripes=False)
+        ws.add_table(table)
+
+    def get_custom_properties(self):
+        """
+        Returns the custom document properties of the workbook, by name.
+        """
+        return {prop.name: prop.value for prop in self.book.custom_doc_props.props}
+
+    def set_custom_property(self, name, value):
+        """
+        Sets a string custom document property, replacing the property of the same name;
+        a None value removes the property.
+        """
+        props = self.book.custom_doc_props
+        props.props = [prop for prop in props.props if prop.name != name]
+        if value is not None:
+            props.append(StringProperty(name=name, value=value))
+
+    def set_page_setup(self, ws, portrait, fit_to_width, fit_to_height):
+        """
+        Sets the A4 paper size, the orientation, the fit-to-page settings and the margins.
+        """
+        ws.page_setup.paperSize = Worksheet.PAPERSIZE_A4
+        ws.page_setup.orientation = (
+            Worksheet.ORIENTATION_PORTRAIT if portrait else Worksheet.ORIENTATION_LANDSCAPE)
+        ws.page_setup.fitToPage = True
+        ws.page_setup.fitToWidth = fit_to_width
+        ws.page_setup.fitToHeight = fit_to_height
+        ws.page_margins.left = 1
+        ws.page_margins.right = 1
+        ws.page_margins.top = 1.5
+        ws.page_margins.bottom = 1.0
+        ws.page_margins.header = 0.3
+        ws.page_margins.footer = 0.3
+
+    def set_header_and_footer(self, ws, header_text, footer_text):
+        """
+        Sets the header and the footer of the odd and even pages.
+        """
+        ws.oddHeader.center.text = header_text
+        ws.oddFooter.center.text = footer_text
+        ws.evenHeader.center.text = header_text
+        ws.evenFooter.center.text = footer_text
+
+    def create_chart(self, labels):
+        """
+        Creates a line chart with a title and axis labels.
+        """
+        chart = LineChart()
+        chart.title = labels.title
+        chart.style = 10
+        chart.x_axis.title = labels.x_label
+        chart.y_axis.title = labels.y_label
+        return chart
+
+    def add_row_series(self, chart, data_ws, min_row, max_row, max_col):
+        """
+        Adds the rows of a range as series in one call; the first column gives the
+        titles of the series.
+        """
+        first_series = len(chart.series)
+        values = Reference(
+            data_ws, min_col=1, min_row=min_row, max_row=max_row, max_col=max_col)
+        chart.add_data(values, from_rows=True, titles_from_data=True)
+        for series in chart.series[first_series:]:
+            series.smooth = False
+
+    def add_series(self, chart, data_ws, row, max_col, title):
+        """
+        Adds one row, from the second column, as a series with a given title.
+        """
+        values = Reference(
+            data_ws, min_col=2, min_row=row, max_row=row, max_col=max_col)
+        series = Series(values, title=title)
+        series.smooth = False
+        chart.series.append(series)
+
+    def set_categories(self, chart, data_ws, max_col):
+        """
+        Sets the header row, from the second column, as categories of all the series.
+        """
+        categories = Reference(
+            data_ws, min_col=2, min_row=1, max_row=1, max_col=max_col)
+        chart.set_categories(categories)
+
+    def format_chart(self, chart, labels):
+        """
+        Applies the size, layout and axis settings of the charts.
+        """
+        _ = labels  # the labels are set when the chart is created
+        chart.width = CHART_WIDTH / 72 * 2.54
+        chart.height = CHART_HEIGHT / 72 * 2.54
+
+        chart.y_axis.majorGridlines = ChartLines()
+        chart.y_axis.minorGridlines = ChartLines()
+        chart.y_axis.minorTickMark = "out"
+
+        chart.x_axis.minorGridlines = ChartLines()
+        chart.x_axis.minorTickMark = "out"
+        chart.x_axis.tickLblPos = "low"
+        chart.y_axis.tickLblPos = "low"
+
+        chart.x_axis.number_format = "General"
+        chart.y_axis.number_format = "General"
+
+        chart.x_axis.tickLblSkip = 1
+        chart.y_axis.tickLblSkip = 1
+
+        chart.layout = Layout(
+            manualLayout=ManualLayout(x=0.005, y=0.005, h=0.90, w=0.85)
+        )
+
+    def insert_chart(self, ws, chart):
+        """
+        Inserts a chart in a worksheet at A1.
+        """
+        ws.add_chart(chart, "A1")
+
+
+class XlsxWriterEngine:
+    """
+    The worksheet operations of the writers implemented with XlsxWriter.
+
+    XlsxWriter cannot read back a workbook: the engine records the DataFrame written by
+    pandas and the rows it writes in each worksheet, which give the size of the sheet,
+    and restyles cells by writing their values again with a format.
+
+    Args:
+        book (xlsxwriter.Workbook): The workbook of the writer.
+    """
+
+    name = ENGINE_XLSXWRITER
+
+    # Equivalents of the named styles registered by register_named_styles
+    STYLES = {
+        HEADER_STYLE: {
+            "bold": True, "bg_color": "#E7E6E6", "border": 2, "align": "center"},
+        FIRST_COLUMN_STYLE: {
+            "bold": True, "bg_color": "#E7E6E6", "border": 2, "align": "left"},
+        BODY_STYLE: {"border": 1},
+    }
+
+    def __init__(self, book):
+        self.book = book
+        self._formats = {}
+        self._table_names = set()
+        # the DataFrame and the appended rows (values, results) of each worksheet
+        self._data = {}
+
+    def get_worksheet(self, sheet_name, df=None):
+        """
+        Returns the worksheet of a sheet written by `pd.DataFrame.to_excel`, and records
+        the DataFrame written by pandas from A1 with its header.
+        """
+        ws = self.book.get_worksheet_by_name(sheet_name)
+        if df is not None:
+            self._get_data(ws)["df"] = df
+        return ws
+
+    def _get_data(self, ws):
+        """
+        Returns the recorded data of a worksheet.
+        """
+        return self._data.setdefault(
+            ws.get_name(), {"df": pd.DataFrame(), "rows": {}})
+
+    def max_row(self, ws):
+        """
+        Returns the index of the last row of a worksheet.
+        """
+        data = self._get_data(ws)
+        df_rows = len(data["df"]) + 1 if len(data["df"].columns) else 0
+        return max([df_rows, *data["rows"]])
+
+    def max_column(self, ws):
+        """
+        Returns the index of the last column of a worksheet.
+        """
+        data = self._get_data(ws)
+        return max([len(data["df"].columns)] + [
+            len(values) for values, _ in data["rows"].values()])
+
+    def _get_rows(self, ws, min_row, max_row):
+        """
+        Returns the recorded rows of a worksheet between two rows.
+
+        Returns:
+            dict: The (values, results) of each recorded row, numbered from 1.
+        """
+        data = self._get_data(ws)
+        df = data["df"]
+        rows = {}
+        if len(df.columns):
+            rows[1] = (df.columns.tolist(), None)
+            first, last = max(min_row, 2), min(max_row, len(df) + 1)
+            if first <= last:
+                block = df.iloc[first - 2:last - 1].astype(object).to_numpy().tolist()
+                rows.update(
+                    (row, (values, None))
+                    for row, values in zip(range(first, last + 1), block))
+        rows.update(data["rows"])
+        return rows
+
+    def scan_column_widths(self, ws):
+        """
+        XlsxWriter cells cannot be read back: no width is computed.
+        """
+        _ = ws
+        return []
+
+    def set_column_width(self, ws, column, width):
+        """
+        Sets the width of a column.
+        """
+        ws.set_column(column - 1, column - 1, width)
+
+    def register_styles(self):
+        """
+        The formats are created on first use.
+        """
+
+    def _get_format(self, style_name, num_format=0):
+        """
+        Returns the format of a style combined with a number format, created once.
+
+        Args:
+            style_name (str): The name of the style, or None for the number format only.
+            num_format (str | int): The number format. Defaults to 0 (General).
+
+        Returns:
+            xlsxwriter.format.Format: The format.
+        """
+        key = (style_name, num_format)
+        if key not in self._formats:
+            properties = dict(self.STYLES[style_name]) if style_name else {}
+            if num_format:
+                properties["num_format"] = num_format
+            self._formats[key] = self.book.add_format(properties)
+        return self._formats[key]
+
+    # pylint: disable=too-many-arguments
+    def apply_style(self, ws, style_name, min_row, min_col, max_row, max_col):
+        """
+        Applies a style to a range of cells by writing their values again with the
+        format of the style. The dates keep their number format, the empty cells of the
+        range are written as blank cells with the style.
+        """
+        rows = self._get_rows(ws, min_row, max_row)
+        for row in range(min_row, max_row + 1):
+            values, results = rows.get(row, ([], None))
+            for col in range(min_col, max_col + 1):
+                value = values[col - 1] if col <= len(values) else None
+                result = results[col - 1] if results and col <= len(results) else None
+                self._write_cell(ws, (row, col), value, result, style_name)
+
+    # pylint: disable=too-many-arguments
+    def _write_cell(self, ws, cell, value, result=None, style_name=None):
+        """
+        Writes a value as pandas does: missing values as blank cells, infinite numbers
+        as 'inf', dates with a date number format, strings starting with '=' as
+        formulas, cached with their result if any.
+
+        Args:
+            ws (xlsxwriter.worksheet.Worksheet): The worksheet.
+            cell (tuple): The row and the column of the cell, from 1.
+            value: The value of the cell.
+            result (optional): The computed result of a formula.
+            style_name (str, optional): The name of the style of the cell.
+        """
+        row, col = cell
+        num_format = 0
+        if isinstance(value, datetime.datetime):
+            num_format = DATETIME_FORMAT
+        elif isinstance(value, datetime.date):
+            num_format = DATE_FORMAT
+        cell_format = None
+        if style_name is not None or num_format:
+            cell_format = self._get_format(style_name, num_format)
+
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            if cell_format is not None:
+                ws.write_blank(row - 1, col - 1, None, cell_format)
+        elif isinstance(value, float) and math.isinf(value):
+            ws.write_string(row - 1, col - 1, "inf" if value > 0 else "-inf", cell_format)
+        elif result is not None and isinstance(value, str) and value.startswith("="):
+            ws.write_formula(row - 1, col - 1, value, cell_format, result)
+        else:
+            ws.write(row - 1, col - 1, value, cell_format)
+
+    def write_row(self, ws, row, values, results=None):
+        """
+        Writes values, or formulas starting with '=', to a row from the first column.
+        The results, aligned with the values, are cached with the formulas.
+        """
+        self._get_data(ws)["rows"][row] = (list(values), results)
+        for column, value in enumerate(values, 1):
+            result = results[column - 1] if results is not None else None
+            self._write_cell(ws, (row, column), value, result)
+
+    # pylint: disable=too-many-arguments
+    def add_table(self, ws, sheet_name, headers, max_row, style_name):
+        """
+        Declares the range from A1 as a table with a table style, which renders the
+        header, the first column and the banded rows. XlsxWriter rewrites the header
+        cells, without format, from the column headers.
+        """
+        ws.add_table(0, 0, max_row - 1, len(headers) - 1, {
+            "name": get_table_name(sheet_name, self._table_names),
+            "style": style_name,
+            "first_column": True,
+            "banded_rows": True,
+            "columns": [{"header": header} for header in headers],
+        })
+
+    def get_custom_properties(self):
+        """
+        XlsxWriter only creates workbooks: there is no property to read.
+        """
+        return {}
+
+    def set_custom_property(self, name, value):
+        """
+        Sets a string custom document property; a None value sets nothing, the workbook
+        being new.
+        """
+        if value is not None:
+            self.book.set_custom_property(name, value)
+
+    def set_page_setup(self, ws, portrait, fit_to_width, fit_to_height):
+        """
+        Sets the A4 paper size, the orientation, the fit-to-page settings and the margins.
+        """
+        ws.set_paper(9)  # A4
+        if portrait:
+            ws.set_portrait()
+        else:
+            ws.set_landscape()
+        ws.fit_to_pages(fit_to_width, fit_to_height)
+        ws.set_margins(left=1, right=1, top=1.5, bottom=1.0)
+
+    def set_header_and_footer(self, ws, header_text, footer_text):
+        """
+        Sets the header and the footer of the pages.
+        """
+        ws.set_header(header_text, {"margin": 0.3})
+        ws.set_footer(footer_text, {"margin": 0.3})
+
+    def create_chart(self, labels):
+        """
+        Creates a line chart with a title. The axis labels are set by `format_chart`,
+        since XlsxWriter sets all the options of an axis at once.
+        """
+        chart = self.book.add_chart({"type": "line"})
+        chart.set_title({"name": labels.title})
+        chart.set_style(10)
+        return chart
+
+    def add_row_series(self, chart, data_ws, min_row, max_row, max_col):
+        """
+        Adds the rows of a range as series; the first column gives the titles of the series.
+        """
+        for row in range(min_row, max_row + 1):
+            self.add_series(chart, data_ws, row, max_col, [data_ws.name, row - 1, 0])
+
+    def add_series(self, chart, data_ws, row, max_col, title):
+        """
+        Adds one row, from the second column, as a series with a given title. The
+        categories are the header row of the data worksheet.
+        """
+        chart.add_series({
+            "name": title,
+            "categories": [data_ws.name, 0, 1, 0, max_col - 1],
+            "values": [data_ws.name, row - 1, 1, row - 1, max_col - 1],
+            "smooth": False,
+        })
+
+    def set_categories(self, chart, data_ws, max_col):
+        """
+        The categories are set with each series by `add_series`.
+        """
+        _ = chart, data_ws, max_col
+
+    def format_chart(self, chart, labels):
+        """
+        Applies the size, layout, axis labels and axis settings of the charts.
+        """
+        # points to pixels at 96 dpi
+        chart.set_size({
+            "width": CHART_WIDTH / 72 * 96, "height": CHART_HEIGHT / 72 * 96})
+        axis = {
+            "minor_gridlines": {"visible": True},
+            "minor_tick_mark": "outside",
+            "label_position": "low",
+            "num_format": "General",
+        }
+        chart.set_x_axis({**axis, "name": labels.x_label, "interval_unit": 1})
+        chart.set_y_axis({
+            **axis, "name": labels.y_label, "major_gridlines": {"visible": True}})
+        chart.set_plotarea({
+            "layout": {"x": 0.005, "y": 0.005, "width": 0.85, "height": 0.90}})
+
+    def insert_chart(self, ws, chart):
+        """
+        Inserts a chart in a worksheet at A1.
+        """
+        ws.insert_chart("A1", chart)
+
+
+def get_engine(book):
+    """
+    Returns the engine matching the workbook of a `pd.ExcelWriter`.
+
+    Args:
+        book: The workbook of the writer (openpyxl or XlsxWriter).
+
+    Returns:
+        OpenpyxlEngine | XlsxWriterEngine: The engine.
+
+    Raises:
+        NotImplementedError: If the workbook belongs to another backend.
+    """
+    if isinstance(book, openpyxl.Workbook):
+        return OpenpyxlEngine(book)
+    if type(book).__module__.startswith("xlsxwriter"):
+        return XlsxWriterEngine(book)
+    raise NotImplementedError(
+        "This operation is only supported with openpyxl or xlsxwriter.")
@@ -0,0 +1,486 @@
+"""
+This module provides a compiler for the formulas of the pivots (`PivotInfos.formula`).
+
+A formula combines criterion names and numbers with the operators + - * /, unary minus
+and parentheses, e.g. `(criterion_1 + criterion_2) / 2`. It is parsed once into an
+abstract syntax tree, which is then evaluated over whole arrays with NumPy instead of
+once per cell:
+    - a criterion is resolved to the array of its values, or to 0 if it is missing;
+    - NaN values propagate to the result;
+    - a division by zero gives NaN.
+
+The formulas are never passed to `eval`: only this grammar is accepted, and a formula
+that does not match it raises a FormulaSyntaxError when it is compiled. The compiled
+formulas are cached by formula string.
+
+A `FormulaPlan` evaluates the formulas of an export together: the subexpressions
+shared by several formulas (e.g. `C_1/C_3` in several ratios, or `b + a` and `a + b`)
+are evaluated once and reused, and the referenced criteria are known before any
+pivot is built.
+
+Classes:
+    - FormulaSyntaxError: The error raised for a formula that cannot be parsed.
+    - Node: The base class of the nodes of the syntax tree of a formula.
+    - Number: A number of a formula.
+    - Criterion: A criterion name of a formula.
+    - UnaryOp: A unary minus or plus applied to an operand.
+    - BinaryOp: An arithmetic operation between two operands.
+    - CompiledFormula: A parsed formula, evaluated over arrays.
+    - SubexpressionCache: The values of the shared subexpressions of a FormulaPlan.
+    - FormulaPlan: Formulas evaluated together, sharing their common subexpressions.
+
+Functions:
+    - tokenize(formula): Splits a formula into tokens.
+    - compile_formula(formula): Parses a formula into a CompiledFormula, cached.
+    - canonicalize(node): Orders the operands of the commutative operations of a tree.
+    - iter_nodes(node): Iterates over the nodes of a tree.
+
+Example:
+    compiled = compile_formula("(a + b) / 2")
+    values = compiled.evaluate(lambda criterion: arrays.get(criterion, 0))
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from threading import Lock
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(
+    r"\s*(?:(?P<number>[\d.]+(?:[eE][+-]?\d+)?)"
+    r"|(?P<name>[^\W\d_][\w.]*)"
+    r"|(?P<operator>[+\-*/()]))")
+
+
+class FormulaSyntaxError(ValueError):
+    """
+    The error raised for a formula that cannot be parsed.
+
+    Args:
+        formula (str): The offending formula.
+        reason (str): The description of the error.
+    """
+
+    def __init__(self, formula, reason):
+        super().__init__(f"Invalid formula {formula!r}: {reason}")
+        self.formula = formula
+        self.reason = reason
+
+
+def divide(left, right):
+    """
+    Divides two operands element-wise, giving NaN where the divisor is zero.
+
+    Args:
+        left (np.ndarray | float): The dividend.
+        right (np.ndarray | float): The divisor.
+
+    Returns:
+        np.ndarray | float: The quotient.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quotient = np.true_divide(left, right)
+    return np.where(np.equal(right, 0), np.nan, quotient)
+
+
+OPERATIONS = {
+    "+": np.add,
+    "-": np.subtract,
+    "*": np.multiply,
+    "/": divide,
+}
+COMMUTATIVE_OPERATORS = ("+", "*")
+
+
+class Node:  # pylint: disable=too-few-public-methods
+    """
+    The base class of the nodes of the syntax tree of a formula.
+    """
+
+    def evaluate(self, resolve, cache=None):
+        """
+        Returns the values of the node.
+
+        Args:
+            resolve (callable): Returns the values of a criterion name, see
+                                `CompiledFormula.evaluate`.
+            cache (SubexpressionCache, optional): The values of the shared
+                                                  subexpressions.
+
+        Returns:
+            np.ndarray | float: The values of the node.
+        """
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class Number(Node):
+    """
+    A number of a formula.
+
+    Attributes:
+        value (float | int): The value of the number.
+    """
+
+    value: float
+
+    def evaluate(self, resolve, cache=None):
+        """
+        Returns the value of the number.
+        """
+        _ = resolve, cache
+        return self.value
+
+
+@dataclass(frozen=True)
+class Criterion(Node):
+    """
+    A criterion name of a formula.
+
+    Attributes:
+        name (str): The criterion key.
+    """
+
+    name: str
+
+    def evaluate(self, resolve, cache=None):
+        """
+        Returns the values of the criterion, given by `resolve`.
+        """
+        if cache is None:
+            return resolve(self.name)
+        return cache.get(self, lambda: resolve(self.name))
+
+
+@dataclass(frozen=True)
+class UnaryOp(Node):
+    """
+    A unary minus or plus applied to an operand.
+
+    Attributes:
+        operator (str): '-' or '+'.
+        operand (Node): The node of the operand.
+    """
+
+    operator: str
+    operand: Node
+
+    def evaluate(self, resolve, cache=None):
+        """
+        Returns the values of the operand, negated by a unary minus.
+        """
+        def compute():
+            value = self.operand.evaluate(resolve, cache)
+            return np.negative(value) if self.operator == "-" else value
+
+        return compute() if cache is None else cache.get(self, compute)
+
+
+@dataclass(frozen=True)
+class BinaryOp(Node):
+    """
+    An arithmetic operation between two operands.
+
+    Attributes:
+        operator (str): '+', '-', '*' or '/'.
+        left (Node): The node of the left operand.
+        right (Node): The node of the right operand.
+    """
+
+    operator: str
+    left: Node
+    right: Node
+
+    def evaluate(self, resolve, cache=None):
+        """
+        Returns the element-wise result of the operation.
+        """
+        def compute():
+            return OPERATIONS[self.operator](
+                self.left.evaluate(resolve, cache), self.right.evaluate(resolve, cache))
+
+        return compute() if cache is None else cache.get(self, compute)
+
+
+def tokenize(formula):
+    """
+    Splits a formula into tokens, ignoring whitespace.
+
+    Args:
+        formula (str): The formula.
+
+    Returns:
+        list: The (kind, text) of each token, kind being 'number', 'name' or 'operator'.
+
+    Raises:
+        ValueError: If the formula contains an unexpected character.
+    """
+    tokens = []
+    position = 0
+    formula = formula.rstrip()
+    while position < len(formula):
+        match = TOKEN_PATTERN.match(formula, position)
+        if match is None:
+            raise ValueError(
+                f"Unexpected character {formula[position]!r} at position {position}")
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    A recursive descent parser of the tokens of a formula:
+        expression := term (('+' | '-') term)*
+        term := factor (('*' | '/') factor)*
+        factor := ('+' | '-') factor | number | name | '(' expression ')'
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+        self.criteria = set()
+
+    def peek(self):
+        """
+        Returns the current token, or (None, None) at the end of the formula.
+        """
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None, None
+
+    def take(self):
+        """
+        Returns the current token and moves to the next one.
+        """
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self):
+        """
+        Parses a whole formula.
+        """
+        node = self.expression()
+        if self.position < len(self.tokens):
+            raise ValueError(f"Unexpected token {self.peek()[1]!r}")
+        return node
+
+    def expression(self):
+        """
+        Parses a sum or difference of terms.
+        """
+        node = self.term()
+        while self.peek() in (("operator", "+"), ("operator", "-")):
+            node = BinaryOp(self.take()[1], node, self.term())
+        return node
+
+    def term(self):
+        """
+        Parses a product or quotient of factors.
+        """
+        node = self.factor()
+        while self.peek() in (("operator", "*"), ("operator", "/")):
+            node = BinaryOp(self.take()[1], node, self.factor())
+        return node
+
+    def factor(self):
+        """
+        Parses a signed factor, a number, a criterion or a parenthesized expression.
+        """
+        kind, text = self.take()
+        if kind == "operator" and text in "+-":
+            return UnaryOp(text, self.factor())
+        if kind == "number":
+            try:
+                return Number(int(text) if text.isdigit() else float(text))
+            except ValueError as e:
+                raise ValueError(f"Invalid number {text!r}") from e
+        if kind == "name":
+            self.criteria.add(text)
+            return Criterion(text)
+        if text == "(":
+            node = self.expression()
+            if self.take() != ("operator", ")"):
+                raise ValueError("Missing closing parenthesis")
+            return node
+        if kind is None:
+            raise ValueError("Unexpected end of formula")
+        raise ValueError(f"Unexpected token {text!r}")
+
+
+@dataclass(frozen=True)
+class CompiledFormula:
+    """
+    A parsed formula, evaluated over arrays.
+
+    Attributes:
+        formula (str): The source of the formula.
+        root (Node): The root node of the syntax tree.
+        criteria (frozenset): The criterion names used by the formula.
+    """
+
+    formula: str
+    root: Node
+    criteria: frozenset = field(default_factory=frozenset)
+
+    def evaluate(self, resolve):
+        """
+        Evaluates the formula.
+
+        Args:
+            resolve (callable): Returns the values of a criterion name: an array aligned
+                                with the arrays of the other criteria, or 0 if the
+                                criterion is missing.
+
+        Returns:
+            np.ndarray | float: The result, a scalar if the formula has no criterion.
+        """
+        return self.root.evaluate(resolve)
+
+
+@lru_cache(maxsize=1024)
+def compile_formula(formula):
+    """
+    Parses a formula into a CompiledFormula. The compiled formulas are immutable and
+    cached, so a formula used by several pivots is parsed once.
+
+    Args:
+        formula (str): The formula, e.g. '(criterion_1 + criterion_2) / 2'.
+
+    Returns:
+        CompiledFormula: The compiled formula.
+
+    Raises:
+        FormulaSyntaxError: If the formula is not valid.
+    """
+    try:
+        parser = _Parser(tokenize(formula))
+        root = parser.parse()
+    except ValueError as e:
+        raise FormulaSyntaxError(formula, str(e)) from e
+    return CompiledFormula(formula, root, frozenset(parser.criteria))
+
+
+def canonicalize(node):
+    """
+    Returns an equivalent tree in which the operands of each addition and
+    multiplication are ordered, so that `b + a` and `a + b` are the same subexpression.
+
+    Args:
+        node: The root node of a tree.
+
+    Returns:
+        The root node of the canonical tree.
+    """
+    if isinstance(node, UnaryOp):
+        return UnaryOp(node.operator, canonicalize(node.operand))
+    if isinstance(node, BinaryOp):
+        left, right = canonicalize(node.left), canonicalize(node.right)
+        if node.operator in COMMUTATIVE_OPERATORS and repr(right) < repr(left):
+            left, right = right, left
+        return BinaryOp(node.operator, left, right)
+    return node
+
+
+def iter_nodes(node):
+    """
+    Iterates over the nodes of a tree, the root first.
+
+    Args:
+        node: The root node of a tree.
+
+    Yields:
+        The nodes of the tree.
+    """
+    yield node
+    if isinstance(node, UnaryOp):
+        yield from iter_nodes(node.operand)
+    elif isinstance(node, BinaryOp):
+        yield from iter_nodes(node.left)
+        yield from iter_nodes(node.right)
+
+
+class SubexpressionCache:  # pylint: disable=too-few-public-methods
+    """
+    The values of the shared subexpressions of a FormulaPlan, computed on first use.
+
+    The cache can be used from several threads: the values are computed outside of the
+    lock, so two threads may compute the same value at the same time, and the first
+    stored value is kept.
+
+    Args:
+        shared (frozenset): The nodes to keep the values of.
+    """
+
+    def __init__(self, shared):
+        self.shared = shared
+        self.values = {}
+        self._lock = Lock()
+
+    def get(self, node, compute):
+        """
+        Returns the value of a node, computed once if the node is shared.
+
+        Args:
+            node: The node.
+            compute (callable): Computes the value of the node.
+
+        Returns:
+            np.ndarray | float: The value of the node.
+        """
+        if node not in self.shared:
+            return compute()
+        with self._lock:
+            if node in self.values:
+                return self.values[node]
+        value = compute()
+        with self._lock:
+            return self.values.setdefault(node, value)
+
+
+class FormulaPlan:  # pylint: disable=too-few-public-methods
+    """
+    Formulas evaluated together: the subexpressions (including criteria) used more
+    than once across the formulas are evaluated once and reused.
+
+    A plan keeps the values of the shared subexpressions: it must be used with one
+    `resolve` function, i.e. with one set of aligned pivots.
+
+    Args:
+        formulas (iterable): The CompiledFormula of each formula.
+
+    Attributes:
+        criteria (frozenset): The criterion names referenced by the formulas.
+        shared (frozenset): The canonical subexpressions used more than once.
+    """
+
+    def __init__(self, formulas):
+        self._roots = {}
+        counts = Counter()
+        for compiled in formulas:
+            root = self._roots.setdefault(
+                compiled.formula, canonicalize(compiled.root))
+            counts.update(
+                node for node in iter_nodes(root) if not isinstance(node, Number))
+        self.criteria = frozenset(
+            node.name for node in counts if isinstance(node, Criterion))
+        self.shared = frozenset(node for node, count in counts.items() if count > 1)
+        self._cache = SubexpressionCache(self.shared)
+
+    def evaluate(self, formula, resolve):
+        """
+        Evaluates one formula of the plan, reusing the values of the shared
+        subexpressions already computed.
+
+        Args:
+            formula (str): The formula, as passed to `compile_formula`.
+            resolve (callable): Returns the values of a criterion name, see
+                                `CompiledFormula.evaluate`.
+
+        Returns:
+            np.ndarray | float: The result of the formula.
+        """
+        return self._roots[formula].evaluate(resolve, self._cache)
@@ -0,0 +1,225 @@
+"""
+This module provides a persistent cache of the results of the pivot formulas, shared
+by the exports of the same data (e.g. the reports in other languages or formats).
+
+The result of a formula is stored as a Parquet file in the cache directory, under a key
+hashing the formula text and the data it depends on: the values of the criteria it
+references and of the first criterion (which gives the rows of the result), and the
+columns of all the criteria. A JSON manifest records the files with their size and
+last use; the least recently used files are evicted beyond the size limits.
+
+Parquet requires pyarrow, an optional dependency: without it the cache is disabled and
+every result is computed.
+
+Classes:
+    - PivotCache: The persistent cache of the results of the pivot formulas.
+
+Functions:
+    - get_criterion_hashes(data_df): Hashes the values of each criterion.
+"""
+
+import hashlib
+import json
+import os
+import time
+from importlib.util import find_spec
+
+import numpy as np
+import pandas as pd
+from shared import log
+
+# Version of the computation of the results, part of the keys
+CACHE_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+
+def get_criterion_hashes(data_df):
+    """
+    Hashes the values (index, columns, value) of each criterion, with one vectorized
+    hash of all the rows.
+
+    Args:
+        data_df (DataFrame): The data, with the columns criterion_key, index, columns
+                             and value.
+
+    Returns:
+        dict: The hexadecimal SHA-256 digest of each criterion.
+    """
+    row_hashes = pd.util.hash_pandas_object(
+        data_df[["index", "columns", "value"]], index=False).to_numpy()
+    codes, criteria = pd.factorize(data_df["criterion_key"], use_na_sentinel=False)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(criteria) + 1))
+    return {
+        criterion: hashlib.sha256(
+            row_hashes[order[bounds[i]:bounds[i + 1]]].tobytes()).hexdigest()
+        for i, criterion in enumerate(criteria)}
+
+
+class PivotCache:
+    """
+    The persistent cache of the results of the pivot formulas.
+
+    Args:
+        cache_dir (str): The directory of the cache, created if needed.
+        max_bytes (int): The maximum total size of the cached files. Defaults to 512 MB.
+        max_entries (int, optional): The maximum number of cached results.
+
+    Attributes:
+        enabled (bool): Whether the cache is usable, i.e. pyarrow is installed.
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 2**20, max_entries=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.enabled = find_spec("pyarrow") is not None
+        self._manifest = {}
+        if not self.enabled:
+            log.warning("pyarrow is not installed: the pivot cache is disabled.")
+            return
+        os.makedirs(cache_dir, exist_ok=True)
+        self._manifest = self._load_manifest()
+
+    @property
+    def manifest_path(self):
+        """
+        str: The path of the manifest of the cache.
+        """
+        return os.path.join(self.cache_dir, MANIFEST_FILE)
+
+    def __len__(self):
+        return len(self._manifest)
+
+    def get_keys(self, data_df, formulas):
+        """
+        Computes the key of each formula from its text and the data it depends on.
+
+        Args:
+            data_df (DataFrame): The data, with the columns criterion_key, index,
+                                 columns and value.
+            formulas (iterable): The CompiledFormula of each formula.
+
+        Returns:
+            dict: The key of each formula text.
+        """
+        hashes = get_criterion_hashes(data_df)
+        first = data_df["criterion_key"].iloc[0] if len(data_df) else None
+        columns = hashlib.sha256(
+            repr(data_df["columns"].unique().tolist()).encode()).hexdigest()
+        keys = {}
+        for compiled in formulas:
+            criteria = sorted(str(criterion) for criterion in compiled.criteria)
+            source = json.dumps([
+                CACHE_VERSION, compiled.formula, str(first), hashes.get(first),
+                columns, [(criterion, hashes.get(criterion)) for criterion in criteria],
+            ])
+            keys[compiled.formula] = hashlib.sha256(source.encode()).hexdigest()
+        return keys
+
+    def get(self, key):
+        """
+        Returns a cached result and marks it as recently used.
+
+        Args:
+            key (str): The key of the result, see `get_keys`.
+
+        Returns:
+            DataFrame: The result; None if it is not cached.
+        """
+        entry = self._manifest.get(key)
+        if entry is None:
+            return None
+        try:
+            df = pd.read_parquet(os.path.join(self.cache_dir, entry["file"]))
+        except (OSError, ValueError) as e:
+            log.warning("Cached pivot %s dropped: %s", key, e)
+            self._remove(key)
+            self._save_manifest()
+            return None
+        df.columns = entry["columns"]
+        entry["last_used"] = time.time()
+        return df
+
+    def put(self, key, df):
+        """
+        Stores a result, then evicts the least recently used results beyond the limits.
+
+        Args:
+            key (str): The key of the result, see `get_keys`.
+            df (DataFrame): The result.
+        """
+        if not self.enabled:
+            return
+        file = f"{key}.parquet"
+        path = os.path.join(self.cache_dir, file)
+        try:
+            # Parquet requires string column names: the labels are kept in the manifest
+            columns = json.loads(json.dumps(
+                [label.item() if isinstance(label, np.generic) else label
+                 for label in df.columns]))
+            df.set_axis([f"c{i}" for i in range(len(df.columns))], axis=1).to_parquet(
+                path, index=False)
+        except (OSError, TypeError, ValueError) as e:
+            log.warning("Pivot not cached: %s", e)
+            return
+        self._manifest[key] = {
+            "file": file,
+            "size": os.path.getsize(path),
+            "last_used": time.time(),
+            "columns": columns,
+        }
+        self._evict()
+        self._save_manifest()
+
+    def save(self):
+        """
+        Saves the manifest, which records the last use of the results read.
+        """
+        if self.enabled:
+            self._save_manifest()
+
+    def _evict(self):
+        """
+        Removes the least recently used results beyond the size and count limits.
+        """
+        entries = sorted(self._manifest.items(), key=lambda item: item[1]["last_used"])
+        total = sum(entry["size"] for _, entry in entries)
+        for key, entry in entries:
+            if total <= self.max_bytes and (
+                    self.max_entries is None or len(self._manifest) <= self.max_entries):
+                break
+            total -= entry["size"]
+            self._remove(key)
+
+    def _remove(self, key):
+        """
+        Removes a result from the manifest and deletes its file.
+        """
+        entry = self._manifest.pop(key)
+        try:
+            os.remove(os.path.join(self.cache_dir, entry["file"]))
+        except FileNotFoundError:
+            pass
+
+    def _load_manifest(self):
+        """
+        Loads the manifest; an unreadable manifest empties the cache.
+        """
+        try:
+            with open(self.manifest_path, encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log.warning("Pivot cache manifest ignored: %s", e)
+            return {}
+
+    def _save_manifest(self):
+        """
+        Writes the manifest atomically.
+        """
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self._manifest, file)
+        os.replace(temp_path, self.manifest_path)
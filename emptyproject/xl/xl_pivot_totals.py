@@ -0,0 +1,90 @@
+"""
+This module provides the Total and Delta rows of the results of the pivot formulas,
+computed with pandas as Excel computes the formulas of these rows.
+
+The rows are written by the `XlPivotWriter` depending on its totals mode:
+    - 'formulas' (default): as Excel formulas, computed when Excel recalculates.
+    - 'values': as values computed with pandas, appended to the data before the sheet
+      is written, so that readers such as pandas see them without recalculation.
+    - 'cached': as formulas with their computed values cached (XlsxWriter engine).
+
+Functions:
+    - get_total_row(df): Computes the Total row of a result.
+    - get_last_row(df): Returns the last row of a result.
+    - get_delta_row(source): Computes the Delta row of a row.
+    - append_summary_rows(df, row): Appends the Total and Delta rows of a result.
+"""
+
+import pandas as pd
+
+# Modes of the Total and Delta rows
+TOTALS_FORMULAS = "formulas"
+TOTALS_VALUES = "values"
+TOTALS_CACHED = "cached"
+TOTALS_MODES = (TOTALS_FORMULAS, TOTALS_VALUES, TOTALS_CACHED)
+
+
+def get_total_row(df):
+    """
+    Computes the Total row of a result: the sum of each column, as Excel SUM.
+
+    Args:
+        df (DataFrame): The result of a formula, with the row names as first column.
+
+    Returns:
+        list: The row, starting with 'Total'.
+    """
+    return ["Total"] + df.iloc[:, 1:].sum().tolist()
+
+
+def get_last_row(df):
+    """
+    Returns the last row of a result, or an empty row if the result has no row.
+
+    Args:
+        df (DataFrame): The result of a formula, with the row names as first column.
+
+    Returns:
+        list: The values of the row.
+    """
+    if len(df):
+        return df.iloc[-1].tolist()
+    return [None] * len(df.columns)
+
+
+def get_delta_row(source):
+    """
+    Computes the Delta row of a row: the difference between each column and the
+    previous one, from the third column. Empty cells count as 0, as in Excel.
+
+    Args:
+        source (list): The row, with its name as first value.
+
+    Returns:
+        list: The row, starting with 'Delta' and an empty cell, as long as `source`.
+    """
+    numbers = pd.Series(source[1:], dtype=float).fillna(0)
+    delta = ["Delta", None] + numbers.diff().iloc[1:].tolist()
+    return delta[:len(source)]
+
+
+def append_summary_rows(df, row):
+    """
+    Appends the Total and Delta rows of a result, as values, in one operation.
+
+    Args:
+        df (DataFrame): The result of a formula, with the row names as first column.
+        row (Series): The PivotInfos row of the pivot (show_total, show_delta).
+
+    Returns:
+        DataFrame: The result with the Total and Delta rows.
+    """
+    rows = []
+    if row["show_total"]:
+        rows.append(get_total_row(df))
+    if row["show_delta"]:
+        rows.append(get_delta_row(rows[-1] if rows else get_last_row(df)))
+    if not rows:
+        return df
+    return pd.concat(
+        [df, pd.DataFrame(rows, columns=df.columns)], ignore_index=True)
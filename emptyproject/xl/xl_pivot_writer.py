@@ -4,19 +4,153 @@ and charts in Excel files using the `openpyxl` and `pandas` libraries. It
 includes functionality to generate pivot tables, evaluate formulas, and export
 charts, customized for specific criteria.
 
+The pivots are created in two stages: the formula results are computed once from the
+data, then rendered into a workbook with the resource-string-driven texts of one
+language. `XlPivotWriter.create_language_reports` uses this split to compute the
+results once and render the workbooks of several languages in a process pool.
+
+The pivots of all the criteria are built in one pass into a `CriterionPivots` (see
+`xl.xl_criterion_pivots`), on which the formulas are evaluated as slices.
+
+The Total and Delta rows of the data sheets are written as formulas, as values or as
+formulas with cached values, depending on `totals` (see `xl.xl_pivot_totals`).
+
 Classes:
+    PivotResult: A dataclass holding the computed result of one pivot.
+    PivotTexts: A dataclass holding the language-dependent texts of one pivot.
     XlPivotChartWriter: Handles the creation of pivot charts.
     XlPivotWriter: Manages the creation of pivot tables and exports charts.
+
+Functions:
+    get_sort_key(x): Returns the sorting key of a pivot table column.
+    get_result_df(index, columns, values, keep, column_order): Creates the DataFrame of
+        the result of a formula.
+    render_language_report(xl_file, index_df, results, texts): Renders and saves one
+        workbook in a worker process.
 """
 
-import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 
 import numpy as np
-import openpyxl
 import pandas as pd
-from openpyxl.chart import Reference, Series
-from shared import project
-from xl.xl_writer import ChartLabels, XlChartWriter, XlSheetWriter, XlWriter
+from openpyxl.utils import get_column_letter
+from shared import log, project
+from xl.xl_criterion_pivots import CriterionPivots
+from xl.xl_engine import ENGINE_OPENPYXL, ENGINE_XLSXWRITER
+from xl.xl_formula import FormulaPlan, FormulaSyntaxError, compile_formula
+from xl.xl_pivot_totals import (TOTALS_CACHED, TOTALS_FORMULAS, TOTALS_MODES,
+                                TOTALS_VALUES, append_summary_rows,
+                                get_delta_row, get_last_row, get_total_row)
+from xl.xl_writer import (PROFILE_FORMATTED, ChartLabels, XlChartWriter,
+                          XlWriter)
+
+
+@dataclass
+class PivotResult:
+    """
+    A dataclass holding the computed result of one pivot.
+
+    Attributes:
+        row (pd.Series): The PivotInfos row describing the pivot (query_name, show_* flags).
+        df (pd.DataFrame): The result of the formula, with the row names as first column.
+    """
+
+    row: pd.Series
+    df: pd.DataFrame
+
+
+@dataclass
+class PivotTexts:
+    """
+    A dataclass holding the language-dependent texts of one pivot, resolved from the
+    ResourceStrings.
+
+    Attributes:
+        data_sheet_name (str): The name of the data sheet.
+        chart_sheet_name (str): The name of the chart sheet.
+        title (str): The title of the data sheet.
+        labels (ChartLabels): The title and axis labels of the chart.
+    """
+
+    data_sheet_name: str
+    chart_sheet_name: str
+    title: str
+    labels: ChartLabels
+
+    @classmethod
+    def resolve(cls, query_name, language):
+        """
+        Resolves the texts of a pivot from the ResourceStrings.
+
+        Args:
+            query_name (str): The query name of the pivot.
+            language (str): The language of the texts.
+
+        Returns:
+            PivotTexts: The resolved texts.
+        """
+        prefix = project.get_resource_string(
+            f"{query_name}_Sheet_Prefix", language)
+        title = project.get_resource_string(f"{query_name}_Title", language)
+        return cls(
+            data_sheet_name=prefix + "_Data",
+            chart_sheet_name=prefix + "_Chart",
+            title=title,
+            labels=ChartLabels(
+                title=title,
+                x_label=project.get_resource_string(
+                    f"{query_name}_X_Label", language),
+                y_label=project.get_resource_string(
+                    f"{query_name}_Y_Label", language),
+            ),
+        )
+
+
+@lru_cache(maxsize=4096)
+def get_sort_key(x):
+    """
+    Sorting key of the pivot table columns: the integer value of the column, or of the
+    column without its two-character prefix (e.g. 'M_12'), or the column itself. The
+    keys are cached, the columns being the same for all the pivots.
+
+    Args:
+        x: The value to sort.
+
+    Returns:
+        int or str: The sorting key.
+    """
+    try:
+        return int(x)
+    except ValueError:
+        try:
+            return int(x[2:])
+        except (ValueError, IndexError):
+            return x
+
+
+# pylint: disable=too-many-arguments
+def get_result_df(index, columns, values, keep, column_order):
+    """
+    Creates the DataFrame of the result of a formula from the kept columns, in one
+    selection of the array.
+
+    Args:
+        index (pd.Index): The rows.
+        columns (pd.Index): The columns.
+        values (np.ndarray): The 2-D array of values.
+        keep (np.ndarray): The boolean mask of the columns to keep.
+        column_order (np.ndarray): The positions of the columns in sorted order.
+
+    Returns:
+        DataFrame: The result, with the rows named 'name'.
+    """
+    positions = column_order[keep[column_order]]
+    return pd.DataFrame(
+        values[:, positions],
+        index=pd.Index(index, name="name"),
+        columns=columns[positions].tolist())
 
 
 class XlPivotChartWriter(XlChartWriter):
@@ -37,35 +171,21 @@ class XlPivotChartWriter(XlChartWriter):
     def add_chart_data(self, hidden_rows=0):
         hidden_rows = int(self.show_total) + \
             int(self.show_delta) + int(self.show_init)
-        last_row = self.data_sheet.ws.max_row
+        last_row = self.data_sheet.max_row
         if self.show_rows:
             super().add_chart_data(hidden_rows)
 
         if self.show_total:
             total_row = last_row + 1 - hidden_rows
-            values = Reference(
-                self.data_sheet.ws,
-                min_col=2,
-                min_row=total_row,
-                max_row=total_row,
-                max_col=self.data_sheet.ws.max_column,
-            )
-            series = Series(values, title="Total")
-            self.chart.series.append(series)
-            series.smooth = False
+            self.engine.add_series(
+                self.chart, self.data_sheet.ws, total_row,
+                self.data_sheet.max_column, "Total")
 
         if self.show_delta:
             delta_row = last_row + 1 - hidden_rows + 1
-            values = Reference(
-                self.data_sheet.ws,
-                min_col=2,
-                min_row=delta_row,
-                max_row=delta_row,
-                max_col=self.data_sheet.ws.max_column,
-            )
-            series = Series(values, title="Delta")
-            self.chart.series.append(series)
-            series.smooth = False
+            self.engine.add_series(
+                self.chart, self.data_sheet.ws, delta_row,
+                self.data_sheet.max_column, "Delta")
 
 
 class XlPivotWriter(XlWriter):
@@ -74,76 +194,354 @@ class XlPivotWriter(XlWriter):
 
     Args:
         xl_file (str): The path to the Excel file.
+        profile (str): The finalization profile of the writer, see `XlWriter`.
+        engine (str): The engine of the writer, 'openpyxl' or 'xlsxwriter'.
+        table_style (str): The table style of the data sheets, see `XlWriter`.
+        update (bool): Whether to update the existing Excel file, see `XlWriter`. The
+                       chart of an unchanged data sheet is drawn again from the sheet.
+        totals (str): 'formulas', 'values' or 'cached', how the Total and Delta rows are
+                      written, see `xl.xl_pivot_totals`. Defaults to 'formulas'.
+        pivot_cache (PivotCache): The persistent cache of the results of the formulas,
+                                  see `xl.xl_pivot_cache`. Defaults to None (no cache).
+
+    Raises:
+        ValueError: If the totals mode is unknown, or 'cached' without the XlsxWriter
+                    engine.
     """
 
-    def __init__(self, xl_file):
-        super().__init__(xl_file)
+    # pylint: disable=too-many-arguments
+    def __init__(
+            self,
+            xl_file,
+            profile=PROFILE_FORMATTED,
+            engine=ENGINE_OPENPYXL,
+            table_style=None,
+            update=False,
+            totals=TOTALS_FORMULAS,
+            pivot_cache=None):
+        if totals not in TOTALS_MODES:
+            raise ValueError(f"Unknown totals mode: {totals}")
+        if totals == TOTALS_CACHED and engine != ENGINE_XLSXWRITER:
+            raise ValueError("Cached totals are only supported with xlsxwriter.")
+        super().__init__(xl_file, profile, engine, table_style, update)
+        self.totals = totals
+        self.pivot_cache = pivot_cache
         self.chart_writer = XlPivotChartWriter
 
-    def create_criterion_pivots(self, data_df):
+    def create_criterion_pivots(self, data_df, criteria=None):
         """
         Creates pivot tables for each unique criterion key in the provided DataFrame.
 
         Args:
             data_df (DataFrame): The DataFrame containing the data to pivot.
+            criteria (iterable, optional): The criteria to pivot. Defaults to all.
         Returns:
-            tuple: A dictionary of pivot tables indexed by criterion, and a list of criteria.
-        """
-
-        criterion_pivots = {}
-        criteria = data_df["criterion_key"].unique()
-        all_columns = data_df["columns"].unique().tolist()
+            tuple: The pivot tables indexed by criterion (a CriterionPivots mapping), and
+            the array of criteria.
 
-        for criterion in criteria:
-            filtered_df = data_df[data_df["criterion_key"] == criterion]
-            pivot_table = filtered_df.pivot(
-                index="index",
-                columns="columns",
-                values="value",
-            )
-            pivot_table = pivot_table.reindex(
-                columns=all_columns, fill_value=0)
-            criterion_pivots[criterion] = pivot_table
-        return criterion_pivots, criteria
+        Raises:
+            ValueError: If a criterion has several values for an index and a column.
+        """
+        criterion_pivots = CriterionPivots(data_df, criteria)
+        return criterion_pivots, criterion_pivots.criteria
 
     def create_pivot_tables(
         self,
         data_df,
         pivot_information_df,
+        max_workers=None,
     ):
         """
-        Creates pivot tables for each formula in the pivot information DataFrame.
+        Creates pivot tables for each formula in the pivot information DataFrame. The
+        results are computed first, concurrently if `max_workers` is given, then the
+        sheets are written one after the other in the order of the pivots.
+
+        Args:
+            data_df (DataFrame): The DataFrame containing the raw data.
+            pivot_information_df (DataFrame): DataFrame containing formulas and
+            information about each pivot.
+            max_workers (int, optional): The number of threads computing the results,
+                                         see `compute_pivot_results`.
+        """
+        language = project.context.language
+        for result in self.compute_pivot_results(
+                data_df, pivot_information_df, max_workers):
+            texts = PivotTexts.resolve(result.row["query_name"], language)
+            self.render_pivot_result(result, texts)
+
+    def compute_pivot_results(
+            self, data_df, pivot_information_df, max_workers=None):
+        """
+        Computes the result of each formula in the pivot information DataFrame. The
+        results do not depend on the language and can be rendered several times.
+
+        The formulas are planned together (see `FormulaPlan`): only the criteria they
+        reference, and the first criterion which gives the rows of the results, are
+        pivoted, and their common subexpressions are evaluated once.
+
+        Since the formulas are evaluated with NumPy, which releases the GIL, they can
+        be computed concurrently in a thread pool; the results are returned in the
+        order of the pivots whatever the number of threads.
+
+        With a pivot cache, the results of the formulas whose text and data did not
+        change are read from the cache, and the others are computed and stored; if all
+        the results are cached, no pivot is built.
 
         Args:
             data_df (DataFrame): The DataFrame containing the raw data.
             pivot_information_df (DataFrame): DataFrame containing formulas and
             information about each pivot.
+            max_workers (int, optional): The number of threads. Defaults to None, which
+                                         computes the results in this thread.
+
+        Returns:
+            list: The PivotResult of each pivot having a valid formula, in order.
+        """
+        formulas = self.check_formulas(pivot_information_df)
+        keys, results = self._read_cached_results(
+            data_df, pivot_information_df, formulas)
+        pending = {
+            index: compiled for index, compiled in formulas.items()
+            if index not in results}
+        computed = {}
+        if pending:
+            computed = self._compute_results(
+                data_df, pivot_information_df, pending, max_workers)
+        self._store_results(keys, pending, computed)
+        results.update(computed)
+        return [results[index] for index in formulas]
+
+    def _read_cached_results(self, data_df, pivot_information_df, formulas):
+        """
+        Reads the results of the formulas from the pivot cache, if any.
+
+        Args:
+            data_df (DataFrame): The DataFrame containing the raw data.
+            pivot_information_df (DataFrame): The PivotInfos rows of the pivots.
+            formulas (dict): The CompiledFormula of each pivot, see `check_formulas`.
+
+        Returns:
+            tuple: The cache key of each formula, and the cached PivotResult of each
+            pivot, keyed by the index of its row; both are empty without cache.
+        """
+        if self.pivot_cache is None:
+            return {}, {}
+        keys = self.pivot_cache.get_keys(data_df, formulas.values())
+        results = {}
+        for index, compiled in formulas.items():
+            df = self.pivot_cache.get(keys[compiled.formula])
+            if df is not None:
+                results[index] = PivotResult(pivot_information_df.loc[index], df)
+        log.info("%d of %d pivots read from the cache", len(results), len(formulas))
+        return keys, results
+
+    def _compute_results(self, data_df, pivot_information_df, formulas, max_workers):
+        """
+        Computes the results of formulas planned together, in a thread pool if
+        `max_workers` is given.
+
+        Args:
+            data_df (DataFrame): The DataFrame containing the raw data.
+            pivot_information_df (DataFrame): The PivotInfos rows of the pivots.
+            formulas (dict): The CompiledFormula of each pivot to compute.
+            max_workers (int): The number of threads, or None.
+
+        Returns:
+            dict: The PivotResult of each pivot, keyed by the index of its row.
+        """
+        plan = FormulaPlan(formulas.values())
+        criterion_pivots, criteria = self.create_criterion_pivots(
+            data_df, plan.criteria | set(data_df["criterion_key"].head(1)))
+        column_order = self.get_column_order(criterion_pivots.columns)
+        jobs = [
+            (criterion_pivots, criteria, pivot_information_df.loc[index],
+             compiled.formula, plan, column_order)
+            for index, compiled in formulas.items()]
+
+        if max_workers is None:
+            computed = [self.compute_pivot_result(*job) for job in jobs]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                computed = list(executor.map(
+                    lambda job: self.compute_pivot_result(*job), jobs))
+        return dict(zip(formulas, computed))
+
+    def _store_results(self, keys, formulas, results):
+        """
+        Stores the computed results in the pivot cache, if any, and saves the cache.
+
+        Args:
+            keys (dict): The cache key of each formula, see `_read_cached_results`.
+            formulas (dict): The CompiledFormula of each computed pivot.
+            results (dict): The PivotResult of each computed pivot.
+        """
+        if self.pivot_cache is None:
+            return
+        for index, compiled in formulas.items():
+            self.pivot_cache.put(keys[compiled.formula], results[index].df)
+        self.pivot_cache.save()
+
+    # pylint: disable=too-many-arguments
+    def compute_pivot_result(
+            self,
+            criterion_pivots,
+            criteria,
+            row,
+            formula,
+            plan=None,
+            column_order=None):
+        """
+        Computes the result of the formula of one pivot. The columns without any value
+        other than 0 or NaN after the first row are dropped, with one mask over the
+        values, and the others are sorted.
+
+        Args:
+            criterion_pivots (CriterionPivots): The pivot tables of the criteria.
+            criteria (list): List of criteria to use for processing.
+            row (Series): The PivotInfos row of the pivot.
+            formula (str): The formula of the pivot.
+            plan (FormulaPlan, optional): The plan of the formulas, see `process_formula`.
+            column_order (np.ndarray, optional): The sorted positions of the columns, see
+                                                 `get_column_order`.
+
+        Returns:
+            PivotResult: The computed pivot.
+        """
+        index, columns, values = self._evaluate_formula(
+            criterion_pivots, criteria, formula, plan)
+        if column_order is None:
+            column_order = self.get_column_order(columns)
+        # suppress empty columns
+        keep = ((values != 0) & ~np.isnan(values))[1:].any(axis=0)
+        result_df = get_result_df(index, columns, values, keep, column_order)
+        return PivotResult(row, result_df.reset_index())
+
+    def render_pivot_result(self, result, texts):
+        """
+        Writes the data sheet and the chart sheet of a computed pivot.
+
+        Args:
+            result (PivotResult): The computed pivot.
+            texts (PivotTexts): The texts of the pivot in the language of the workbook.
+
+        Returns:
+            XlSheetWriter: The data sheet object; None if the sheet is unchanged, in which
+            case only its chart is drawn again.
+        """
+        df = result.df
+        if not result.row["show_init"]:
+            df = self.remove_init_row(df)
+        if self.totals == TOTALS_VALUES:
+            df = append_summary_rows(df, result.row)
+        sh = self.add_sheet(
+            texts.data_sheet_name, df, (dict(result.row), self.totals, texts))
+        if sh is None:
+            unchanged = self.open_unchanged_sheet(texts.data_sheet_name)
+            if unchanged is not None:
+                self.export_chart(unchanged, result.row, texts)
+            return None
+        self.finalize_data_sheet(sh, result.row, texts.title)
+        self.export_chart(sh, result.row, texts)
+        return sh
+
+    def render_report(self, index_df, results, texts):
+        """
+        Writes the index sheet and the sheets of all computed pivots.
+
+        Args:
+            index_df (DataFrame): The content of the index sheet, see `get_index_df`.
+            results (list): The PivotResult of each pivot.
+            texts (list): The PivotTexts of each pivot, aligned with `results`.
+        """
+        self.write_index_sheet(index_df)
+        for result, text in zip(results, texts):
+            self.render_pivot_result(result, text)
+
+    def create_language_reports(
+            self,
+            data_df,
+            pivot_information_df,
+            xl_files,
+            language=None,
+            max_workers=None):
         """
-        criterion_pivots, criteria = self.create_criterion_pivots(data_df)
-        formulas_df = pivot_information_df
+        Computes the pivots and formula results once, then renders the report of each
+        language. The workbooks of `xl_files` are rendered and saved in a process pool
+        while the workbook of this writer is rendered in `language`, if given, in this
+        process. The texts are resolved from the ResourceStrings before the workers are
+        started, so the workers do not access the database.
 
-        for index, row in formulas_df.iterrows():
-            _ = index
+        Args:
+            data_df (DataFrame): The DataFrame containing the raw data.
+            pivot_information_df (DataFrame): DataFrame containing formulas and
+            information about each pivot.
+            xl_files (dict): The path of the Excel file to create, keyed by language.
+            language (str, optional): The language of the workbook of this writer.
+                                      Defaults to None, which leaves it untouched.
+            max_workers (int, optional): The number of worker processes. Defaults to the
+                                         number of processors, limited to the number of
+                                         files.
+
+        Returns:
+            list: The paths of the Excel files created by the workers.
+        """
+        results = self.compute_pivot_results(data_df, pivot_information_df)
+
+        def report(report_language):
+            return (
+                self.get_index_df(pivot_information_df, report_language),
+                results,
+                [PivotTexts.resolve(result.row["query_name"], report_language)
+                 for result in results])
+
+        jobs = [(xl_file, *report(file_language))
+                for file_language, xl_file in xl_files.items()]
+        own_report = report(language) if language is not None else None
+
+        futures = []
+        executor = None
+        if jobs:
+            if max_workers is not None:
+                max_workers = min(max_workers, len(jobs))
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+            futures = [
+                executor.submit(
+                    render_language_report, *job, self.profile, self.engine.name,
+                    self.table_style, self.totals)
+                for job in jobs]
+        try:
+            if own_report is not None:
+                self.render_report(*own_report)
+            return [future.result() for future in futures]
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    @staticmethod
+    def check_formulas(pivot_information_df):
+        """
+        Compiles the formula of each pivot once, logging every invalid formula with the
+        name of its query. The pivots without formula or with an invalid formula are
+        left out.
+
+        Args:
+            pivot_information_df (DataFrame): DataFrame containing formulas and
+            information about each pivot.
+
+        Returns:
+            dict: The CompiledFormula of each valid formula, keyed by the index of its
+            row in `pivot_information_df`.
+        """
+        formulas = {}
+        for index, row in pivot_information_df.iterrows():
             formula = row["formula"]
             if pd.isna(formula):
                 continue
-
-            query_name = row["query_name"]
-            language = project.context.language
-            data_sheet_name = (
-                project.get_resource_string(
-                    f"{query_name}_Sheet_Prefix",
-                    language) + "_Data")
-            result_df = self.process_formula(
-                criterion_pivots, criteria, formula)
-            # suppress empty columns
-            result_df = result_df.loc[:, ~(
-                (result_df.iloc[1:].replace(0, float('NaN')).isnull()).all())]
-            result_df = result_df.reset_index()
-            sh = XlSheetWriter(self.writer, data_sheet_name, result_df)
-
-            self.finalize_data_sheet(sh, row)
-            self.export_chart(sh, row)
+            try:
+                formulas[index] = compile_formula(str(formula))
+            except FormulaSyntaxError as e:
+                log.error("Pivot %s skipped: %s", row.get("query_name", index), e)
+        return formulas
 
     def sort_key(self, x):
         """
@@ -155,48 +553,92 @@ class XlPivotWriter(XlWriter):
         Returns:
             int or str: The sorting key.
         """
-        try:
-            return int(x)
-        except ValueError:
-            try:
-                return int(x[2:])
-            except (ValueError, IndexError):
-                return x
+        return get_sort_key(x)
 
-    def process_formula(self, pivot_tables, criteria, formula):
+    def get_column_order(self, columns):
+        """
+        Returns the positions of columns sorted with `sort_key`. The columns of all the
+        pivots of an export are the same, so the order is computed once per export and
+        the pruned columns of each pivot are taken from it in order.
+
+        Args:
+            columns (pd.Index): The columns.
+
+        Returns:
+            np.ndarray: The positions of the columns, in sorted order.
+        """
+        return np.array(
+            sorted(range(len(columns)), key=lambda i: self.sort_key(columns[i])),
+            dtype=np.intp)
+
+    def _evaluate_formula(self, pivot_tables, criteria, formula, plan=None):
+        """
+        Evaluates a formula over the pivot tables aligned on the rows and columns of the
+        pivot of the first criterion: a criterion, row or column missing from a pivot
+        counts as 0, NaN values propagate and a division by zero gives NaN.
+
+        Args:
+            pivot_tables (dict): Dictionary of pivot tables.
+            criteria (list): List of criteria to use for processing.
+            formula (str): The formula to evaluate.
+            plan (FormulaPlan, optional): The plan of the formula, see `process_formula`.
+
+        Returns:
+            tuple: The rows (pd.Index), the columns (pd.Index) and the 2-D array of the
+            values of the formula.
+        """
+        first = criteria[0]
+        if isinstance(pivot_tables, CriterionPivots):
+            index, columns = pivot_tables.index_of(first), pivot_tables.columns
+
+            def aligned_values(criterion):
+                return pivot_tables.aligned_values(criterion, first)
+        else:
+            index, columns = pivot_tables[first].index, pivot_tables[first].columns
+
+            def aligned_values(criterion):
+                return pivot_tables[criterion].reindex(
+                    index=index, columns=columns, fill_value=0).to_numpy()
+
+        def resolve(criterion):
+            return aligned_values(criterion) if criterion in pivot_tables else 0
+
+        if plan is None:
+            values = compile_formula(formula).evaluate(resolve)
+        else:
+            values = plan.evaluate(formula, resolve)
+        return index, columns, np.broadcast_to(values, (len(index), len(columns)))
+
+    def process_formula(self, pivot_tables, criteria, formula, plan=None):
         """
         Processes a given formula and evaluates it against the provided pivot tables.
 
+        The formula is compiled once (see `xl.xl_formula`) and evaluated over whole
+        pivot tables (see `_evaluate_formula`). The columns that are all NaN or all 0
+        are dropped and the others sorted with `sort_key`.
+
         Args:
             pivot_tables (dict): Dictionary of pivot tables.
             criteria (list): List of criteria to use for processing.
             formula (str): The formula to evaluate.
+            plan (FormulaPlan, optional): The plan of the formula, sharing the values of
+                                          the subexpressions common to the formulas of
+                                          the plan, evaluated on the same pivot tables.
 
         Returns:
             DataFrame: A DataFrame containing the evaluated result.
         """
-        result_data = []
-        for index in pivot_tables[criteria[0]].index:
-            result_row = {"name": index}
-            for column in pivot_tables[criteria[0]].columns:
-                result = self.eval_formula(
-                    pivot_tables, formula, index, column)
-                if not pd.isna(result):
-                    result_row[column] = result
-            result_data.append(result_row)
-
-        result_df = pd.DataFrame(result_data).set_index("name")
-        result_df = result_df.dropna(axis=1, how="all")
-        result_df = result_df.loc[:, (result_df != 0).any(axis=0)]
-        result_df = result_df.loc[:, ~result_df.isna().all(axis=0)]
-        result_df = result_df.reindex(
-            sorted(result_df.columns, key=self.sort_key), axis=1
-        )
-        return result_df
+        index, columns, values = self._evaluate_formula(
+            pivot_tables, criteria, formula, plan)
+        keep = ~np.isnan(values).all(axis=0) & (values != 0).any(axis=0)
+        return get_result_df(
+            index, columns, values, keep, self.get_column_order(columns))
 
     def eval_formula(self, pivot_tables, formula, index, column):
         """
-        Evaluates a custom formula using the data from pivot tables.
+        Evaluates a custom formula for one cell using the data from pivot tables. The
+        formula is compiled once (see `xl.xl_formula`); use `process_formula` to
+        evaluate it for all the cells at once.
 
         Args:
             pivot_tables (dict): Dictionary of pivot tables.
@@ -205,44 +647,53 @@ class XlPivotWriter(XlWriter):
             column: The column (column) to look up.
 
         Returns:
-            float: The evaluated result of the formula, or NaN if an error occurs.
-        """
-        tokens = re.findall(
-            r"[\d.]+(?:[eE][+-]?\d+)?|[+\-*/()]|[\w.]+", formula)
-        for i, token in enumerate(tokens):
-            if re.match(r"^\d", token):
-                tokens[i] = token.replace(",", ".")
-            elif re.match(r"^[a-zA-Z]", token):
-                criterion = token
-                if (
-                    criterion in pivot_tables
-                    and column in pivot_tables[criterion].columns
-                    and index in pivot_tables[criterion].index
-                ):
-                    value = pivot_tables[criterion].at[index, column]
-                    if pd.isna(value):
-                        return np.nan
-                    tokens[i] = str(value) if value is not None else "0"
-                else:
-                    tokens[i] = "0"
-
-        final_formula = "".join(tokens)
-        try:
-            return eval(final_formula)  # pylint: disable=eval-used
-        except ZeroDivisionError:
-            return np.nan
-        except NameError as e:
-            print(f"Error evaluating formula: {final_formula}, {e}")
-            return np.nan
+            float: The evaluated result of the formula, or NaN if a value is NaN or a
+            divisor is zero.
 
-    def add_index_sheet(self, pivot_infos_df):
+        Raises:
+            FormulaSyntaxError: If the formula is not valid.
+        """
+
+        def resolve(criterion):
+            if (
+                criterion in pivot_tables
+                and column in pivot_tables[criterion].columns
+                and index in pivot_tables[criterion].index
+            ):
+                value = pivot_tables[criterion].at[index, column]
+                return np.nan if pd.isna(value) else value
+            return 0
+
+        return np.asarray(compile_formula(formula).evaluate(resolve)).item()
+
+    def add_index_sheet(self, pivot_infos_df, language=None):
         """
         Creates an index sheet listing the pivot information.
 
         Args:
             pivot_infos_df (DataFrame): DataFrame containing information about the pivots.
+            language (str, optional): The language of the titles and sheet prefixes.
+                                      Defaults to the language of the context.
+        """
+        return self.write_index_sheet(
+            self.get_index_df(pivot_infos_df, language))
+
+    @staticmethod
+    def get_index_df(pivot_infos_df, language=None):
+        """
+        Builds the content of the index sheet, with the titles and sheet prefixes
+        resolved from the ResourceStrings.
+
+        Args:
+            pivot_infos_df (DataFrame): DataFrame containing information about the pivots.
+            language (str, optional): The language of the titles and sheet prefixes.
+                                      Defaults to the language of the context.
+
+        Returns:
+            DataFrame: The index, sorted by title.
         """
-        sheet_name = "Index"
+        if language is None:
+            language = project.context.language
         columns_to_drop = [
             "id",
             "show_rows",
@@ -253,119 +704,173 @@ class XlPivotWriter(XlWriter):
         df = pivot_infos_df.drop(columns=columns_to_drop)
 
         # add missing columns from the ResourceStrings
-        df["sheet_prefix"] = df["query_name"].apply(project.get_sheet_prefix)
-        df["title"] = df["query_name"].apply(project.get_sheet_title)
+        df["sheet_prefix"] = df["query_name"].apply(
+            lambda name: project.get_resource_string(
+                f"{name}_Sheet_Prefix", language))
+        df["title"] = df["query_name"].apply(
+            lambda name: project.get_resource_string(f"{name}_Title", language))
 
         # reorder the columns
         desired_order = ["title", "sheet_prefix", "formula", "query_name"]
         df = df[desired_order]
 
-        df = df.sort_values(by="title", ascending=True)
-        sh = XlSheetWriter(self.writer, sheet_name, df)
-        sh.finalize_sheet(portrait=False, title="Index")
+        return df.sort_values(by="title", ascending=True)
+
+    def write_index_sheet(self, index_df):
+        """
+        Writes the index sheet.
+
+        Args:
+            index_df (DataFrame): The content of the index sheet, see `get_index_df`.
+
+        Returns:
+            XlSheetWriter: The index sheet object; None if the sheet is unchanged.
+        """
+        sh = self.add_sheet("Index", index_df, {"portrait": False, "title": "Index"})
+        if sh is not None:
+            sh.finalize_sheet(portrait=False, title="Index")
         return sh
 
-    def finalize_data_sheet(self, sh, row):
+    def finalize_data_sheet(self, sh, row, title=None):
         """
-        Finalizes the data sheet by adding total and delta rows if specified.
+        Finalizes the data sheet by adding total and delta rows if specified. With the
+        'values' totals mode, the rows are already part of the data of the sheet.
 
         Args:
             sh (XlSheetWriter): The sheet writer object.
             row (Series): The row containing the specifications for the sheet.
+            title (str, optional): The title of the sheet. Defaults to the English title
+                                   of the query.
         """
+        if self.totals != TOTALS_VALUES:
+            if row["show_total"]:
+                self.add_total_row(sh)
 
-        if not row["show_init"]:
-            self.remove_init_row(sh.ws)
-
-        if row["show_total"]:
-            self.add_total_row(sh.ws)
-
-        if row["show_delta"]:
-            self.add_delta_row(sh.ws)
+            if row["show_delta"]:
+                self.add_delta_row(sh)
 
-        sheet_base_name = row["query_name"]
-        sh.finalize_sheet(
-            portrait=False,
-            title=project.this_db.get_resource_string(
-                f"{sheet_base_name}_Title",
-                "en"),
-        )
+        if title is None:
+            title = project.this_db.get_resource_string(
+                f"{row['query_name']}_Title", "en")
+        sh.finalize_sheet(portrait=False, title=title)
 
-    def add_delta_row(self, ws):
+    def add_delta_row(self, sh):
         """
         Adds a row to the sheet that calculates the delta (difference) between columns.
 
         Args:
-            ws (Worksheet): The worksheet object.
+            sh (XlSheetWriter): The sheet writer object.
         """
-        last_row = ws.max_row
-        last_col = ws.max_column
-
-        ws.cell(row=last_row + 1, column=1, value="Delta")
+        last_row = sh.max_row
+        last_col = sh.max_column
 
+        values = ["Delta", None]
         for col in range(3, last_col + 1):
-            col_letter = openpyxl.utils.get_column_letter(col)
-            prev_col_letter = openpyxl.utils.get_column_letter(col - 1)
-            delta_formula = f"={col_letter}{last_row}-{prev_col_letter}{last_row}"
-            ws.cell(row=last_row + 1, column=col, value=delta_formula)
-
-    def remove_init_row(self, ws):
+            col_letter = get_column_letter(col)
+            prev_col_letter = get_column_letter(col - 1)
+            values.append(f"={col_letter}{last_row}-{prev_col_letter}{last_row}")
+
+        results = None
+        if self.totals == TOTALS_CACHED:
+            # the last row is the Total row if it was appended after the data
+            if last_row > len(sh.df) + 1:
+                source = get_total_row(sh.df)
+            else:
+                source = get_last_row(sh.df)
+            results = get_delta_row(source)
+        sh.append_row(values, results)
+
+    def remove_init_row(self, df):
         """
-        Adds a row to the sheet that calculates the total for each column.
+        Removes the last row of a result if it is the 'zz_Init' row. The row is removed
+        before the sheet is written, since rows cannot be deleted with every engine.
 
         Args:
-            ws (Worksheet): The worksheet object.
+            df (DataFrame): The result of a formula, with the row names as first column.
+
+        Returns:
+            DataFrame: The result without the 'zz_Init' row.
         """
-        last_row = ws.max_row
-        if ws.cell(row=last_row, column=1).value == "zz_Init":
-            ws.delete_rows(last_row)
+        if len(df) and df.iloc[-1, 0] == "zz_Init":
+            return df.iloc[:-1]
+        return df
 
-    def add_total_row(self, ws):
+    def add_total_row(self, sh):
         """
         Adds a row to the sheet that calculates the total for each column.
 
         Args:
-            ws (Worksheet): The worksheet object.
+            sh (XlSheetWriter): The sheet writer object.
         """
-        last_row = ws.max_row
-        last_col = ws.max_column
-
-        ws.cell(row=last_row + 1, column=1, value="Total")
+        last_row = sh.max_row
+        last_col = sh.max_column
 
+        values = ["Total"]
         for col in range(2, last_col + 1):
-            col_letter = openpyxl.utils.get_column_letter(col)
-            sum_formula = f"=SUM({col_letter}2:{col_letter}{last_row})"
-            ws.cell(row=last_row + 1, column=col, value=sum_formula)
+            col_letter = get_column_letter(col)
+            values.append(f"=SUM({col_letter}2:{col_letter}{last_row})")
 
-    def export_chart(self, data_sheet, row):
+        results = None
+        if self.totals == TOTALS_CACHED:
+            results = get_total_row(sh.df)
+        sh.append_row(values, results)
+
+    def export_chart(self, data_sheet, row, texts=None):
         """
         Exports a chart based on the data in the provided sheet.
 
         Args:
             data_sheet (XlSheetWriter): The sheet containing the data for the chart.
             row (Series): The row containing information about the pivot and the graph.
+            texts (PivotTexts, optional): The texts of the pivot. Defaults to the texts
+                                          in the language of the context.
 
         Returns:
             XlSheetWriter: The chart sheet object.
         """
-        query_name = row["query_name"]
-        language = project.context.language
+        if texts is None:
+            texts = PivotTexts.resolve(
+                row["query_name"], project.context.language)
 
-        chart_sheet_name = (
-            project.get_resource_string(f"{query_name}_Sheet_Prefix", language)
-            + "_Chart"
-        )
-
-        labels = ChartLabels(
-            title=project.get_resource_string(f"{query_name}_Title", language),
-            x_label=project.get_resource_string(f"{query_name}_X_Label", language),
-            y_label=project.get_resource_string(f"{query_name}_Y_Label", language),
-        )
-
-        sh = self.add_chart_sheet(data_sheet, chart_sheet_name, labels)
+        sh = self.add_chart_sheet(
+            data_sheet, texts.chart_sheet_name, texts.labels)
         sh.show_rows = row["show_rows"]
         sh.show_total = row["show_total"]
         sh.show_delta = row["show_delta"]
         sh.show_init = row["show_delta"]
         sh.create_chart()
         return sh
+
+
+# pylint: disable=too-many-arguments
+def render_language_report(
+        xl_file,
+        index_df,
+        results,
+        texts,
+        profile=PROFILE_FORMATTED,
+        engine=ENGINE_OPENPYXL,
+        table_style=None,
+        totals=TOTALS_FORMULAS):
+    """
+    Renders and saves one workbook from computed pivots and their texts in one language.
+    The function is executed in the worker processes of `create_language_reports`.
+
+    Args:
+        xl_file (str): The path to the Excel file.
+        index_df (DataFrame): The content of the index sheet.
+        results (list): The PivotResult of each pivot.
+        texts (list): The PivotTexts of each pivot, aligned with `results`.
+        profile (str, optional): The finalization profile of the writer.
+        engine (str, optional): The engine of the writer.
+        table_style (str, optional): The table style of the data sheets.
+        totals (str, optional): The totals mode of the writer.
+
+    Returns:
+        str: The path to the Excel file.
+    """
+    writer = XlPivotWriter(
+        xl_file, profile, engine, table_style, totals=totals)
+    writer.render_report(index_df, results, texts)
+    writer.save()
+    return xl_file
@@ -6,13 +6,17 @@ DataFrames, find rows with specific references, and convert DataFrames into vari
 for further processing.
 
 Classes:
+    ColumnSpec: A dataclass describing the target type and parsing rules of a column.
     XlReader: A class to handle Excel file operations, including reading sheets, converting data,
     and retrieving specific rows.
 
 Methods:
-    __init__(self, file_path, header=0):
+    __init__(self, file_path, match=None, header=0, parallel=False, max_sheet_workers=None):
         Initializes the `XlReader` object by loading all sheets from the specified Excel file into a
-        dictionary of DataFrames.
+        dictionary of DataFrames, optionally parsing the sheets concurrently.
+
+    apply_column_schema(self):
+        Converts the columns declared in `column_schema` column-wise, right after parsing.
 
     get_dataframe(self, sheet_name):
         Retrieves the DataFrame for a specific sheet name.
@@ -21,6 +25,12 @@ Methods:
         Finds the row index in the DataFrame where the reference value is found
         in the first column.
 
+    find_rows_with_refs(self, df, refs):
+        Finds the row indexes of several reference values in the first column.
+
+    find_header_row(self, df, columns, min_matches=None):
+        Finds the first row containing the expected column titles.
+
     data(self):
         Converts each DataFrame in the dictionary to a list of dictionaries.
 
@@ -37,9 +47,36 @@ Methods:
 # pylint: disable=broad-exception-caught
 
 import warnings
+from dataclasses import dataclass, field
 
+import numpy as np
 import pandas as pd
+from lib.utils import clean_numbers, convert_series_to_hours
 from shared import dlog
+from xl.xl_sheet_parser import read_sheets_in_parallel
+
+
+@dataclass
+class ColumnSpec:
+    """
+    A dataclass describing how a column is converted after parsing.
+
+    Attributes:
+        dtype (str): The target dtype (e.g. 'float64', 'Int64', 'string'). Defaults to None
+            (the dtype resulting from the conversion is kept).
+        number (bool): Whether the values are numbers, possibly formatted as strings.
+        thousands (str): The characters used as thousands separators. Defaults to "'".
+        decimal (str): The decimal separator. Defaults to ".".
+        duration (bool): Whether the values are durations converted to hours.
+        date_formats (list): The date formats tried in order to parse dates.
+    """
+
+    dtype: str = None
+    number: bool = False
+    thousands: str = "'"
+    decimal: str = "."
+    duration: bool = False
+    date_formats: list = field(default_factory=list)
 
 
 class XlReader:
@@ -47,13 +84,26 @@ class XlReader:
     The XlReader class is used to interact with Excel files, providing methods to load and
     manipulate data from Excel sheets into pandas DataFrames.
 
+    Subclasses can declare a `column_schema`, mapping sheet names to a dictionary of
+    column names and `ColumnSpec`. The declared columns are converted column-wise right
+    after parsing.
+
     Attributes:
         file_path (str): The path to the Excel file.
         df_dict (dict): A dictionary containing sheet names as keys and
         corresponding DataFrames as values.
     """
 
-    def __init__(self, file_path, match=None, header=0):
+    column_schema = {}
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+            self,
+            file_path,
+            match=None,
+            header=0,
+            parallel=False,
+            max_sheet_workers=None):
         """
         Initializes the XlReader object by reading all sheets from the specified Excel file
         into a dictionary of DataFrames.
@@ -62,20 +112,74 @@ class XlReader:
             file_path (str): The path to the Excel file.
             header (int, optional): The row number to use as the column names for the DataFrame.
                                     Defaults to 0.
+            parallel (bool, optional): Whether to parse the sheets concurrently in a process
+                                       pool, each worker opening the file in read-only mode.
+                                       Defaults to False.
+            max_sheet_workers (int, optional): The number of worker processes used when
+                                               `parallel` is True. Defaults to the number
+                                               of processors.
         """
         self.file_path = file_path
         self.df_dict = None
         self.match = match
         try:
-            # Suppress specific UserWarning from openpyxl
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore", UserWarning)
-                # Read all sheets into a dictionary of DataFrames
-                self.df_dict = pd.read_excel(
-                    self.file_path, sheet_name=None, header=header)
+            if parallel:
+                self.df_dict = read_sheets_in_parallel(
+                    self.file_path, header=header, max_workers=max_sheet_workers)
+            else:
+                # Suppress specific UserWarning from openpyxl
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", UserWarning)
+                    # Read all sheets into a dictionary of DataFrames
+                    self.df_dict = pd.read_excel(
+                        self.file_path, sheet_name=None, header=header)
         except Exception as e:
             dlog.info("Error reading Excel file %s: %s", self.file_path, e)
 
+        if self.df_dict:
+            self.apply_column_schema()
+
+    def apply_column_schema(self):
+        """
+        Converts the columns declared in `column_schema` in all the parsed sheets.
+
+        Columns absent from a sheet are ignored.
+        """
+        for sheet_name, columns in self.column_schema.items():
+            df = self.df_dict.get(sheet_name)
+            if df is None:
+                continue
+            for column, spec in columns.items():
+                if column in df.columns:
+                    df[column] = self.convert_column(df[column], spec)
+
+    @staticmethod
+    def convert_column(series, spec):
+        """
+        Converts a whole column according to a `ColumnSpec`.
+
+        Args:
+            series (pd.Series): The column to convert.
+            spec (ColumnSpec): The conversion to apply.
+
+        Returns:
+            pd.Series: The converted column. Values that cannot be converted become missing.
+        """
+        if spec.number:
+            series = clean_numbers(series, spec.thousands, spec.decimal)
+        elif spec.duration:
+            series = convert_series_to_hours(series)
+        elif spec.date_formats:
+            dates = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+            for date_format in spec.date_formats:
+                dates = dates.fillna(pd.to_datetime(
+                    series, format=date_format, errors="coerce"))
+            series = dates
+
+        if spec.dtype:
+            series = series.astype(spec.dtype)
+        return series
+
     def get_dataframe(self, sheet_name, first_row=1, first_col=1):
         """
         Retrieves the DataFrame for a specific sheet name with an offset.
@@ -116,6 +220,9 @@ class XlReader:
         Finds the row index in the DataFrame where the reference value is found
         in the first column.
 
+        The first column is compared with the reference in one vectorized operation.
+        Use `find_rows_with_refs` to look up several references.
+
         Args:
             df (pandas.DataFrame): The DataFrame to search.
             ref (str): The reference value to find in the first column.
@@ -123,10 +230,63 @@ class XlReader:
         Returns:
             int: The index of the row containing the reference value. Returns -1 if not found.
         """
-        for index, value in enumerate(df.iloc[:, 0]):
-            if value == ref:
-                return index
-        return -1
+        rows = np.flatnonzero((df.iloc[:, 0] == ref).to_numpy())
+        return int(rows[0]) if rows.size else -1
+
+    def find_rows_with_refs(self, df, refs):
+        """
+        Finds the row indexes of several reference values in the first column.
+
+        The first column is indexed once per call (see `_first_column_index`), instead
+        of being scanned for each reference.
+
+        Args:
+            df (pandas.DataFrame): The DataFrame to search.
+            refs (iterable): The reference values to find in the first column.
+
+        Returns:
+            list: The index of the row containing each reference value, -1 if not found.
+        """
+        index = self._first_column_index(df)
+        return [index.get(ref, -1) for ref in refs]
+
+    def find_header_row(self, df, columns, min_matches=None):
+        """
+        Finds the first row of the DataFrame containing the expected column titles.
+
+        All the rows are compared with the titles in one vectorized operation.
+
+        Args:
+            df (pandas.DataFrame): The DataFrame to search, typically read with header=None.
+            columns (iterable): The expected column titles.
+            min_matches (int, optional): The number of titles that must be found in the row.
+                                         Defaults to all of them.
+
+        Returns:
+            int: The index of the header row. Returns -1 if not found.
+        """
+        columns = list(columns)
+        if min_matches is None:
+            min_matches = len(columns)
+        matches = df.isin(columns).sum(axis=1).to_numpy()
+        rows = np.flatnonzero(matches >= min_matches)
+        return int(rows[0]) if rows.size else -1
+
+    @staticmethod
+    def _first_column_index(df):
+        """
+        Returns a dictionary mapping each value of the first column of the DataFrame to
+        the index of its first occurrence.
+
+        Args:
+            df (pandas.DataFrame): The DataFrame to index.
+
+        Returns:
+            dict: The first column values mapped to their row index.
+        """
+        first_col = df.iloc[:, 0]
+        positions = np.flatnonzero(~first_col.duplicated().to_numpy())
+        return dict(zip(first_col.iloc[positions], positions.tolist()))
 
     def data(self):
         """
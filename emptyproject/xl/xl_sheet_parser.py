@@ -0,0 +1,85 @@
+"""
+This module provides functions to parse the sheets of one Excel file concurrently.
+
+Each sheet is parsed in a worker process which opens the file itself, in read-only mode,
+and returns the DataFrame of a single sheet. The module imports nothing from the project,
+so that the workers only need pandas and openpyxl to parse a sheet. This does not keep a
+spawned worker (the default on Windows) from initializing the project environment: it
+re-imports the main module, e.g. `empty_project.py`, which imports `shared` and sets up
+the project and the loggers again. The loggers of a worker therefore append to the log
+files of the parent instead of truncating them (see `lib.logger`).
+
+Functions:
+    get_sheet_names(file_path): Returns the sheet names of an Excel file.
+    read_sheet(file_path, sheet_name, header): Parses one sheet into a DataFrame.
+    read_sheets_in_parallel(file_path, header, max_workers): Parses all sheets in a
+        process pool.
+"""
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import openpyxl
+import pandas as pd
+
+
+def get_sheet_names(file_path):
+    """
+    Returns the sheet names of an Excel file, in workbook order.
+
+    Args:
+        file_path (str): The path to the Excel file.
+
+    Returns:
+        list: The sheet names.
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def read_sheet(file_path, sheet_name, header=0):
+    """
+    Parses a single sheet of an Excel file into a DataFrame.
+
+    Args:
+        file_path (str): The path to the Excel file.
+        sheet_name (str): The name of the sheet to parse.
+        header (int, optional): The row number to use as the column names.
+
+    Returns:
+        pandas.DataFrame: The content of the sheet.
+    """
+    # Suppress specific UserWarning from openpyxl
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        return pd.read_excel(file_path, sheet_name=sheet_name, header=header)
+
+
+def read_sheets_in_parallel(file_path, header=0, max_workers=None):
+    """
+    Parses all the sheets of an Excel file concurrently in a process pool.
+
+    Args:
+        file_path (str): The path to the Excel file.
+        header (int, optional): The row number to use as the column names.
+        max_workers (int, optional): The number of worker processes. Defaults to the
+                                     number of processors, limited to the number of sheets.
+
+    Returns:
+        dict: The DataFrames keyed by sheet name, in workbook order.
+    """
+    sheet_names = get_sheet_names(file_path)
+    if len(sheet_names) < 2:
+        return {name: read_sheet(file_path, name, header) for name in sheet_names}
+
+    if max_workers is not None:
+        max_workers = min(max_workers, len(sheet_names))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(read_sheet, str(file_path), name, header)
+            for name in sheet_names]
+        return {name: future.result()
+                for name, future in zip(sheet_names, futures)}
@@ -0,0 +1,299 @@
+"""
+This module provides a write-only, constant-memory alternative to `XlWriter`.
+
+The sheets are created in an openpyxl `write_only` workbook: the rows of each sheet are
+streamed to disk as soon as the sheet is added, instead of being held as cell objects
+in an in-memory workbook model. Therefore everything that affects a sheet (formatting,
+column widths, print settings, header and footer, charts) is declared up front with a
+`SheetSpec` and applied while the rows are written.
+
+Classes:
+    - SheetSpec: A dataclass declaring the finalization of a streamed sheet.
+    - XlStreamSheet: A sheet whose rows are streamed when it is created.
+    - XlStreamChartSheet: A chart sheet referring to a streamed data sheet.
+    - XlStreamWriter: A class to manage streamed sheets and save them to an Excel file.
+
+Usage:
+    The `XlStreamWriter` provides the `add_sheet`, `add_chart_sheet`, `get_sheet` and `save`
+    methods of `XlWriter`, so it can be passed as writer to `DatabaseExporter`.
+
+Example:
+    xl_writer = XlStreamWriter('path_to_excel_file.xlsx')
+    xl_writer.add_sheet('Sheet1', data_frame, SheetSpec(title='My data', portrait=False))
+    xl_writer.save()
+"""
+
+from dataclasses import dataclass
+
+import openpyxl
+import pandas as pd
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from xl.xl_engine import (BODY_STYLE, FIRST_COLUMN_STYLE, HEADER_STYLE,
+                          OpenpyxlEngine, register_named_styles,
+                          set_cell_style)
+from xl.xl_writer import (XlChartWriter, XlSheetWriter, get_column_widths,
+                          save_workbook)
+
+
+@dataclass
+class SheetSpec:
+    """
+    A dataclass declaring how a streamed sheet is finalized.
+
+    Attributes:
+        title (str): The title to set in the header. Defaults to the sheet name.
+        portrait (bool): Whether to set the sheet to portrait mode.
+        fit_to_width (int): Fit the sheet to the specified number of pages in width.
+        fit_to_height (int): Fit the sheet to the specified number of pages in height.
+        formatted (bool): Whether to apply the header, first column and body styles.
+        max_number_width (int): The minimum width for the columns.
+        sample_size (int): The number of rows sampled to compute the column widths.
+    """
+
+    title: str = ""
+    portrait: bool = True
+    fit_to_width: int = 1
+    fit_to_height: int = 0
+    formatted: bool = True
+    max_number_width: int = 8
+    sample_size: int = None
+
+
+class XlStreamSheet(XlSheetWriter):
+    """
+    A sheet of a write-only workbook. The DataFrame is streamed to the sheet when it is
+    created, after the column widths, print settings and header/footer have been set.
+
+    Args:
+        book (openpyxl.Workbook): The write-only workbook.
+        sheet_name (str): The name of the sheet.
+        df (pd.DataFrame): The DataFrame to be written into the sheet.
+        spec (SheetSpec): The finalization of the sheet. Defaults to `SheetSpec()`.
+    """
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, book, sheet_name="Sheet1", df=None, spec=None):
+        if df is None:
+            df = pd.DataFrame()
+        if spec is None:
+            spec = SheetSpec()
+        self.writer = None
+        self.sheet_name = sheet_name
+        self.df = df
+        self.spec = spec
+        self.pipeline = None
+        self.engine = OpenpyxlEngine(book)
+        self.ws = book.create_sheet(sheet_name)
+        self._max_row = len(df) + 1 if len(df.columns) else 0
+        self._max_column = len(df.columns)
+
+        self.page_print_setting(
+            portrait=spec.portrait,
+            fit_to_width=spec.fit_to_width,
+            fit_to_height=spec.fit_to_height)
+        self.define_header_and_footer(spec.title or sheet_name)
+        if self._max_column:
+            self.adjust_column_width(spec.max_number_width, spec.sample_size)
+            self.write_rows()
+
+    @property
+    def max_row(self):
+        """
+        int: The index of the last row of the sheet.
+        """
+        return self._max_row
+
+    @property
+    def max_column(self):
+        """
+        int: The index of the last column of the sheet.
+        """
+        return self._max_column
+
+    def adjust_column_width(self, max_number_width=8, sample_size=None):
+        """
+        Set the column widths from the DataFrame, before any row is written.
+
+        Args:
+            max_number_width (int): The minimum width for the columns. Default is 8.
+            sample_size (int, optional): The number of rows sampled to compute the widths.
+        """
+        widths = get_column_widths(self.df, sample_size)
+        for i, width in enumerate(widths, 1):
+            self.ws.column_dimensions[get_column_letter(i)].width = max(
+                width, max_number_width)
+
+    def write_rows(self):
+        """
+        Stream the header and the rows of the DataFrame to the sheet, applying the named
+        styles to the cells if the sheet is formatted.
+        """
+        df = self.df.astype(object)
+        df = df.where(df.notna(), None)
+        formatted = self.spec.formatted
+
+        self.ws.append(
+            [self._cell(title, HEADER_STYLE if formatted else None)
+             for title in df.columns])
+        for row in df.itertuples(index=False, name=None):
+            if formatted:
+                row = [self._cell(row[0], FIRST_COLUMN_STYLE)] + [
+                    self._cell(value, BODY_STYLE) for value in row[1:]]
+            self.ws.append(row)
+
+    def _cell(self, value, style_name):
+        """
+        Creates a write-only cell with an optional named style, keeping the number
+        format derived from its value (e.g. of a date).
+
+        Args:
+            value: The value of the cell.
+            style_name (str): The name of a registered style, or None.
+
+        Returns:
+            WriteOnlyCell | Any: The styled cell, or the plain value without style.
+        """
+        if style_name is None:
+            return value
+        cell = WriteOnlyCell(self.ws, value=value)
+        set_cell_style(cell, style_name)
+        return cell
+
+    def format_worksheet(self):
+        """
+        Does nothing: the cells of a streamed sheet are styled while its rows are
+        written, as declared with `SheetSpec.formatted`.
+        """
+
+    def finalize_sheet(
+            self,
+            title="",
+            portrait=True,
+            fit_to_width=1,
+            fit_to_height=0):
+        """
+        Set the print settings and the header/footer of the sheet, which are written
+        when the workbook is saved. The formatting and the column widths were streamed
+        with the rows, as declared with the `SheetSpec`.
+
+        Args:
+            title (str): The title to set in the header. Defaults to the sheet name.
+            portrait (bool): Whether to set the sheet to portrait mode.
+            fit_to_width (int): Fit the sheet to the specified number of pages in width.
+            fit_to_height (int): Fit the sheet to the specified number of pages in height.
+        """
+        self.page_print_setting(
+            portrait=portrait, fit_to_width=fit_to_width, fit_to_height=fit_to_height)
+        self.define_header_and_footer(title or self.sheet_name)
+
+
+class XlStreamChartSheet(XlChartWriter):
+    """
+    A chart sheet of a write-only workbook, referring to a streamed data sheet.
+
+    Args:
+        book (openpyxl.Workbook): The write-only workbook.
+        data_work_sheet (XlStreamSheet): The sheet containing the data for the chart.
+        chart_sheet_name (str): The name of the chart sheet.
+        labels (ChartLabels): An object containing chart labels (title, x-axis, y-axis).
+    """
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, book, data_work_sheet, chart_sheet_name, labels):
+        self.data_sheet = data_work_sheet
+        self.labels = labels
+        self.chart = None
+        self.max_series = None
+        self.writer = None
+        self.sheet_name = chart_sheet_name
+        self.df = pd.DataFrame()
+        self.pipeline = None
+        self.engine = data_work_sheet.engine
+        self.ws = book.create_sheet(chart_sheet_name)
+
+
+class XlStreamWriter:
+    """
+    A class to manage writing streamed sheets (including charts) to an Excel file with
+    constant memory.
+
+    Args:
+        xl_file (str): The path to the Excel file.
+    """
+
+    def __init__(self, xl_file):
+        self.sheets = []
+        self._sheets_by_title = {}
+        self.xl_file = xl_file
+        self.chart_writer = XlStreamChartSheet
+        self.book = openpyxl.Workbook(write_only=True)
+        register_named_styles(self.book)
+
+    def add_sheet(self, sheet_name, df=None, spec=None):
+        """
+        Add a new sheet to the Excel file and stream its rows.
+
+        Args:
+            sheet_name (str): The name of the new sheet.
+            df (pd.DataFrame): The data to write to the sheet. Defaults to None.
+            spec (SheetSpec): The finalization of the sheet. Defaults to `SheetSpec()`.
+
+        Returns:
+            XlStreamSheet: The sheet object if the sheet is created; None otherwise.
+        """
+        if sheet_name not in self._sheets_by_title:
+            return self._register_sheet(
+                XlStreamSheet(self.book, sheet_name, df, spec))
+        return None
+
+    def add_chart_sheet(self, data_worksheet, chart_sheet_name, labels):
+        """
+        Add a new sheet with a chart to the Excel file. The chart is created with
+        `create_chart` on the returned object.
+
+        Args:
+            data_worksheet (XlStreamSheet): The worksheet containing the data for the chart.
+            chart_sheet_name (str): The name of the chart sheet.
+            labels (ChartLabels): The labels for the chart.
+
+        Returns:
+            XlStreamChartSheet: The chart sheet object if created; None otherwise.
+        """
+        if chart_sheet_name not in self._sheets_by_title:
+            return self._register_sheet(self.chart_writer(
+                self.book, data_worksheet, chart_sheet_name, labels))
+        return None
+
+    def get_sheet(self, sheet_name):
+        """
+        Retrieve an existing sheet by name.
+
+        Args:
+            sheet_name (str): The name of the sheet to retrieve.
+
+        Returns:
+            XlStreamSheet: The sheet object if the sheet is found; None otherwise.
+        """
+        return self._sheets_by_title.get(sheet_name)
+
+    def _register_sheet(self, sheet):
+        """
+        Adds a sheet to the list of sheets and to the title index.
+
+        Args:
+            sheet (XlStreamSheet): The sheet object.
+
+        Returns:
+            XlStreamSheet: The registered sheet object.
+        """
+        self.sheets.append(sheet)
+        self._sheets_by_title[sheet.sheet_name] = sheet
+        return sheet
+
+    def save(self):
+        """
+        Save the Excel file to the specified path.
+        """
+        save_workbook(
+            self.xl_file, bool(self.sheets), lambda: self.book.save(self.xl_file))
@@ -1,18 +1,47 @@
 """
 This module provides classes to handle the writing and manipulation of Excel files
-using the openpyxl and pandas libraries.
+using pandas and the openpyxl or XlsxWriter libraries (see `xl.xl_engine`).
 
 Classes:
     - ChartLabels: A dataclass to define labels for charts (title, x-axis, y-axis).
+    - FinalizeSpec: A dataclass holding the arguments of `XlSheetWriter.finalize_sheet`.
+    - FinalizePipeline: A class collecting the finalize specs of deferred sheets.
     - XlSheetWriter: A class to handle writing and formatting Excel sheets.
     - XlChartWriter: A subclass of XlSheetWriter to handle writing Excel sheets with charts.
     - XlWriter: A class to manage multiple sheets and save them to an Excel file.
 
+Functions:
+    - get_column_widths(df, sample_size): Computes the width of each column of a DataFrame.
+    - get_df_hash(df): Computes a hash of the content of a DataFrame.
+    - get_sheet_hash(df, rendering): Computes a hash of the DataFrame and rendering of a sheet.
+    - save_workbook(xl_file, has_sheets, write): Saves a workbook, logging the errors.
+
 Usage:
     The `XlWriter` class is used to write data to multiple sheets, with options for formatting
     and adding charts. The `XlSheetWriter` handles sheet-specific operations, while `XlChartWriter`
     provides chart functionality.
 
+    The `profile` of the `XlWriter` controls when the sheets are finalized:
+    - 'formatted' (default): `finalize_sheet` formats the sheet immediately.
+    - 'deferred': `finalize_sheet` registers the finalization, and `save` runs all of
+      them in one pass.
+    - 'raw': `finalize_sheet` does nothing, for fast data-only exports.
+
+    The `engine` of the `XlWriter` selects the backend: 'openpyxl' (default) or
+    'xlsxwriter', which is faster but cannot rename or reorder the sheets: a writer is
+    `editable` (rename_sheet, move_sheet, reorder_sheets) only with openpyxl.
+
+    With a `table_style` (e.g. 'TableStyleMedium2'), `format_worksheet` declares the data
+    range as a native Excel table instead of styling its cells one by one.
+
+    With `update=True`, an existing workbook is opened instead of being recreated: a
+    sheet is only rewritten when the hash of its DataFrame and of its rendering (the
+    profile, the table style and the `rendering` passed to `add_sheet`) differs from the
+    hash stored in the custom properties of the workbook at the previous save;
+    `add_sheet` returns None for the unchanged sheets, which are left untouched. The
+    charts are reloaded by openpyxl without all their formatting: the chart of an
+    unchanged sheet should be drawn again, see `open_unchanged_sheet`.
+
 Example:
     xl_writer = XlWriter('path_to_excel_file.xlsx')
     sheet = xl_writer.add_sheet('Sheet1', data_frame)
@@ -20,20 +49,111 @@ Example:
 
 Dependencies:
     - openpyxl: For writing and managing Excel files.
+    - xlsxwriter: Optional, for the 'xlsxwriter' engine.
     - pandas: For data handling.
     - shared.log: For logging operations.
 """
 
+import hashlib
+import os
 from dataclasses import dataclass
 
-import openpyxl
 import pandas as pd
-from openpyxl.chart import LineChart, Reference, Series
-from openpyxl.chart.axis import ChartLines
-from openpyxl.chart.layout import Layout, ManualLayout
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from openpyxl.utils import get_column_letter
+from openpyxl.utils import range_boundaries
 from shared import log
+from xl.xl_engine import (BODY_STYLE, ENGINE_OPENPYXL, ENGINES,
+                          FIRST_COLUMN_STYLE, HEADER_STYLE, TABLE_STYLE,
+                          get_engine)
+
+# Profiles of XlWriter
+PROFILE_FORMATTED = "formatted"
+PROFILE_DEFERRED = "deferred"
+PROFILE_RAW = "raw"
+PROFILES = (PROFILE_FORMATTED, PROFILE_DEFERRED, PROFILE_RAW)
+
+# Prefix of the custom document properties holding the hash of each sheet
+HASH_PROPERTY_PREFIX = "XlWriter hash "
+
+
+def get_column_widths(df, sample_size=None):
+    """
+    Computes the width of each column of a DataFrame, as the length of its longest value
+    or of its title, with one vectorized operation per column.
+
+    Args:
+        df (pd.DataFrame): The DataFrame written in the sheet.
+        sample_size (int, optional): The number of rows sampled for large DataFrames.
+                                     Defaults to all the rows.
+
+    Returns:
+        list: The width of each column, in column order.
+    """
+    if sample_size and len(df) > sample_size:
+        df = df.sample(n=sample_size, random_state=0)
+
+    widths = []
+    for i, column in enumerate(df.columns):
+        lengths = df.iloc[:, i].astype(str).str.len()
+        widths.append(max(len(str(column)), int(lengths.max()) if len(df) else 0))
+    return widths
+
+
+def get_df_hash(df):
+    """
+    Computes a hash of the content of a DataFrame: its column titles, its index and its
+    values, hashed with one vectorized operation.
+
+    Args:
+        df (pd.DataFrame): The DataFrame.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest.
+    """
+    digest = hashlib.sha256(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def get_sheet_hash(df, rendering=None):
+    """
+    Computes a hash of a sheet: the hash of its DataFrame and the representation of the
+    inputs of its rendering, so that a sheet is rewritten when either changes.
+
+    Args:
+        df (pd.DataFrame): The DataFrame of the sheet.
+        rendering (optional): The inputs of the rendering of the sheet, with a stable
+                              `repr` (e.g. a tuple or a dict of the finalize arguments).
+
+    Returns:
+        str: The hexadecimal SHA-256 digest.
+    """
+    digest = hashlib.sha256(get_df_hash(df).encode())
+    digest.update(repr(rendering).encode())
+    return digest.hexdigest()
+
+
+def save_workbook(xl_file, has_sheets, write):
+    """
+    Saves a workbook, logging the errors instead of raising them.
+
+    Args:
+        xl_file (str): The path to the Excel file.
+        has_sheets (bool): Whether the workbook has sheets; a workbook without sheet is
+                           not saved.
+        write (callable): Finalizes and writes the workbook to `xl_file`.
+    """
+    try:
+        if not has_sheets:
+            raise ValueError("No sheets found in the workbook.")
+        write()
+        log.info("%s successfully created.", xl_file)
+    except ValueError as e:
+        log.error("Error: %s", e)
+    except (IOError, OSError) as e:
+        log.error("File error while saving: %s", e)
+    # pylint: disable = broad-exception-caught
+    except Exception as e:
+        log.error("An unexpected error occurred: %s", e)
 
 
 @dataclass
@@ -52,6 +172,66 @@ class ChartLabels:
     y_label: str
 
 
+@dataclass
+class FinalizeSpec:
+    """
+    A dataclass holding the arguments of `XlSheetWriter.finalize_sheet`.
+
+    Attributes:
+        title (str): The title to set in the header.
+        portrait (bool): Whether to set the sheet to portrait mode.
+        fit_to_width (int): Fit the sheet to the specified number of pages in width.
+        fit_to_height (int): Fit the sheet to the specified number of pages in height.
+    """
+
+    title: str = ""
+    portrait: bool = True
+    fit_to_width: int = 1
+    fit_to_height: int = 0
+
+
+class FinalizePipeline:
+    """
+    Collects the finalize specs of the sheets of a workbook and runs them in one pass
+    when the workbook is saved.
+
+    Args:
+        raw (bool): Whether to drop the specs instead of running them. Defaults to False.
+    """
+
+    def __init__(self, raw=False):
+        self.raw = raw
+        self._specs = {}
+
+    def __len__(self):
+        return len(self._specs)
+
+    def register(self, sheet, spec):
+        """
+        Registers the finalize spec of a sheet. A later spec replaces the previous one
+        of the same sheet, so each sheet is finalized once.
+
+        Args:
+            sheet (XlSheetWriter): The sheet to finalize.
+            spec (FinalizeSpec): The finalize spec.
+        """
+        if not self.raw:
+            self._specs[id(sheet)] = (sheet, spec)
+
+    def run(self, engine):
+        """
+        Finalizes all the registered sheets, in registration order.
+
+        Args:
+            engine (OpenpyxlEngine | XlsxWriterEngine): The engine of the workbook.
+        """
+        if self._specs:
+            engine.register_styles()
+        for sheet, spec in self._specs.values():
+            sheet.apply_finalize_spec(spec)
+        self._specs.clear()
+
+
 class XlSheetWriter:
     """
     Base class to handle Excel sheet operations, including writing data,
@@ -62,83 +242,140 @@ class XlSheetWriter:
         sheet_name (str): The name of the sheet.
         df (pd.DataFrame): The DataFrame to be written into the sheet. Defaults to an
         empty DataFrame.
+        pipeline (FinalizePipeline): The pipeline deferring `finalize_sheet`. Defaults to
+        None, which finalizes the sheet immediately.
+        engine (OpenpyxlEngine | XlsxWriterEngine): The engine of the workbook. Defaults to
+        the engine matching the workbook of the writer.
+        table_style (str): The table style used by `format_worksheet` to format the sheet
+        as a table. Defaults to None, which styles the cells.
+        existing (bool): Whether the sheet already exists in the workbook, e.g. an
+        unchanged sheet in update mode: it is opened instead of being written. Defaults
+        to False.
     """
 
-    def __init__(self, writer, sheet_name="Sheet1", df=None):
+    # pylint: disable=too-many-arguments
+    def __init__(
+            self,
+            writer,
+            sheet_name="Sheet1",
+            df=None,
+            pipeline=None,
+            engine=None,
+            table_style=None,
+            existing=False):
         if df is None:
             df = pd.DataFrame()
         self.writer = writer
         self.sheet_name = sheet_name
+        self.df = df
+        self.pipeline = pipeline
+        self.table_style = table_style
+        self.engine = engine if engine is not None else get_engine(writer.book)
+        if existing:
+            self.ws = self.engine.get_worksheet(sheet_name)
+            return
         df.to_excel(
             writer,
             sheet_name=sheet_name,
             index=False)  # Creates the sheet
-        if isinstance(writer.book, openpyxl.Workbook):
-            self.ws = writer.book[sheet_name]
-        else:
-            raise NotImplementedError(
-                "This operation is only supported with openpyxl.")
+        self.ws = self.engine.get_worksheet(sheet_name, df)
+
+    @property
+    def max_row(self):
+        """
+        int: The index of the last row of the sheet.
+        """
+        return self.engine.max_row(self.ws)
+
+    @property
+    def max_column(self):
+        """
+        int: The index of the last column of the sheet.
+        """
+        return self.engine.max_column(self.ws)
+
+    def append_row(self, values, results=None):
+        """
+        Writes a row after the last row of the sheet.
 
-    def adjust_column_width(self, max_number_width=8):
+        Args:
+            values (list): The values of the row from the first column; strings starting
+                           with '=' are written as formulas.
+            results (list, optional): The computed results of the formulas, aligned with
+                                      the values, cached in the file (XlsxWriter only).
+        """
+        self.engine.write_row(self.ws, self.max_row + 1, values, results)
+
+    def adjust_column_width(self, max_number_width=8, sample_size=None):
         """
         Adjust the column widths based on the content of the cells.
 
+        The widths are computed from the DataFrame written in the sheet (see
+        `get_column_widths`) rather than from the worksheet cells. Sheets without a
+        DataFrame fall back to scanning the cells.
+
         Args:
             max_number_width (int): The minimum width for the columns. Default is 8.
+            sample_size (int, optional): The number of rows sampled to compute the widths
+                                         of large DataFrames. Defaults to all the rows.
         """
-        for i, column_cells in enumerate(self.ws.columns, 1):
-            max_length = max((len(str(cell.value))
-                             for cell in column_cells), default=0)
-            self.ws.column_dimensions[get_column_letter(i)].width = max(
-                max_length, max_number_width
-            )
+        if len(self.df.columns):
+            widths = get_column_widths(self.df, sample_size)
+        else:
+            widths = self.engine.scan_column_widths(self.ws)
+
+        for i, width in enumerate(widths, 1):
+            self.engine.set_column_width(
+                self.ws, i, max(width, max_number_width))
 
     def format_worksheet(self):
         """
         Apply basic formatting to the worksheet, including borders, font styles, and alignment.
+
+        The header row and the first column get the header styles, the other cells the body
+        style. All the cells are styled in a single pass using the workbook named styles.
+        If the sheet has a table style, it is formatted as a table instead.
+        """
+        max_row, max_column = self.max_row, self.max_column
+        if self.table_style and len(self.df.columns) and max_row > 1:
+            self.format_as_table(self.table_style)
+            return
+        self.engine.register_styles()
+        self.engine.apply_style(self.ws, HEADER_STYLE, 1, 1, 1, max_column)
+        self.engine.apply_style(self.ws, FIRST_COLUMN_STYLE, 2, 1, max_row, 1)
+        self.engine.apply_style(self.ws, BODY_STYLE, 2, 2, max_row, max_column)
+
+    def format_as_table(self, style_name=TABLE_STYLE):
+        """
+        Declare the data of the sheet, from A1 to the last row, as a native Excel table.
+
+        The table style renders the header, the first column and the banded rows, so the
+        formatting is stored once in the table definition instead of in every cell. The
+        rows appended after the DataFrame (e.g. totals) are part of the table.
+
+        Args:
+            style_name (str): The name of an Excel table style. Defaults to
+                              'TableStyleMedium2'.
+        """
+        headers = [
+            str(column) if str(column) else f"Column{i}"
+            for i, column in enumerate(self.df.columns, 1)]
+        self.engine.add_table(
+            self.ws, self.sheet_name, headers, self.max_row, style_name)
+
+    def apply_style(self, style_name, cell_range):
         """
-        thin_border = Border(
-            left=Side(style="thin"),
-            right=Side(style="thin"),
-            top=Side(style="thin"),
-            bottom=Side(style="thin"),
-        )
-        for row in self.ws.iter_rows():
-            for cell in row:
-                cell.border = thin_border
-
-        header_font = Font(bold=True)
-        header_fill = PatternFill(
-            start_color="FFE7E6E6", end_color="FFE7E6E6", fill_type="solid"
-        )
-        medium_border = Border(
-            left=Side(style="medium"),
-            right=Side(style="medium"),
-            top=Side(style="medium"),
-            bottom=Side(style="medium"),
-        )
-
-        for i in range(1, self.ws.max_row + 1):
-            self.ws.cell(row=i, column=1).border = medium_border
-            self.ws.cell(row=i, column=1).font = header_font
-            self.ws.cell(row=i, column=1).fill = header_fill
-            self.ws.cell(
-                row=i, column=1).alignment = Alignment(
-                horizontal="left")
-
-        for j in range(1, self.ws.max_column + 1):
-            self.ws.cell(row=1, column=j).border = medium_border
-            self.ws.cell(row=1, column=j).font = header_font
-            self.ws.cell(row=1, column=j).fill = header_fill
-
-        for j in range(2, self.ws.max_column + 1):
-            self.ws.cell(
-                row=1, column=j).alignment = Alignment(
-                horizontal="center")
-
-        self.ws.cell(
-            row=1, column=1).alignment = Alignment(
-            horizontal="center")
+        Apply a named style to all the cells of a range, e.g. the data body of the sheet.
+
+        Args:
+            style_name (str): The name of a style registered in the workbook
+                              (see `register_named_styles`).
+            cell_range (str): The range of cells in A1 notation (e.g. 'B2:F20').
+        """
+        self.engine.register_styles()
+        min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+        self.engine.apply_style(
+            self.ws, style_name, min_row, min_col, max_row, max_col)
 
     def finalize_sheet(
             self,
@@ -148,7 +385,8 @@ class XlSheetWriter:
             fit_to_height=0):
         """
         Finalize the sheet by applying formatting, adjusting print settings, and defining
-        headers/footers.
+        headers/footers. If the sheet has a pipeline, the finalization is registered and
+        runs when the workbook is saved.
 
         Args:
             title (str): The title to set in the header.
@@ -156,15 +394,26 @@ class XlSheetWriter:
             fit_to_width (int): Fit the sheet to the specified number of pages in width.
             fit_to_height (int): Fit the sheet to the specified number of pages in height.
         """
+        spec = FinalizeSpec(title, portrait, fit_to_width, fit_to_height)
+        if self.pipeline is None:
+            self.apply_finalize_spec(spec)
+        else:
+            self.pipeline.register(self, spec)
+
+    def apply_finalize_spec(self, spec):
+        """
+        Apply the formatting, print settings and headers/footers of a finalize spec.
+
+        Args:
+            spec (FinalizeSpec): The finalize spec.
+        """
         self.format_worksheet()
         self.page_print_setting(
-            portrait=portrait,
-            fit_to_width=fit_to_width,
-            fit_to_height=fit_to_height)
+            portrait=spec.portrait,
+            fit_to_width=spec.fit_to_width,
+            fit_to_height=spec.fit_to_height)
         self.adjust_column_width()
-        if title == "":
-            title = self.sheet_name
-        self.define_header_and_footer(title)
+        self.define_header_and_footer(spec.title or self.sheet_name)
 
     def page_print_setting(
             self,
@@ -180,18 +429,8 @@ class XlSheetWriter:
             fit_to_width (int): Fit the sheet to the specified number of pages in width.
             fit_to_height (int): Fit the sheet to the specified number of pages in height.
         """
-        self.ws.page_setup.paperSize = self.ws.PAPERSIZE_A4
-        self.ws.page_setup.orientation = (
-            self.ws.ORIENTATION_PORTRAIT if portrait else self.ws.ORIENTATION_LANDSCAPE)
-        self.ws.page_setup.fitToPage = True
-        self.ws.page_setup.fitToWidth = fit_to_width
-        self.ws.page_setup.fitToHeight = fit_to_height
-        self.ws.page_margins.left = 1
-        self.ws.page_margins.right = 1
-        self.ws.page_margins.top = 1.5
-        self.ws.page_margins.bottom = 1.0
-        self.ws.page_margins.header = 0.3
-        self.ws.page_margins.footer = 0.3
+        self.engine.set_page_setup(
+            self.ws, portrait, fit_to_width, fit_to_height)
 
     def define_header_and_footer(self, title):
         """
@@ -203,10 +442,7 @@ class XlSheetWriter:
         footer_text = '&L&"Arial"&12&F &C&"Arial"&12&A  &R&"Arial"&12&P/&N'
         header_text = f'&C&"Arial,Bold"&16{title}&R&"Arial"&12&D'
 
-        self.ws.oddHeader.center.text = header_text
-        self.ws.oddFooter.center.text = footer_text
-        self.ws.evenHeader.center.text = header_text
-        self.ws.evenFooter.center.text = footer_text
+        self.engine.set_header_and_footer(self.ws, header_text, footer_text)
 
 
 class XlChartWriter(XlSheetWriter):
@@ -218,6 +454,10 @@ class XlChartWriter(XlSheetWriter):
         data_work_sheet (XlSheetWriter): The sheet containing the data for the chart.
         chart_sheet_name (str): The name of the chart sheet.
         labels (ChartLabels): An object containing chart labels (title, x-axis, y-axis).
+
+    Attributes:
+        max_series (int): The maximum number of data rows drawn as series. Defaults to
+        None (all the rows).
     """
 
     def __init__(self, writer, data_work_sheet, chart_sheet_name, labels):
@@ -234,27 +474,22 @@ class XlChartWriter(XlSheetWriter):
         self.data_sheet = data_work_sheet
         self.labels = labels
         self.chart = None
-        super().__init__(writer, chart_sheet_name)
+        self.max_series = None
+        super().__init__(writer, chart_sheet_name, engine=data_work_sheet.engine)
 
     def init_global_params(self):
         """
         Initializes the global parameters for the chart, including title, style, and axis labels.
-        Sets the categories for the chart based on the data in the worksheet.
-        """
-        self.chart = LineChart()
-        self.chart.title = self.labels.title
-        self.chart.style = 10
-        self.chart.x_axis.title = self.labels.x_label
-        self.chart.y_axis.title = self.labels.y_label
-
-        categories = Reference(
-            self.data_sheet.ws,
-            min_col=2,
-            min_row=1,
-            max_row=1,
-            max_col=self.data_sheet.ws.max_column,
-        )
-        self.chart.set_categories(categories)
+        """
+        self.chart = self.engine.create_chart(self.labels)
+
+    def set_categories(self):
+        """
+        Sets the header row of the data worksheet (after the name column) as categories of
+        all the series of the chart. It must be called once all the series are added.
+        """
+        self.engine.set_categories(
+            self.chart, self.data_sheet.ws, self.data_sheet.max_column)
 
     def finalize_chart(self):
         """
@@ -263,45 +498,28 @@ class XlChartWriter(XlSheetWriter):
         Also defines the header and footer based on the chart title.
         """
         self.format_chart()
-        self.ws.add_chart(self.chart, "A1")
+        self.engine.insert_chart(self.ws, self.chart)
         self.page_print_setting(portrait=False)
         self.define_header_and_footer(self.labels.title)
 
     def add_chart_data(self, hidden_rows=0):
         """
-        Adds data to the chart by iterating over the rows of the data worksheet.
-        It takes into account hidden rows, if any, and appends the data series to the chart.
+        Adds the rows of the data worksheet to the chart as series, in one range: the
+        first column gives the titles of the series. It takes into account hidden rows,
+        if any, and the maximum number of series.
 
         Args:
-            hidden_rows (int, optional): The number of hidden rows to exclude from the chart.
-            Defaults to 0.
-        """
-        last_row = self.data_sheet.ws.max_row - hidden_rows
-        # Créez une référence pour les années (colonnes de la première ligne
-        # après le nom)
-        x_labels = Reference(
-            self.data_sheet.ws,
-            min_col=2,
-            max_col=self.data_sheet.ws.max_column,
-            min_row=1
-        )
-
-        for row in range(2, last_row + 1):
-            values = Reference(
-                self.data_sheet.ws,
-                min_col=2,
-                min_row=row,
-                max_row=row,
-                max_col=self.data_sheet.ws.max_column,
-            )
-            series = Series(
-                values, title=self.data_sheet.ws.cell(
-                    row, 1).value)
-            self.chart.series.append(series)
-            series.smooth = False
-
-        # Associez les années comme étiquettes pour l'axe X
-        self.chart.set_categories(x_labels)
+            hidden_rows (int, optional): The number of hidden rows at the end of the sheet
+            (e.g. Total, Delta) to exclude from the chart. Defaults to 0.
+        """
+        last_row = self.data_sheet.max_row - hidden_rows
+        if self.max_series is not None:
+            last_row = min(last_row, self.max_series + 1)
+        if last_row < 2:
+            return
+
+        self.engine.add_row_series(
+            self.chart, self.data_sheet.ws, 2, last_row, self.data_sheet.max_column)
 
     def create_chart(self):
         """
@@ -312,67 +530,172 @@ class XlChartWriter(XlSheetWriter):
 
         # method to overload if necessary
         self.add_chart_data()
+        self.set_categories()
         self.finalize_chart()
 
     def format_chart(self):
         """
         Apply formatting to the chart, including layout and axis settings.
         """
-        self.chart.width = 1300 / 72 * 2.54
-        self.chart.height = 800 / 72 * 2.54
+        self.engine.format_chart(self.chart, self.labels)
 
-        self.chart.y_axis.majorGridlines = ChartLines()
-        self.chart.y_axis.minorGridlines = ChartLines()
-        self.chart.y_axis.minorTickMark = "out"
 
-        self.chart.x_axis.minorGridlines = ChartLines()
-        self.chart.x_axis.minorTickMark = "out"
-        self.chart.x_axis.tickLblPos = "low"
-        self.chart.y_axis.tickLblPos = "low"
-
-        self.chart.x_axis.number_format = "General"
-        self.chart.y_axis.number_format = "General"
-
-        self.chart.x_axis.tickLblSkip = 1
-        self.chart.y_axis.tickLblSkip = 1
-
-        self.chart.layout = Layout(
-            manualLayout=ManualLayout(x=0.005, y=0.005, h=0.90, w=0.85)
-        )
-
-
-class XlWriter:
+class XlWriter:  # pylint: disable=too-many-instance-attributes
     """
     A class to manage writing multiple sheets (including charts) to an Excel file.
 
     Args:
         xl_file (str): The path to the Excel file.
+        profile (str): 'formatted', 'deferred' or 'raw', see the module documentation.
+                       Defaults to 'formatted'.
+        engine (str): 'openpyxl' or 'xlsxwriter'. Defaults to 'openpyxl'.
+        table_style (str): The table style of the data sheets, see
+                           `XlSheetWriter.format_as_table`. Defaults to None, which
+                           styles the cells.
+        update (bool): Whether to update the existing Excel file, rewriting only the
+                       sheets whose DataFrame or rendering changed. Defaults to False.
+        editable (bool): Whether the sheets can be renamed and reordered once written.
+                         Defaults to True with openpyxl, False with XlsxWriter.
+
+    Attributes:
+        unchanged_sheets (list): The names of the sheets left untouched in update mode.
+
+    Raises:
+        ValueError: If the profile or the engine is unknown, or if the update mode or an
+                    editable writer is requested with another engine than openpyxl.
     """
 
-    # pylint: disable=abstract-class-instantiated
-    def __init__(self, xl_file):
+    # pylint: disable=abstract-class-instantiated,too-many-arguments
+    def __init__(
+            self,
+            xl_file,
+            profile=PROFILE_FORMATTED,
+            engine=ENGINE_OPENPYXL,
+            table_style=None,
+            update=False,
+            editable=None):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile: {profile}")
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        if update and engine != ENGINE_OPENPYXL:
+            raise ValueError("The update mode is only supported with openpyxl.")
+        if editable is None:
+            editable = engine == ENGINE_OPENPYXL
+        if editable and engine != ENGINE_OPENPYXL:
+            raise ValueError(
+                "Renaming and reordering the sheets is only supported with openpyxl.")
+        self.editable = editable
+        self.profile = profile
+        self.table_style = table_style
+        self.pipeline = None
+        if profile != PROFILE_FORMATTED:
+            self.pipeline = FinalizePipeline(raw=profile == PROFILE_RAW)
         self.sheets = []
+        self._sheets_by_title = {}
         self.xl_file = xl_file
         self.chart_writer = XlChartWriter
-        self.writer = pd.ExcelWriter(xl_file, engine="openpyxl")
+        self.update = update and os.path.exists(xl_file)
+        if self.update:
+            self.writer = pd.ExcelWriter(
+                xl_file, engine=engine, mode="a", if_sheet_exists="replace")
+        else:
+            self.writer = pd.ExcelWriter(xl_file, engine=engine)
+        self.engine = get_engine(self.writer.book)
+        self.unchanged_sheets = []
+        self._stored_hashes = {
+            name[len(HASH_PROPERTY_PREFIX):]: value
+            for name, value in self.engine.get_custom_properties().items()
+            if name.startswith(HASH_PROPERTY_PREFIX)}
+        self._hashes = {}
+
+    def _register_sheet(self, sheet):
+        """
+        Adds a sheet writer to the list of sheets and to the title index.
 
-    def add_sheet(self, sheet_name, df=None):
+        Args:
+            sheet (XlSheetWriter): The sheet writer object.
+
+        Returns:
+            XlSheetWriter: The registered sheet writer object.
+        """
+        self.sheets.append(sheet)
+        self._sheets_by_title[sheet.sheet_name] = sheet
+        return sheet
+
+    def _check_editable(self):
         """
-        Add a new sheet to the Excel file.
+        Checks that the writer was created to modify the sheets already written.
+
+        Raises:
+            ValueError: If the writer is not editable.
+        """
+        if not self.editable:
+            raise ValueError(
+                "The sheets can only be renamed or reordered by an editable XlWriter.")
+
+    def add_sheet(self, sheet_name, df=None, rendering=None):
+        """
+        Add a new sheet to the Excel file. In update mode, a sheet of the existing file
+        is replaced, unless its DataFrame and its rendering are unchanged.
 
         Args:
             sheet_name (str): The name of the new sheet.
             df (pd.DataFrame): The data to write to the sheet. Defaults to None.
+            rendering (optional): The inputs of the rendering of the sheet besides the
+                                  profile and the table style of the writer, e.g. the
+                                  arguments of `finalize_sheet`. See `get_sheet_hash`.
 
         Returns:
             XlSheetWriter: The sheet writer object if the sheet is created; None otherwise.
         """
-        if self.get_sheet(sheet_name) is None:
-            sheet = XlSheetWriter(self.writer, sheet_name, df)
-            self.sheets.append(sheet)
-            return sheet
+        if sheet_name not in self._sheets_by_title:
+            if df is not None and len(df.columns):
+                self._hashes[sheet_name] = get_sheet_hash(
+                    df, (self.profile, self.table_style, rendering))
+                if self.is_unchanged(sheet_name, self._hashes[sheet_name]):
+                    log.info("Sheet %s is unchanged", sheet_name)
+                    self.unchanged_sheets.append(sheet_name)
+                    return None
+            return self._register_sheet(
+                XlSheetWriter(
+                    self.writer, sheet_name, df, self.pipeline, self.engine,
+                    self.table_style))
         return None
 
+    def is_unchanged(self, sheet_name, df_hash):
+        """
+        Checks whether a sheet of the existing file holds a DataFrame rendered the same
+        way, according to the hash stored when the file was saved.
+
+        Args:
+            sheet_name (str): The name of the sheet.
+            df_hash (str): The hash of the sheet, see `get_sheet_hash`.
+
+        Returns:
+            bool: True in update mode if the sheet exists with the same hash.
+        """
+        return (
+            self.update
+            and sheet_name in self.writer.book.sheetnames
+            and self._stored_hashes.get(sheet_name) == df_hash)
+
+    def open_unchanged_sheet(self, sheet_name):
+        """
+        Opens an unchanged sheet of the updated file, e.g. to draw a chart of its data
+        again. The sheet is neither rewritten nor finalized.
+
+        Args:
+            sheet_name (str): The name of the sheet.
+
+        Returns:
+            XlSheetWriter: The sheet writer object; None if the sheet is not unchanged.
+        """
+        if sheet_name not in self.unchanged_sheets:
+            return None
+        return XlSheetWriter(
+            self.writer, sheet_name, engine=self.engine, existing=True)
+
     def add_chart_sheet(self, data_worksheet, chart_sheet_name, labels):
         """
         Add a new sheet with a chart to the Excel file.
@@ -385,12 +708,10 @@ class XlWriter:
         Returns:
             XlChartWriter: The chart writer object if the sheet is created; None otherwise.
         """
-        if self.get_sheet(chart_sheet_name) is None:
-            sheet = self.chart_writer(
+        if chart_sheet_name not in self._sheets_by_title:
+            return self._register_sheet(self.chart_writer(
                 self.writer, data_worksheet, chart_sheet_name, labels
-            )
-            self.sheets.append(sheet)
-            return sheet
+            ))
         return None
 
     def get_sheet(self, sheet_name):
@@ -403,24 +724,103 @@ class XlWriter:
         Returns:
             XlSheetWriter: The sheet writer object if the sheet is found; None otherwise.
         """
-        for sheet in self.sheets:
-            if sheet.ws.title == sheet_name:
-                return sheet
-        return None
+        return self._sheets_by_title.get(sheet_name)
+
+    def rename_sheet(self, sheet_name, new_name):
+        """
+        Rename a sheet, keeping the title index in sync. Sheets must be renamed through
+        this method rather than by setting `ws.title`.
+
+        Args:
+            sheet_name (str): The current name of the sheet.
+            new_name (str): The new name of the sheet.
+
+        Returns:
+            XlSheetWriter: The renamed sheet writer object; None if the sheet is not found
+            or the new name is already used.
+
+        Raises:
+            ValueError: If the writer is not editable.
+        """
+        self._check_editable()
+        sheet = self._sheets_by_title.get(sheet_name)
+        if sheet is None or new_name in self._sheets_by_title:
+            log.warning("Cannot rename the sheet %s to %s", sheet_name, new_name)
+            return None
+        sheet.ws.title = new_name
+        sheet.sheet_name = new_name
+        del self._sheets_by_title[sheet_name]
+        self._sheets_by_title[new_name] = sheet
+        # the hash follows the sheet; None removes the property of the former name
+        self._hashes[new_name] = self._hashes.pop(sheet_name, None)
+        self._hashes[sheet_name] = None
+        return sheet
+
+    @property
+    def sheet_names(self):
+        """
+        list: The names of the sheets in workbook order.
+        """
+        return list(self.writer.sheets)
+
+    def move_sheet(self, sheet_name, offset):
+        """
+        Move a sheet by a number of positions in the workbook.
+
+        Args:
+            sheet_name (str): The name of the sheet to move.
+            offset (int): The number of positions, negative to move towards the start.
+
+        Raises:
+            ValueError: If the writer is not editable.
+        """
+        self._check_editable()
+        self.writer.book.move_sheet(sheet_name, offset)
+        self._sort_sheets()
+
+    def reorder_sheets(self, sheet_names):
+        """
+        Reorder the sheets of the workbook. The listed sheets come first, in the given
+        order, followed by the other sheets in their current order.
+
+        Args:
+            sheet_names (list): The names of the sheets in the new order.
+
+        Raises:
+            KeyError: If a sheet name is not found in the workbook.
+            ValueError: If the writer is not editable.
+        """
+        self._check_editable()
+        book = self.writer.book
+        first = [book[name] for name in sheet_names]
+        listed = set(sheet_names)
+        # openpyxl has no public API to set the order of all the sheets at once
+        # pylint: disable=protected-access
+        book._sheets = first + [
+            ws for ws in book._sheets if ws.title not in listed]
+        self._sort_sheets()
+
+    def _sort_sheets(self):
+        """
+        Sorts the list of sheet writer objects in workbook order.
+        """
+        positions = {name: i for i, name in enumerate(self.sheet_names)}
+        self.sheets.sort(key=lambda sheet: positions[sheet.sheet_name])
 
     def save(self):
         """
         Save the Excel file to the specified path.
         """
-        try:
-            if not self.writer.book.sheetnames:
-                raise ValueError("No sheets found in the workbook.")
-            self.writer.close()
-            log.info("%s successfully created.", self.xl_file)
-        except ValueError as e:
-            log.error("Error: %s", e)
-        except (IOError, OSError) as e:
-            log.error("File error while saving: %s", e)
-        # pylint: disable = broad-exception-caught
-        except Exception as e:
-            log.error("An unexpected error occurred: %s", e)
+        save_workbook(self.xl_file, bool(self.writer.sheets), self._write)
+
+    def _write(self):
+        """
+        Runs the deferred finalizations, stores the hashes of the sheets and writes the
+        Excel file.
+        """
+        if self.pipeline is not None:
+            self.pipeline.run(self.engine)
+        for sheet_name, df_hash in self._hashes.items():
+            self.engine.set_custom_property(
+                HASH_PROPERTY_PREFIX + sheet_name, df_hash)
+        self.writer.close()
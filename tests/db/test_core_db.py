@@ -78,3 +78,49 @@ def test_get_resource_strings(core_db):
         resource_strings = core_db.get_resource_strings()
         assert resource_strings == mock_resource_strings
         mock_session.query().all.assert_called_once()
+
+
+def test_get_duplicates(core_db):
+    core_db.init_db()
+    session = core_db.get_session()
+    session.add_all([
+        Settings(key="a", p_value="1"),
+        Settings(key="a", p_value="1"),
+        Settings(key="a", p_value="2"),
+        Settings(key="b", p_value="1"),
+    ])
+    session.commit()
+
+    duplicates = core_db.get_duplicates("Settings", ["key", "p_value"])
+    assert [tuple(row) for row in duplicates] == [("a", "1", 2)]
+    assert duplicates[0].occurrences == 2
+    assert core_db.get_duplicates("Settings", ["p_value", "key"])[0].key == "a"
+
+
+def test_get_pivot_values(core_db):
+    core_db.init_db()
+    session = core_db.get_session()
+    session.add_all([
+        Casinos(name="b", online=True, dzs_id=1),
+        Casinos(name="a", online=True, dzs_id=2),
+        Casinos(name="b", online=False, dzs_id=3),
+        Casinos(name="b", online=True, dzs_id=4),
+        Casinos(name="a", online=False, dzs_id=None),
+    ])
+    session.commit()
+
+    # one cell per (name, online), summed, in the order of the table
+    values = core_db.get_pivot_values("Casinos", "name", "online", "online", "dzs_id")
+    assert [tuple(row) for row in values] == [
+        ("b", True, True, 5), ("a", True, True, 2),
+        ("b", False, False, 3), ("a", False, False, None)]
+    assert values[0]._fields == ("criterion_key", "index", "columns", "value")
+
+
+def test_get_pivot_values_requires_id(core_db):
+    class NoId:
+        name = "name"
+
+    with patch.object(core_db, "get_table_class", return_value=NoId):
+        with pytest.raises(ValueError):
+            core_db.get_pivot_values("NoId", "name", "name", "name", "name")
@@ -1,6 +1,6 @@
 import pytest
 from db.crud import CRUDRepository
-from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy import Column, Integer, String, UniqueConstraint, create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 Base = declarative_base()
@@ -14,6 +14,14 @@ class SampleModel(Base):
     name = Column(String, index=True)
 
 
+class CompositeModel(Base):
+    __tablename__ = 'composite_model'
+    __table_args__ = (UniqueConstraint('key', 'dimension'),)
+    id = Column(Integer, primary_key=True)
+    key = Column(String)
+    dimension = Column(String)
+
+
 # Create an in-memory SQLite database for testing
 DATABASE_URL = "sqlite:///:memory:"
 engine = create_engine(DATABASE_URL)
@@ -92,3 +100,37 @@ def test_delete(db_session):
 
         new_obj2 = SampleModel(name="Unique name 2")
         assert repo.check_constraints(db_session, new_obj2)
+
+
+def test_find_conflicts(db_session):
+    repo = CRUDRepository(CompositeModel)
+    assert repo.get_unique_constraints() == [('key', 'dimension')]
+    repo.create(db_session, CompositeModel(key="a", dimension="x"))
+
+    entries = [
+        CompositeModel(key="a", dimension="x"),  # stored
+        CompositeModel(key="a", dimension="y"),
+        CompositeModel(key="a", dimension="y"),  # in the batch
+        CompositeModel(key="b", dimension="x"),
+        CompositeModel(key="b", dimension=None),
+        CompositeModel(key="b", dimension=None),  # NULL never conflicts
+    ]
+    accepted, conflicts = repo.find_conflicts(db_session, entries)
+    assert accepted == [entries[1], entries[3], entries[4], entries[5]]
+    assert [(entry, key) for entry, _, key in conflicts] == [
+        (entries[0], ("a", "x")), (entries[2], ("a", "y"))]
+
+
+def test_get_existing_keys_filters_on_the_whole_key(db_session):
+    repo = CRUDRepository(CompositeModel)
+    for key, dimension in [("c", "x"), ("c", "y"), ("c", "z"), ("d", "x")]:
+        repo.create(db_session, CompositeModel(key=key, dimension=dimension))
+
+    entries = [
+        CompositeModel(key="c", dimension="y"),
+        CompositeModel(key="d", dimension="y"),
+        CompositeModel(key="c", dimension=None),
+    ]
+    assert repo.get_existing_keys(db_session, ("key", "dimension"), entries) == {
+        ("c", "y")}
+    assert repo.get_existing_keys(db_session, ("key",), entries) == {("c",), ("d",)}
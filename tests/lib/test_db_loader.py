@@ -80,3 +80,29 @@ def test_load_all_sheets(mock_log_info, mock_database, mock_excel_loader):
 class MockTableClass:
     def __init__(self, **kwargs):
         pass
+
+
+class MockCriteriaLoader(MockExcelLoader):
+    created = []
+
+    def __init__(self, xl_file, match=None, formulas=None):
+        super().__init__(xl_file, match)
+        self.formulas = formulas
+        self.created.append(self)
+
+
+@patch('lib.db_loader.CRUDRepository')
+@patch('lib.db_loader.project')
+def test_load_data_passes_reader_options(mock_project, mock_crud, mock_database):
+    """Test that load_data builds the reader with the reader options."""
+    mock_crud.return_value.find_conflicts.side_effect = lambda db, entries: (entries, [])
+    loader = DatabaseLoader(mock_database)
+
+    loader.load_data(
+        MockCriteriaLoader,
+        ["CriterionValues"],
+        "test.xlsx",
+        reader_options={"formulas": ["C_1 / C_2"]})
+
+    assert MockCriteriaLoader.created[-1].formulas == ["C_1 / C_2"]
+    mock_project.get_this_db.return_value.get_session.return_value.commit.assert_called_once()
@@ -1,5 +1,6 @@
 import logging
 import os
+from unittest.mock import patch
 
 import pytest
 from logger import debug_logger, setup_logging, user_logger
@@ -20,3 +21,51 @@ def test_log_configuration():
             case 'debug':
                 assert os.path.basename(os.path.abspath(
                     handler.baseFilename)) == 'debug.log'
+
+
+def test_worker_process_appends_to_log_files(tmp_path):
+    config_dir = tmp_path / "emptyproject" / "config"
+    config_dir.mkdir(parents=True)
+    config_path = config_dir / "logging_config.yaml"
+    config_path.write_text(
+        "version: 1\n"
+        "handlers:\n"
+        "  file:\n"
+        "    class: logging.FileHandler\n"
+        "    filename: worker.log\n"
+        "    mode: w\n"
+        "loggers:\n"
+        "  worker_logger:\n"
+        "    level: INFO\n"
+        "    handlers: [file]\n"
+        "    propagate: no\n",
+        encoding="utf-8")
+    log_file = tmp_path / "worker.log"
+    log_file.write_text("parent\n", encoding="utf-8")
+    try:
+        # a spawned worker re-imports the logger module: it must not truncate the log
+        with patch("multiprocessing.parent_process", return_value=object()):
+            setup_logging(str(config_path))
+        logging.getLogger("worker_logger").info("worker")
+    finally:
+        setup_logging()
+    assert log_file.read_text(encoding="utf-8").splitlines() == ["parent", "worker"]
+
+
+def test_log_directory_is_created(tmp_path):
+    config_dir = tmp_path / "emptyproject" / "config"
+    config_dir.mkdir(parents=True)
+    config_path = config_dir / "logging_config.yaml"
+    config_path.write_text(
+        "version: 1\n"
+        "handlers:\n"
+        "  file:\n"
+        "    class: logging.FileHandler\n"
+        "    filename: data/log/new.log\n"
+        "    mode: w\n",
+        encoding="utf-8")
+    try:
+        setup_logging(str(config_path))
+    finally:
+        setup_logging()
+    assert (tmp_path / "data" / "log" / "new.log").exists()
@@ -1,5 +1,8 @@
+import pandas as pd
 import pytest
-from lib.utils import create_short_name, format_class_name, get_uri_str
+from lib.utils import (clean_number, clean_numbers, convert_series_to_hours,
+                       convert_to_hours, create_short_name, format_class_name,
+                       get_uri_str)
 
 
 def test_create_short_name():
@@ -25,3 +28,21 @@ def test_get_uri_str():
     assert get_uri_str("mysql") is None
     assert get_uri_str("") is None
     assert get_uri_str(None) is None
+
+
+def test_convert_series_to_hours():
+    values = ["17:45 h", "10,5 h", "~ 240 minuti", "2h 19min", "24heures", "n/a", None]
+    hours = convert_series_to_hours(pd.Series(values))
+    expected = [17.75, 10.5, 4.0, 2 + 19 / 60, 24.0]
+    assert hours.iloc[:5].tolist() == pytest.approx(expected)
+    assert hours.iloc[5:].isna().all()
+    assert [convert_to_hours(v) for v in values[:5]] == pytest.approx(expected)
+
+
+def test_clean_numbers():
+    numbers = clean_numbers(pd.Series(["1'234.5", " 12 ", "abc", None, 7]))
+    assert numbers.iloc[:2].tolist() == [1234.5, 12.0]
+    assert numbers.iloc[2:4].isna().all()
+    assert numbers.iloc[4] == 7.0
+    assert clean_number("1'234.5") == 1234.5
+    assert clean_numbers(pd.Series(["1.234,5"]), thousands=".", decimal=",")[0] == 1234.5
@@ -0,0 +1,102 @@
+"""
+Test suite for the ThisExporter class.
+
+The CriterionValues and PivotInfos tables are generated for each project: the tests
+declare minimal models of them, found by `Database.get_table_class` in `db.models`.
+
+Fixtures:
+    - exporter: A ThisExporter on an in-memory database holding criterion values.
+
+Tests:
+    - test_get_pivot_data_aggregated_in_db: Checks that the pivots of the values
+      aggregated by the database equal those of the values loaded as ORM objects.
+    - test_get_pivot_data_rejects_duplicates: Checks that duplicated criterion values
+      are rejected before any value is transferred.
+"""
+# pylint: disable=redefined-outer-name,too-few-public-methods
+import db.models as tables
+import pandas as pd
+import pytest
+from db.core_db import CoreDB
+from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy.orm import declarative_base
+from this_exporter import ThisExporter
+from xl.xl_criterion_pivots import CriterionPivots
+
+Base = declarative_base()
+
+
+class CriterionValues(Base):
+    """
+    A minimal model of the generated 'CriterionValues' table.
+    """
+
+    __tablename__ = "CriterionValues"
+    id = Column(Integer, primary_key=True)
+    criterion_key = Column(String)
+    dimension_1 = Column(String)
+    dimension_2 = Column(String)
+    numeric_value = Column(Float)
+
+
+class PivotInfos(Base):
+    """
+    A minimal model of the generated 'PivotInfos' table.
+    """
+
+    __tablename__ = "PivotInfos"
+    id = Column(Integer, primary_key=True)
+    query_name = Column(String)
+    formula = Column(String)
+
+
+@pytest.fixture
+def exporter(tmp_path, monkeypatch):
+    """
+    Fixture that provides a ThisExporter on an in-memory database.
+    """
+    monkeypatch.setattr(tables, "CriterionValues", CriterionValues, raising=False)
+    monkeypatch.setattr(tables, "PivotInfos", PivotInfos, raising=False)
+    database = CoreDB("sqlite:///:memory:")
+    Base.metadata.create_all(database.get_engine())
+    session = database.get_session()
+    session.add(PivotInfos(query_name="Q1", formula="C_1 / C_2"))
+    session.add_all([
+        CriterionValues(
+            criterion_key=key, dimension_1=row, dimension_2=column, numeric_value=value)
+        for key, row, column, value in [
+            ("C_1", "S_02", "2024", 3.0),
+            ("C_1", "S_01", "2024", 1.0),
+            ("C_1", "S_01", "2023", None),
+            ("C_2", "S_01", "2023", 2.0),
+            ("C_2", "S_03", "2024", 4.0),
+        ]])
+    session.commit()
+    return ThisExporter(database, str(tmp_path / "export.xlsx"))
+
+
+def test_get_pivot_data_aggregated_in_db(exporter):
+    pivot_info_df, orm_df = exporter.get_pivot_data()
+    aggregated_info_df, aggregated_df = exporter.get_pivot_data(aggregate_in_db=True)
+
+    pd.testing.assert_frame_equal(aggregated_info_df, pivot_info_df)
+    assert orm_df.columns.tolist() == ["criterion_key", "index", "columns", "value"]
+    pd.testing.assert_frame_equal(aggregated_df, orm_df)
+
+    # dimension_1 gives the columns of the pivots, dimension_2 their rows
+    expected = CriterionPivots(orm_df)
+    pivots = CriterionPivots(aggregated_df)
+    assert list(pivots) == list(expected) == ["C_1", "C_2"]
+    assert pivots.columns.tolist() == ["S_02", "S_01", "S_03"]
+    assert pivots["C_1"].index.tolist() == ["2023", "2024"]
+    for criterion in expected:
+        pd.testing.assert_frame_equal(pivots[criterion], expected[criterion])
+
+
+def test_get_pivot_data_rejects_duplicates(exporter):
+    session = exporter.database.get_session()
+    session.add(CriterionValues(
+        criterion_key="C_1", dimension_1="S_01", dimension_2="2024", numeric_value=5.0))
+    session.commit()
+    with pytest.raises(ValueError):
+        exporter.get_pivot_data(aggregate_in_db=True)
@@ -75,3 +75,34 @@ def test_load_data_no_db_instance(mock_log):
 
     assert mock_log.error.called_with(
         "The database instance is not initialized: None")
+
+
+def test_load_data_bulk(mock_project, mock_log, xl_initial_data):
+    from sqlalchemy import Column, Integer, String, create_engine
+    from sqlalchemy.orm import declarative_base, sessionmaker
+
+    Base = declarative_base()
+
+    class Sheet1(Base):
+        __tablename__ = 'Sheet1'
+        id = Column(Integer, primary_key=True)
+        Column1 = Column(Integer)
+        Column2 = Column(String)
+
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    xl_initial_data.df_dict['Sheet1'] = pd.DataFrame({
+        'Column1': [1, 2, None],
+        'Column2': ['A', '', 'C'],
+        'Unnamed: 2': [None, None, None],
+    })
+
+    with patch('xl.xl_clean_reader.project.get_this_db') as get_this_db:
+        get_this_db.return_value.get_session.return_value = session
+        get_this_db.return_value.get_table_class.return_value = Sheet1
+        xl_initial_data.load_data(bulk=True)
+
+    session = sessionmaker(bind=engine)()
+    rows = [(r.Column1, r.Column2) for r in session.query(Sheet1).order_by(Sheet1.id)]
+    assert rows == [(1, 'A'), (2, None), (None, 'C')]
@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from xl.xl_criteria_reader import XlCriteriaReader
+from xl.xl_criterion_registry import (CRITERIA, CriterionRegistry,
+                                      find_referenced_criteria)
+
+PADDING = "x" * 32
+
+
+@pytest.fixture
+def sentences_df():
+    return pd.DataFrame({
+        "category_key": ["K1", "K2"],
+        "sentence": ["A cat sat" + PADDING, "Banana bread" + PADDING],
+        "Unnamed: 2": [None, None],
+    })
+
+
+@pytest.fixture
+def criteria_reader(sentences_df):
+    with patch('xl.xl_criteria_reader.XlReader.__init__', return_value=None):
+        reader = XlCriteriaReader("dummy_path")
+        reader.df_dict = {"Sentences": sentences_df}
+        yield reader
+
+
+def test_find_referenced_criteria():
+    formulas = ["C_1/C_3", "100 * C_2 / C_1", None]
+    assert find_referenced_criteria(formulas) == {"C_1", "C_2", "C_3"}
+    assert find_referenced_criteria(["2.5 * 3"]) == set()
+
+
+def test_registry_evaluate_in_one_pass():
+    registry = CriterionRegistry()
+
+    @registry.register("LEN", column="text", dtype="int64")
+    def length(texts):
+        return texts.str.len()
+
+    @registry.register("TWICE", column="text", dtype="int64", expensive=True)
+    def twice(texts):
+        return texts.str.len() * 2
+
+    df = pd.DataFrame({"text": ["ab", "abcd"]})
+    values = registry.evaluate(df, max_workers=2)
+
+    assert list(values) == ["LEN", "TWICE"]
+    assert values["LEN"].tolist() == [2, 4]
+    assert values["TWICE"].tolist() == [4, 8]
+    assert [c.key for c in registry.select(["TWICE + 1"])] == ["TWICE"]
+
+
+def test_load_data(criteria_reader):
+    data = criteria_reader.load_data(["CriterionValues"])
+
+    assert [entry["criterion_key"] for entry in data] == [
+        "C_1", "C_2", "C_3", "C_1", "C_2", "C_3"]
+    assert data[0] == {
+        "dimension_1": "S_01",
+        "dimension_2": "K1",
+        "criterion_key": "C_1",
+        "numeric_value": 9,
+        "text_value": "A cat sat",
+    }
+    assert [entry["numeric_value"] for entry in data[3:]] == [12, 4, 2]
+
+
+def test_load_data_skips_unreferenced_criteria(criteria_reader):
+    criteria_reader.formulas = ["C_2 / C_3"]
+    data = criteria_reader.load_data(["CriterionValues"])
+
+    assert {entry["criterion_key"] for entry in data} == {"C_2", "C_3"}
+    assert len(data) == 4
+    assert "C_1" in CRITERIA
@@ -0,0 +1,118 @@
+import openpyxl
+import pandas as pd
+import pytest
+from tools.compare_excel_result import compare_sheets, read_excel_files
+from xl.xl_engine import ENGINE_OPENPYXL, ENGINE_XLSXWRITER
+from xl.xl_pivot_writer import PivotTexts, XlPivotWriter
+from xl.xl_writer import ChartLabels, XlWriter
+
+pytest.importorskip("xlsxwriter")
+
+
+@pytest.fixture
+def pivot_report():
+    data_df = pd.DataFrame({
+        "criterion_key": ["C_1"] * 6,
+        "index": ["a", "a", "b", "b", "zz_Init", "zz_Init"],
+        "columns": ["2023", "2024"] * 3,
+        "value": [1.5, 2, 3, 4, 0, 1],
+    })
+    pivot_info_df = pd.DataFrame({
+        "query_name": ["Q1"],
+        "formula": ["C_1 * 2"],
+        "show_rows": [True],
+        "show_total": [True],
+        "show_delta": [False],
+        "show_init": [False],
+    })
+    index_df = pd.DataFrame({
+        "title": ["Q1 title"], "sheet_prefix": ["Q1"],
+        "formula": ["C_1 * 2"], "query_name": ["Q1"]})
+    texts = [PivotTexts("Q1_Data", "Q1_Chart", "Q1 title",
+                        ChartLabels("Q1 title", "years", "values"))]
+    return data_df, pivot_info_df, index_df, texts
+
+
+def write_report(xl_file, engine, pivot_report):
+    data_df, pivot_info_df, index_df, texts = pivot_report
+    writer = XlPivotWriter(str(xl_file), engine=engine)
+    results = writer.compute_pivot_results(data_df, pivot_info_df)
+    writer.render_report(index_df, results, texts)
+    writer.save()
+
+
+def test_engines_produce_equivalent_reports(tmp_path, pivot_report):
+    openpyxl_file = tmp_path / "openpyxl.xlsx"
+    xlsxwriter_file = tmp_path / "xlsxwriter.xlsx"
+    write_report(openpyxl_file, ENGINE_OPENPYXL, pivot_report)
+    write_report(xlsxwriter_file, ENGINE_XLSXWRITER, pivot_report)
+
+    excel1, excel2, sheets1, sheets2 = read_excel_files(
+        openpyxl_file, xlsxwriter_file)
+    assert sheets1 == sheets2 == ["Q1_Data"]
+    assert compare_sheets(excel1, excel2, sheets1) == {}
+
+    wb1 = openpyxl.load_workbook(openpyxl_file)
+    wb2 = openpyxl.load_workbook(xlsxwriter_file)
+    assert wb1.sheetnames == wb2.sheetnames == ["Index", "Q1_Data", "Q1_Chart"]
+    ws1, ws2 = wb1["Q1_Data"], wb2["Q1_Data"]
+    assert ws1.max_row == ws2.max_row == 4
+    assert ws1["A4"].value == ws2["A4"].value == "Total"
+    assert ws1["B4"].value == ws2["B4"].value == "=SUM(B2:B3)"
+    for cell in ["A1", "B1", "A2", "B2", "C3"]:
+        assert ws1[cell].font.b == ws2[cell].font.b
+        assert ws1[cell].border.left.style == ws2[cell].border.left.style
+        assert ws1[cell].alignment.horizontal == ws2[cell].alignment.horizontal
+    assert ws1.column_dimensions["A"].width == pytest.approx(
+        ws2.column_dimensions["A"].width, abs=1)
+    assert ws1.page_setup.orientation == ws2.page_setup.orientation == "landscape"
+    assert ws1.page_setup.paperSize == ws2.page_setup.paperSize
+    assert "Q1 title" in ws1.oddHeader.center.text
+    assert "Q1 title" in ws2.oddHeader.center.text
+    assert len(wb1["Q1_Chart"]._charts) == len(wb2["Q1_Chart"]._charts) == 1
+
+
+def test_xlsxwriter_styles_recorded_cells(tmp_path):
+    xl_file = tmp_path / "styles.xlsx"
+    df = pd.DataFrame({
+        "name": ["a", "b"],
+        "value": [1.5, float("nan")],
+        "date": pd.to_datetime(["2024-01-01", "2024-01-02"]),
+    })
+    writer = XlWriter(str(xl_file), engine=ENGINE_XLSXWRITER)
+    sheet = writer.add_sheet("Data", df)
+    sheet.append_row(["Total", "=SUM(B2:B3)"], ["Total", 1.5])
+    assert sheet.max_row == 4
+    assert sheet.max_column == 3
+    sheet.format_worksheet()
+    writer.save()
+
+    ws = openpyxl.load_workbook(xl_file)["Data"]
+    assert ws.max_row == 4
+    assert ws["A1"].font.b
+    assert ws["B2"].value == 1.5
+    assert ws["B3"].value is None
+    assert ws["B3"].border.left.style == ws["B2"].border.left.style
+    assert ws["C2"].is_date
+    assert ws["B4"].value == "=SUM(B2:B3)"
+    assert openpyxl.load_workbook(xl_file, data_only=True)["Data"]["B4"].value == 1.5
+
+
+def test_openpyxl_appends_rows_with_results(tmp_path):
+    xl_file = tmp_path / "results.xlsx"
+    writer = XlWriter(str(xl_file))
+    sheet = writer.add_sheet("Data", pd.DataFrame({"name": ["a"], "value": [2]}))
+    sheet.append_row(["Total", "=SUM(B2:B2)"], ["Total", 2])
+    writer.save()
+
+    assert openpyxl.load_workbook(xl_file)["Data"]["B3"].value == "=SUM(B2:B2)"
+
+
+def test_xlsxwriter_writer_is_not_editable(tmp_path):
+    xl_file = str(tmp_path / "editable.xlsx")
+    with pytest.raises(ValueError):
+        XlWriter(xl_file, engine=ENGINE_XLSXWRITER, editable=True)
+    writer = XlWriter(xl_file, engine=ENGINE_XLSXWRITER)
+    writer.add_sheet("Data", pd.DataFrame({"value": [1]}))
+    with pytest.raises(ValueError):
+        writer.rename_sheet("Data", "Other")
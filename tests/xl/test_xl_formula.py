@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from xl.xl_formula import (BinaryOp, Criterion, FormulaPlan,
+                           FormulaSyntaxError, Number, compile_formula,
+                           tokenize)
+
+
+def test_tokenize():
+    assert tokenize(" a.b*(2 + 1.5e3)") == [
+        ("name", "a.b"), ("operator", "*"), ("operator", "("), ("number", "2"),
+        ("operator", "+"), ("number", "1.5e3"), ("operator", ")")]
+    with pytest.raises(ValueError):
+        tokenize("a % b")
+
+
+def test_compile_formula_precedence():
+    compiled = compile_formula("a + b * 2")
+    assert compiled.root == BinaryOp(
+        "+", Criterion("a"), BinaryOp("*", Criterion("b"), Number(2)))
+    assert compiled.criteria == {"a", "b"}
+    assert compile_formula("-(1 + 2) * 3").evaluate(dict.get) == -9
+
+
+@pytest.mark.parametrize("formula", ["a +", "(a", "a b", "2 a", "1..2", ""])
+def test_compile_formula_errors(formula):
+    with pytest.raises(ValueError):
+        compile_formula(formula)
+
+
+def test_evaluate_arrays():
+    arrays = {"a": np.array([[1.0, 2.0], [np.nan, 4.0]]),
+              "b": np.array([[0.0, 4.0], [1.0, 2.0]])}
+    result = compile_formula("(a + missing) / b").evaluate(
+        lambda criterion: arrays.get(criterion, 0))
+    np.testing.assert_array_equal(result, [[np.nan, 0.5], [np.nan, 2.0]])
+
+
+def test_compile_formula_cached_and_safe():
+    assert compile_formula("a + 1") is compile_formula("a + 1")
+    with pytest.raises(FormulaSyntaxError) as error:
+        compile_formula("__import__('os')")
+    assert error.value.formula == "__import__('os')"
+
+
+def test_formula_plan_shares_subexpressions():
+    formulas = ["a / c + 1", "2 * (a / c)", "(b + a) * d", "(a + b) - d"]
+    plan = FormulaPlan(compile_formula(formula) for formula in formulas)
+    assert plan.criteria == {"a", "b", "c", "d"}
+    assert BinaryOp("/", Criterion("a"), Criterion("c")) in plan.shared
+    assert BinaryOp("+", Criterion("a"), Criterion("b")) in plan.shared
+
+    arrays = {"a": np.array([6.0, 1.0]), "b": np.array([2.0, 3.0]),
+              "c": np.array([3.0, 0.0]), "d": np.array([1.0, 2.0])}
+    resolved = []
+
+    def resolve(criterion):
+        resolved.append(criterion)
+        return arrays[criterion]
+
+    results = [plan.evaluate(formula, resolve) for formula in formulas]
+    assert sorted(resolved) == ["a", "b", "c", "d"]
+    for formula, result in zip(formulas, results):
+        np.testing.assert_array_equal(
+            result, compile_formula(formula).evaluate(arrays.get))
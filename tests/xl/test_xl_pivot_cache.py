@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from xl.xl_formula import compile_formula
+from xl.xl_pivot_cache import PivotCache
+from xl_pivot_writer import XlPivotWriter
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def data_df():
+    return pd.DataFrame({
+        "criterion_key": ["a", "a", "b", "b", "c"],
+        "index": ["x", "y", "x", "y", "x"],
+        "columns": [2023, 2024, 2023, 2024, 2023],
+        "value": [1.0, 2.0, 3.0, 4.0, 5.0],
+    })
+
+
+def test_keys_depend_on_referenced_data(tmp_path, data_df):
+    cache = PivotCache(str(tmp_path))
+    formulas = [compile_formula("b * 2"), compile_formula("c + 1")]
+    keys = cache.get_keys(data_df, formulas)
+
+    changed_c = data_df.copy()
+    changed_c.loc[4, "value"] = 6.0
+    changed_keys = cache.get_keys(changed_c, formulas)
+    assert changed_keys["b * 2"] == keys["b * 2"]
+    assert changed_keys["c + 1"] != keys["c + 1"]
+
+    # the first criterion gives the rows of every result
+    changed_a = data_df.copy()
+    changed_a.loc[0, "index"] = "z"
+    assert cache.get_keys(changed_a, formulas)["b * 2"] != keys["b * 2"]
+
+
+def test_put_get_and_evict(tmp_path):
+    df = pd.DataFrame({"name": ["x", "y"], 2023: [1.0, 2.0], "M_1": [3, 4]})
+    cache = PivotCache(str(tmp_path), max_entries=2)
+    cache.put("k1", df)
+    cache.put("k2", df)
+    assert cache.get("k1").equals(df)
+    cache.put("k3", df)
+
+    reopened = PivotCache(str(tmp_path), max_entries=2)
+    assert len(reopened) == 2
+    assert reopened.get("k2") is None
+    assert list(reopened.get("k3").columns) == ["name", 2023, "M_1"]
+
+
+def test_compute_pivot_results_from_cache(tmp_path, data_df):
+    pivot_info = pd.DataFrame({
+        "query_name": ["query_1", "query_2"],
+        "formula": ["a + b", "c / a"],
+    })
+    cache = PivotCache(str(tmp_path / "cache"))
+    writer = XlPivotWriter(str(tmp_path / "first.xlsx"), pivot_cache=cache)
+    results = writer.compute_pivot_results(data_df, pivot_info)
+    assert len(cache) == 2
+
+    writer = XlPivotWriter(
+        str(tmp_path / "second.xlsx"), pivot_cache=PivotCache(str(tmp_path / "cache")))
+    with patch.object(writer, "create_criterion_pivots") as create_pivots:
+        cached = writer.compute_pivot_results(data_df, pivot_info)
+    create_pivots.assert_not_called()
+    for result, expected in zip(cached, results):
+        assert result.row["query_name"] == expected.row["query_name"]
+        pd.testing.assert_frame_equal(result.df, expected.df)
@@ -0,0 +1,21 @@
+import pandas as pd
+import pytest
+from xl.xl_pivot_totals import append_summary_rows
+
+
+@pytest.mark.parametrize("show_total", [True, False])
+def test_append_summary_rows(show_total):
+    """
+    Test the Total and Delta rows appended as values, also to a result without value
+    column and without Total row.
+    """
+    row = {"show_total": show_total, "show_delta": True}
+    df = append_summary_rows(pd.DataFrame({"name": ["x", "y"]}), row)
+    expected = ["x", "y"] + (["Total"] if show_total else []) + ["Delta"]
+    assert df["name"].tolist() == expected
+
+    df = pd.DataFrame({"name": ["x", "y"], "2023": [1.0, 2.0], "2024": [4.0, 3.0]})
+    df = append_summary_rows(df, row)
+    assert df.iloc[-1, 0] == "Delta"
+    assert pd.isna(df.iloc[-1, 1])
+    assert df.iloc[-1, 2] == (7.0 - 3.0 if show_total else 3.0 - 2.0)
@@ -1,6 +1,13 @@
+from unittest.mock import patch
+
+import numpy as np
+import openpyxl
 import pandas as pd
 import pytest
-from xl_pivot_writer import XlPivotWriter
+from shared import project
+from this_project import Context
+from xl.xl_writer import ChartLabels
+from xl_pivot_writer import PivotResult, PivotTexts, XlPivotWriter
 
 
 @pytest.fixture
@@ -99,3 +106,308 @@ def test_process_formula(
     assert isinstance(result_df, pd.DataFrame)
     assert not result_df.empty
     assert result_df.shape[0] > 0
+
+
+def test_create_language_reports(tmp_path):
+    """
+    Test that the pivots are rendered once per language with translated texts.
+    """
+    data_df = pd.DataFrame({
+        "criterion_key": ["C_1"] * 4,
+        "index": ["a", "a", "b", "b"],
+        "columns": ["2023", "2024", "2023", "2024"],
+        "value": [1, 2, 3, 4],
+    })
+    pivot_info_df = pd.DataFrame({
+        "id": [1],
+        "query_name": ["Q1"],
+        "formula": ["C_1 * 2"],
+        "show_rows": [True],
+        "show_total": [True],
+        "show_delta": [False],
+        "show_init": [False],
+    })
+    xl_files = {
+        language: str(tmp_path / f"report_{language}.xlsx")
+        for language in ["de", "fr"]}
+    own_file = tmp_path / "report_en.xlsx"
+
+    writer = XlPivotWriter(str(own_file))
+    with patch.object(project, "get_resource_string",
+                      side_effect=lambda ref, language: f"{language}_{ref}"):
+        created = writer.create_language_reports(
+            data_df, pivot_info_df, xl_files, language="en", max_workers=2)
+    writer.save()
+
+    assert created == list(xl_files.values())
+    for language, xl_file in [("en", own_file), *xl_files.items()]:
+        wb = openpyxl.load_workbook(xl_file)
+        prefix = f"{language}_Q1_Sheet_Prefix"
+        assert wb.sheetnames == ["Index", f"{prefix}_Data", f"{prefix}_Chart"]
+        ws = wb[f"{prefix}_Data"]
+        assert [c.value for c in ws[3]] == ["b", 6, 8]
+        assert ws["A4"].value == "Total"
+        assert wb["Index"]["A2"].value == f"{language}_Q1_Title"
+
+
+def test_process_formula_semantics(xl_pivot_writer_instance):
+    """
+    Test that missing criteria count as 0, NaN propagates and a division by zero
+    gives NaN.
+    """
+    data_df = pd.DataFrame({
+        "criterion_key": ["a", "a", "a", "b", "b"],
+        "index": ["x", "x", "y", "x", "y"],
+        "columns": [1, 2, 1, 1, 2],
+        "value": [6.0, 3.0, 2.0, 2.0, 5.0],
+    })
+    criterion_pivots, criteria = xl_pivot_writer_instance.create_criterion_pivots(
+        data_df)
+
+    result_df = xl_pivot_writer_instance.process_formula(
+        criterion_pivots, criteria, "a / b + missing")
+
+    assert result_df.index.name == "name"
+    assert result_df.loc["x", 1] == 3.0
+    # b is missing at (x, 2) and a at (y, 2): the NaN column is dropped
+    assert 2 not in result_df.columns
+    # b is NaN at (y, 1)
+    assert pd.isna(result_df.loc["y", 1])
+    result_df = xl_pivot_writer_instance.process_formula(
+        criterion_pivots, criteria, "a / (b - b)")
+    assert result_df.empty
+
+
+def test_check_formulas(xl_pivot_writer_instance, sample_data, caplog):
+    """
+    Test that invalid formulas are reported once and their pivots skipped.
+    """
+    pivot_info = pd.DataFrame({
+        "query_name": ["query_1", "query_2", "query_3"],
+        "formula": ["criterion_1 * 2", "criterion_1 +* 2", None],
+    })
+    formulas = xl_pivot_writer_instance.check_formulas(pivot_info)
+    assert list(formulas) == [0]
+    assert "query_2" in caplog.text
+    assert "criterion_1 +* 2" in caplog.text
+
+    criterion_pivots, _ = xl_pivot_writer_instance.create_criterion_pivots(
+        sample_data)
+    assert xl_pivot_writer_instance.eval_formula(
+        criterion_pivots, "criterion_1 * 2 / (criterion_2 + 1)", "casino", "data_1") == 20
+    assert pd.isna(xl_pivot_writer_instance.eval_formula(
+        criterion_pivots, "criterion_1 / criterion_2", "casino", "data_1"))
+
+
+def test_criterion_pivots_match_per_criterion_pivots(xl_pivot_writer_instance):
+    """
+    Test that the single-pass pivots match a pivot of each criterion, and that
+    duplicated values are rejected.
+    """
+    data_df = pd.DataFrame({
+        "criterion_key": ["a", "a", "a", "b", "b"],
+        "index": ["y", "x", "x", "z", "x"],
+        "columns": [2, 1, 2, 3, 1],
+        "value": [1.0, 2.0, 3.0, 4.0, 5.0],
+    })
+    criterion_pivots, criteria = xl_pivot_writer_instance.create_criterion_pivots(
+        data_df)
+    assert list(criteria) == ["a", "b"]
+    for criterion in criteria:
+        expected = data_df[data_df["criterion_key"] == criterion].pivot(
+            index="index", columns="columns", values="value").reindex(
+                columns=[2, 1, 3], fill_value=0)
+        pd.testing.assert_frame_equal(
+            criterion_pivots[criterion], expected, check_dtype=False)
+    # b has no column 2 (0) and no row y (0); (x, 3) is missing in its column 3 (NaN)
+    np.testing.assert_array_equal(
+        criterion_pivots.aligned_values("b", "a"),
+        [[0.0, 5.0, np.nan], [0.0, 0.0, 0.0]])
+
+    with pytest.raises(ValueError):
+        xl_pivot_writer_instance.create_criterion_pivots(
+            pd.concat([data_df, data_df.head(1)]))
+
+
+def test_compute_pivot_results_pivots_referenced_criteria(xl_pivot_writer_instance):
+    """
+    Test that only the criteria referenced by the formulas, and the first one, are
+    pivoted, and that the planned results match the formulas evaluated one by one.
+    """
+    data_df = pd.DataFrame({
+        "criterion_key": ["a", "b", "c", "a", "b", "c"],
+        "index": ["x", "x", "x", "y", "y", "y"],
+        "columns": [1, 1, 1, 2, 2, 2],
+        "value": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+    })
+    pivot_info = pd.DataFrame({
+        "query_name": ["query_1", "query_2"],
+        "formula": ["c / b + 1", "2 * (c / b)"],
+    })
+    writer = xl_pivot_writer_instance
+    with patch.object(
+            writer, "create_criterion_pivots",
+            wraps=writer.create_criterion_pivots) as create_pivots:
+        results = writer.compute_pivot_results(data_df, pivot_info)
+    assert create_pivots.call_args.args[1] == {"a", "b", "c"}
+
+    criterion_pivots, criteria = writer.create_criterion_pivots(data_df)
+    for result, formula in zip(results, pivot_info["formula"]):
+        expected = writer.process_formula(criterion_pivots, criteria, formula)
+        result_df = result.df.set_index("name")
+        assert result_df.equals(expected[result_df.columns])
+
+    pivot_info["formula"] = ["b * 2", "b + 1"]
+    with patch.object(
+            writer, "create_criterion_pivots",
+            wraps=writer.create_criterion_pivots) as create_pivots:
+        writer.compute_pivot_results(data_df, pivot_info)
+    assert create_pivots.call_args.args[1] == {"a", "b"}
+
+
+def test_compute_pivot_results_in_threads(xl_pivot_writer_instance):
+    """
+    Test that the results computed in a thread pool equal the sequential results,
+    in the same order.
+    """
+    data_df = pd.DataFrame({
+        "criterion_key": [f"c{i % 4}" for i in range(48)],
+        "index": [f"e{i % 3}" for i in range(48)],
+        "columns": [i // 12 for i in range(48)],
+        "value": [float(i) for i in range(48)],
+    })
+    pivot_info = pd.DataFrame({
+        "query_name": [f"query_{i}" for i in range(8)],
+        "formula": [f"c{i % 4} / (c1 + c2) * {i}" for i in range(8)],
+    })
+    writer = xl_pivot_writer_instance
+    sequential = writer.compute_pivot_results(data_df, pivot_info)
+    threaded = writer.compute_pivot_results(data_df, pivot_info, max_workers=4)
+
+    assert [r.row["query_name"] for r in threaded] == list(pivot_info["query_name"])
+    for expected, result in zip(sequential, threaded):
+        pd.testing.assert_frame_equal(result.df, expected.df)
+
+
+def test_create_pivot_tables_in_threads(tmp_path, monkeypatch):
+    """
+    Test that the workbook written with the results computed in a thread pool has the
+    same sheets and cell values as the workbook written sequentially.
+    """
+    data_df = pd.DataFrame({
+        "criterion_key": [f"c{i % 4}" for i in range(48)],
+        "index": [f"e{i % 3}" for i in range(48)],
+        "columns": [str(2020 + i // 12) for i in range(48)],
+        "value": [float(i) for i in range(48)],
+    })
+    pivot_info = pd.DataFrame({
+        "id": range(8),
+        "query_name": [f"q{i}" for i in range(8)],
+        "formula": [f"c{i % 4} / (c1 + c2) * {i}" for i in range(8)],
+        "show_rows": [True] * 8,
+        "show_total": [i % 2 == 0 for i in range(8)],
+        "show_delta": [i % 3 == 0 for i in range(8)],
+        "show_init": [False] * 8,
+    })
+    monkeypatch.setattr(project, "context", Context(
+        language="en", operation="BO", database_type="sqlite", debug=False),
+        raising=False)
+
+    def write(max_workers):
+        xl_file = tmp_path / f"pivots_{max_workers}.xlsx"
+        writer = XlPivotWriter(str(xl_file))
+        with patch.object(project, "get_resource_string",
+                          side_effect=lambda ref, language: ref):
+            writer.add_index_sheet(pivot_info)
+            writer.create_pivot_tables(data_df, pivot_info, max_workers=max_workers)
+        writer.save()
+        return openpyxl.load_workbook(xl_file)
+
+    sequential, threaded = write(None), write(4)
+    assert threaded.sheetnames == sequential.sheetnames
+    assert len(sequential.sheetnames) == 17
+    for ws in sequential.worksheets:
+        assert list(threaded[ws.title].values) == list(ws.values)
+
+
+def test_prune_and_sort_columns(xl_pivot_writer_instance):
+    """
+    Test that the empty columns are pruned and the others sorted by sort_key.
+    """
+    writer = xl_pivot_writer_instance
+    columns = pd.Index(["M_10", "2", "M_1", "M_3"])
+    order = writer.get_column_order(columns)
+    assert columns[order].tolist() == ["M_1", "2", "M_3", "M_10"]
+
+    data_df = pd.DataFrame({
+        "criterion_key": ["a"] * 8,
+        "index": ["x"] * 4 + ["y"] * 4,
+        "columns": columns.tolist() * 2,
+        # M_10 is only set in the first row, M_3 is NaN or 0
+        "value": [1.0, 2.0, 0.0, np.nan, 0.0, 5.0, 6.0, 0.0],
+    })
+    criterion_pivots, criteria = writer.create_criterion_pivots(data_df)
+    result_df = writer.process_formula(criterion_pivots, criteria, "a")
+    assert result_df.columns.tolist() == ["M_1", "2", "M_3", "M_10"]
+    result = writer.compute_pivot_result(
+        criterion_pivots, criteria, pd.Series({"query_name": "q"}), "a")
+    assert result.df.columns.tolist() == ["name", "M_1", "2"]
+
+
+@pytest.mark.parametrize("totals", ["values", "cached"])
+def test_totals_as_values(tmp_path, totals):
+    """
+    Test that the Total and Delta rows are readable without recalculation.
+    """
+    engine = "openpyxl" if totals == "values" else "xlsxwriter"
+    if engine == "xlsxwriter":
+        pytest.importorskip("xlsxwriter")
+    df = pd.DataFrame({
+        "name": ["a", "b"], "2023": [1.0, 3.0], "2024": [2.0, None], "2025": [4.0, 6.0]})
+    row = pd.Series({
+        "query_name": "Q1", "show_rows": True, "show_total": True,
+        "show_delta": True, "show_init": True})
+    labels = ChartLabels("Q1", "x", "y")
+    xl_file = tmp_path / f"totals_{totals}.xlsx"
+    writer = XlPivotWriter(str(xl_file), engine=engine, totals=totals)
+    writer.render_pivot_result(
+        PivotResult(row, df), PivotTexts("Q1_Data", "Q1_Chart", "Q1", labels))
+    writer.save()
+
+    read_df = pd.read_excel(xl_file, sheet_name="Q1_Data")
+    assert read_df.iloc[2].tolist() == ["Total", 4.0, 2.0, 10.0]
+    assert read_df.iloc[3, 2:].tolist() == [-2.0, 8.0]
+    formula = openpyxl.load_workbook(xl_file)["Q1_Data"]["B4"].value
+    assert formula == ("=SUM(B2:B3)" if totals == "cached" else 4)
+    with pytest.raises(ValueError):
+        XlPivotWriter(str(xl_file), totals="cached")
+
+
+
+def test_update_rewrites_sheet_when_rendering_changes(tmp_path):
+    """
+    Test that a sheet with an unchanged DataFrame is rewritten in update mode when the
+    PivotInfos flags of the pivot change.
+    """
+    df = pd.DataFrame({"name": ["a", "b"], "2023": [1.0, 3.0], "2024": [2.0, 4.0]})
+    texts = PivotTexts("Q1_Data", "Q1_Chart", "Q1", ChartLabels("Q1", "x", "y"))
+    xl_file = str(tmp_path / "update.xlsx")
+
+    def render(show_total):
+        row = pd.Series({
+            "query_name": "Q1", "show_rows": True, "show_total": show_total,
+            "show_delta": False, "show_init": True})
+        writer = XlPivotWriter(xl_file, update=True)
+        sh = writer.render_pivot_result(PivotResult(row, df.copy()), texts)
+        writer.save()
+        return sh
+
+    assert render(False) is not None
+    assert render(False) is None
+    # the chart of the unchanged data sheet is drawn again
+    chart_sheet = openpyxl.load_workbook(xl_file)["Q1_Chart"]
+    assert len(chart_sheet._charts) == 1
+    assert len(chart_sheet._charts[0].series) == 2
+    assert render(True) is not None
+    assert openpyxl.load_workbook(xl_file)["Q1_Data"]["A4"].value == "Total"
+    assert render(True) is None
@@ -1,6 +1,6 @@
 import pandas as pd
 import pytest
-from xl.xl_reader import XlReader
+from xl.xl_reader import ColumnSpec, XlReader
 
 """
 This module contains unit tests for the Excel reader functionality.
@@ -137,3 +137,79 @@ def test_correct_and_convert_value():
     assert xl_reader._correct_and_convert_value("5678") == 5678.0
     assert xl_reader._correct_and_convert_value(
         "not_a_number") == "not_a_number"
+
+
+def test_init_parallel(mock_excel_file):
+    """
+    Test that parsing the sheets in a process pool gives the same DataFrames.
+
+    Args:
+        mock_excel_file (pathlib.Path): Path to the mock Excel file.
+    """
+    sequential = XlReader(mock_excel_file)
+    parallel = XlReader(mock_excel_file, parallel=True, max_sheet_workers=2)
+    assert list(parallel.df_dict) == list(sequential.df_dict)
+    for sheet_name, df in sequential.df_dict.items():
+        assert parallel.df_dict[sheet_name].equals(df)
+
+
+def test_column_schema(tmp_path):
+    """
+    Test that the columns declared in a column schema are converted after parsing.
+
+    Args:
+        tmp_path (pathlib.Path): Temporary directory provided by pytest.
+    """
+    class TypedReader(XlReader):
+        column_schema = {
+            "Sheet1": {
+                "amount": ColumnSpec(dtype="float64", number=True),
+                "duration": ColumnSpec(duration=True),
+                "date": ColumnSpec(date_formats=["%d.%m.%Y", "%Y-%m-%d"]),
+                "missing": ColumnSpec(number=True),
+            }
+        }
+
+    file_path = tmp_path / "typed.xlsx"
+    pd.DataFrame({
+        "amount": ["1'234.5", "12", "x"],
+        "duration": ["17:45 h", "240 min", "2h 19min"],
+        "date": ["01.02.2024", "2024-03-04", "?"],
+    }).to_excel(file_path, sheet_name="Sheet1", index=False)
+
+    df = TypedReader(file_path).get_dataframe("Sheet1")
+    assert df["amount"].dtype == "float64"
+    assert df["amount"].iloc[:2].tolist() == [1234.5, 12.0]
+    assert pd.isna(df["amount"].iloc[2])
+    assert df["duration"].tolist() == pytest.approx([17.75, 4.0, 2 + 19 / 60])
+    assert df["date"].iloc[:2].tolist() == [
+        pd.Timestamp(2024, 2, 1), pd.Timestamp(2024, 3, 4)]
+    assert pd.isna(df["date"].iloc[2])
+
+
+def test_find_rows_with_refs(mock_excel_file):
+    """
+    Test the batch lookup and the header detection of XlReader.
+
+    Args:
+        mock_excel_file (pathlib.Path): Path to the mock Excel file.
+    """
+    xl_reader = XlReader(mock_excel_file)
+    df = xl_reader.get_dataframe("Sheet2")
+    assert xl_reader.find_rows_with_refs(df, ["ref3", "x", "ref1"]) == [2, -1, 0]
+    assert xl_reader.find_row_with_ref(df, "ref3") == 2
+
+    # A DataFrame modified in place is searched again
+    df.iloc[0, 0] = "ref9"
+    assert xl_reader.find_row_with_ref(df, "ref1") == -1
+    assert xl_reader.find_rows_with_refs(df, ["ref9", "ref1"]) == [0, -1]
+
+    template = pd.DataFrame([
+        ["Title", None, None],
+        [None, None, None],
+        ["Ref", "Name", "Value"],
+        ["ref1", "a", 1],
+    ])
+    assert xl_reader.find_header_row(template, ["Ref", "Name", "Value"]) == 2
+    assert xl_reader.find_header_row(template, ["Ref", "Other"], min_matches=1) == 2
+    assert xl_reader.find_header_row(template, ["Unknown"]) == -1
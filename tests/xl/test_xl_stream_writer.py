@@ -0,0 +1,67 @@
+import datetime
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from xl.xl_stream_writer import SheetSpec, XlStreamWriter
+from xl.xl_writer import BODY_STYLE, FIRST_COLUMN_STYLE, HEADER_STYLE, ChartLabels
+
+
+def test_stream_sheet_with_chart(tmp_path):
+    xl_file = tmp_path / "stream.xlsx"
+    df = pd.DataFrame({
+        "name": ["row_a", "row_b"],
+        "2023": [1.0, np.nan],
+        "2024": [3, 4],
+        "day": [datetime.date(2024, 1, 2), datetime.date(2024, 1, 3)],
+        "updated": pd.to_datetime(["2024-01-02 08:00", "2024-01-03 12:30"]),
+    })
+    writer = XlStreamWriter(str(xl_file))
+    sh = writer.add_sheet("Data", df, SheetSpec(title="My data", portrait=False))
+    assert writer.add_sheet("Data", df) is None
+    assert (sh.max_row, sh.max_column) == (3, 5)
+
+    chart_sheet = writer.add_chart_sheet(sh, "Chart", ChartLabels("T", "x", "y"))
+    chart_sheet.create_chart()
+    writer.save()
+
+    wb = openpyxl.load_workbook(xl_file)
+    ws = wb["Data"]
+    assert wb.sheetnames == ["Data", "Chart"]
+    assert [c.value for c in ws[1]] == ["name", "2023", "2024", "day", "updated"]
+    assert ws["B3"].value is None and ws["C3"].value == 4
+    assert ws["A1"].style == HEADER_STYLE
+    assert ws["A2"].style == FIRST_COLUMN_STYLE
+    assert ws["B2"].style == BODY_STYLE
+    assert ws["D2"].style == BODY_STYLE
+    assert ws["D2"].is_date and ws["E2"].is_date
+    assert ws["E3"].value == datetime.datetime(2024, 1, 3, 12, 30)
+    assert ws.column_dimensions["A"].width == 8
+    assert ws.page_setup.orientation == "landscape"
+    assert "My data" in ws.oddHeader.center.text
+    assert len(wb["Chart"]._charts) == 1
+
+
+def test_stream_sheet_unformatted(tmp_path):
+    xl_file = tmp_path / "raw.xlsx"
+    writer = XlStreamWriter(str(xl_file))
+    writer.add_sheet("Raw", pd.DataFrame({"a": [1]}), SheetSpec(formatted=False))
+    writer.save()
+
+    ws = openpyxl.load_workbook(xl_file)["Raw"]
+    assert ws["A2"].value == 1
+    assert ws["A1"].style == "Normal"
+
+
+def test_stream_sheet_finalized_by_generic_callers(tmp_path):
+    xl_file = tmp_path / "finalized.xlsx"
+    writer = XlStreamWriter(str(xl_file))
+    sh = writer.add_sheet("Data", pd.DataFrame({"name": ["a"], "2023": [1]}))
+    sh.format_worksheet()
+    sh.finalize_sheet(title="Final title", portrait=False)
+    writer.save()
+
+    ws = openpyxl.load_workbook(xl_file)["Data"]
+    assert ws["A2"].style == FIRST_COLUMN_STYLE
+    assert ws.page_setup.orientation == "landscape"
+    assert "Final title" in ws.oddHeader.center.text
@@ -0,0 +1,204 @@
+import openpyxl
+import pandas as pd
+import pytest
+from xl.xl_writer import (BODY_STYLE, FIRST_COLUMN_STYLE, HEADER_STYLE,
+                          PROFILE_DEFERRED, PROFILE_RAW, ChartLabels,
+                          XlWriter, get_column_widths)
+
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame({
+        "name": ["a", "b", "c"],
+        "value": [1, 2, 3],
+        "date": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]),
+    })
+
+
+def test_format_worksheet_uses_named_styles(tmp_path, sample_df):
+    xl_file = tmp_path / "styles.xlsx"
+    writer = XlWriter(str(xl_file))
+    sh = writer.add_sheet("Data", sample_df)
+    sh.finalize_sheet(portrait=False)
+    writer.save()
+
+    ws = openpyxl.load_workbook(xl_file)["Data"]
+    assert ws["A1"].style == HEADER_STYLE
+    assert ws["C1"].style == HEADER_STYLE
+    assert ws["A3"].style == FIRST_COLUMN_STYLE
+    assert ws["B3"].style == BODY_STYLE
+    assert ws["A1"].font.b and ws["A3"].font.b
+    assert ws["A1"].border.left.style == "medium"
+    assert ws["B3"].border.left.style == "thin"
+    assert ws["A3"].alignment.horizontal == "left"
+    assert ws["B1"].alignment.horizontal == "center"
+    assert ws["C2"].is_date
+
+
+def test_apply_style_to_range(tmp_path, sample_df):
+    writer = XlWriter(str(tmp_path / "range.xlsx"))
+    sh = writer.add_sheet("Data", sample_df)
+    sh.apply_style(HEADER_STYLE, "B2:C3")
+    assert sh.ws["B2"].style == HEADER_STYLE
+    assert sh.ws["C3"].style == HEADER_STYLE
+    assert sh.ws["B4"].style != HEADER_STYLE
+
+
+def test_adjust_column_width_from_dataframe(tmp_path):
+    df = pd.DataFrame({
+        "short": ["a", "b"],
+        "a_long_column_title": [1, 2],
+        "text": ["x", "a much longer text value"],
+    })
+    writer = XlWriter(str(tmp_path / "widths.xlsx"))
+    sh = writer.add_sheet("Data", df)
+    sh.adjust_column_width()
+
+    assert get_column_widths(df) == [5, 19, 24]
+    assert sh.ws.column_dimensions["A"].width == 8
+    assert sh.ws.column_dimensions["B"].width == 19
+    assert sh.ws.column_dimensions["C"].width == 24
+    assert get_column_widths(df, sample_size=1)[1] == 19
+
+
+def test_sheet_index_rename_and_order(tmp_path, sample_df):
+    xl_file = tmp_path / "order.xlsx"
+    writer = XlWriter(str(xl_file))
+    first = writer.add_sheet("First", sample_df)
+    writer.add_sheet("Second", sample_df)
+    writer.add_sheet("Third", sample_df)
+    assert writer.add_sheet("First", sample_df) is None
+    assert writer.get_sheet("Second").ws.title == "Second"
+
+    assert writer.rename_sheet("First", "Renamed") is first
+    assert writer.get_sheet("First") is None
+    assert writer.get_sheet("Renamed") is first
+    assert writer.rename_sheet("Renamed", "Second") is None
+
+    writer.move_sheet("Third", -2)
+    assert writer.sheet_names == ["Third", "Renamed", "Second"]
+    writer.reorder_sheets(["Second"])
+    assert writer.sheet_names == ["Second", "Third", "Renamed"]
+    assert [sheet.ws.title for sheet in writer.sheets] == writer.sheet_names
+    writer.save()
+
+    assert openpyxl.load_workbook(xl_file).sheetnames == ["Second", "Third", "Renamed"]
+
+
+def test_deferred_profile_finalizes_on_save(tmp_path, sample_df):
+    xl_file = tmp_path / "deferred.xlsx"
+    writer = XlWriter(str(xl_file), profile=PROFILE_DEFERRED)
+    sh = writer.add_sheet("Data", sample_df)
+    sh.finalize_sheet(title="First")
+    sh.finalize_sheet(title="My data", portrait=False)
+    assert len(writer.pipeline) == 1
+    assert sh.ws["A1"].style == "Normal"
+    writer.save()
+
+    ws = openpyxl.load_workbook(xl_file)["Data"]
+    assert ws["A1"].style == HEADER_STYLE
+    assert ws.page_setup.orientation == "landscape"
+    assert "My data" in ws.oddHeader.center.text
+
+
+def test_raw_profile_skips_formatting(tmp_path, sample_df):
+    xl_file = tmp_path / "raw.xlsx"
+    writer = XlWriter(str(xl_file), profile=PROFILE_RAW)
+    writer.add_sheet("Data", sample_df).finalize_sheet(title="My data")
+    writer.save()
+
+    ws = openpyxl.load_workbook(xl_file)["Data"]
+    assert ws["A2"].value == "a"
+    assert ws["A1"].style == "Normal"
+    assert HEADER_STYLE not in openpyxl.load_workbook(xl_file).style_names
+    with pytest.raises(ValueError):
+        XlWriter(str(xl_file), profile="pretty")
+
+
+def test_chart_series_from_ranges(tmp_path):
+    df = pd.DataFrame({
+        "name": [f"entity_{i}" for i in range(5)] + ["Total"],
+        "2023": [1, 2, 3, 4, 5, 15],
+        "2024": [2, 3, 4, 5, 6, 20],
+    })
+    writer = XlWriter(str(tmp_path / "chart.xlsx"))
+    data_sheet = writer.add_sheet("Data", df)
+    chart_sheet = writer.add_chart_sheet(data_sheet, "Chart", ChartLabels("T", "x", "y"))
+    chart_sheet.init_global_params()
+    chart_sheet.add_chart_data(hidden_rows=1)
+    chart_sheet.set_categories()
+
+    series = chart_sheet.chart.series
+    assert len(series) == 5
+    assert series[0].tx.strRef.f == "'Data'!A2"
+    assert series[0].val.numRef.f == "'Data'!$B$2:$C$2"
+    assert series[4].val.numRef.f == "'Data'!$B$6:$C$6"
+    assert all(s.cat.numRef.f == "'Data'!$B$1:$C$1" for s in series)
+
+    chart_sheet.max_series = 2
+    chart_sheet.create_chart()
+    assert len(chart_sheet.chart.series) == 2
+    writer.save()
+
+
+@pytest.mark.parametrize("engine", ["openpyxl", "xlsxwriter"])
+def test_format_as_table(tmp_path, engine):
+    if engine == "xlsxwriter":
+        pytest.importorskip("xlsxwriter")
+    df = pd.DataFrame({"name": ["a", "b", "c"], 2023: [1, 2, 3], 2024: [4, 5, 6]})
+    xl_file = tmp_path / f"table_{engine}.xlsx"
+    writer = XlWriter(str(xl_file), engine=engine, table_style="TableStyleLight9")
+    writer.add_sheet("My data", df).finalize_sheet(title="My data")
+    writer.add_sheet("My-data", df).finalize_sheet()
+    writer.save()
+
+    book = openpyxl.load_workbook(xl_file)
+    ws = book["My data"]
+    table = ws.tables["Table_My_data"]
+    assert table.ref == "A1:C4"
+    assert table.tableStyleInfo.name == "TableStyleLight9"
+    assert table.tableStyleInfo.showFirstColumn
+    assert table.tableStyleInfo.showRowStripes
+    assert [cell.value for cell in ws[1]] == ["name", "2023", "2024"]
+    assert {cell.style for row in ws.iter_rows() for cell in row} == {"Normal"}
+    assert "Table_My_data_2" in book["My-data"].tables
+
+
+def test_update_replaces_changed_sheets_only(tmp_path, sample_df):
+    xl_file = str(tmp_path / "update.xlsx")
+    other_df = pd.DataFrame({"name": ["x"], "value": [10]})
+    writer = XlWriter(xl_file)
+    writer.add_sheet("Data", sample_df).finalize_sheet(title="My data")
+    sh = writer.add_sheet("Other", other_df)
+    sh.finalize_sheet()
+    writer.add_chart_sheet(sh, "Chart", ChartLabels("t", "x", "y")).create_chart()
+    writer.save()
+
+    changed_df = other_df.assign(value=[20])
+    writer = XlWriter(xl_file, update=True)
+    assert writer.add_sheet("Data", sample_df.copy()) is None
+    writer.add_sheet("Other", changed_df).finalize_sheet(title="Changed")
+    writer.save()
+    assert writer.unchanged_sheets == ["Data"]
+
+    book = openpyxl.load_workbook(xl_file)
+    assert book.sheetnames == ["Data", "Other", "Chart"]
+    assert "My data" in book["Data"].oddHeader.center.text
+    assert book["Data"]["A1"].style == HEADER_STYLE
+    assert book["Other"]["B2"].value == 20
+    assert len(book["Chart"]._charts) == 1
+
+    writer = XlWriter(xl_file, update=True)
+    assert writer.add_sheet("Other", changed_df) is None
+    writer.add_sheet("Draft", other_df)
+    writer.rename_sheet("Draft", "Final")
+    writer.save()
+
+    # the hash follows the renamed sheet
+    writer = XlWriter(xl_file, update=True)
+    assert writer.add_sheet("Final", other_df) is None
+    properties = openpyxl.load_workbook(xl_file).custom_doc_props.names
+    assert "XlWriter hash Final" in properties
+    assert "XlWriter hash Draft" not in properties
+    with pytest.raises(ValueError):
+        XlWriter(xl_file, engine="xlsxwriter", update=True)
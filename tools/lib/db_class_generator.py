@@ -14,6 +14,9 @@ Functions:
       classes from custom definitions.
     - generate_table_class_from_json(json_filename, table_classes_filename):
       Generates SQLAlchemy table classes from a JSON schema file.
+
+The columns of a composite unique constraint are listed under the `_unique` key of a table,
+e.g. `"_unique": [["criterion_key", "dimension_1", "dimension_2"]]`.
 """
 
 import json
@@ -21,6 +24,9 @@ import re
 
 from sqlalchemy.ext.declarative import declarative_base
 
+# The key of the composite unique constraints in the definition of a table
+UNIQUE_KEY = "_unique"
+
 Base = declarative_base()
 
 
@@ -262,7 +268,8 @@ It contains ORM classes for SQLAlchemy representing the database tables.
 # pylint: disable=too-few-public-methods
 # pylint: disable=unused-import
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, Numeric
+from sqlalchemy import (Boolean, Column, DateTime, Float, Integer, Numeric,
+                        String, UniqueConstraint)
 from sqlalchemy.orm import declarative_base
 #from sqlalchemy.ext.declarative import declarative_base #old fashion
 
@@ -273,6 +280,8 @@ Base = declarative_base()
 
     for table_name, table_info in json_data['tables'].items():
         table_name = format_class_name(table_name)
+        unique_constraints = table_info.get(UNIQUE_KEY, [])
+        table_info = {k: v for k, v in table_info.items() if k != UNIQUE_KEY}
         python_code += f"class {table_name}(Base):\n"
         python_code += f"""    \"\"\"
     Represents the '{table_name}' table.
@@ -289,6 +298,11 @@ Base = declarative_base()
 
         python_code += "    \"\"\"\n\n"
         python_code += f"    __tablename__ = '{table_name}'\n"
+        if unique_constraints:
+            constraints = ''.join(
+                f"UniqueConstraint({', '.join(repr(column) for column in columns)}), "
+                for columns in unique_constraints)
+            python_code += f"    __table_args__ = ({constraints.rstrip()})\n"
 
         for column_name, column_info in table_info.items():
             column_type = column_info['type']